@@ -12,8 +12,12 @@ https://docs.djangoproject.com/en/5.1/ref/settings/
 
 import os
 from datetime import timedelta
+from decimal import Decimal
 from pathlib import Path
 
+from celery.schedules import crontab
+from django.core.exceptions import ImproperlyConfigured
+
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
 BASE_DIR = Path(__file__).resolve().parent.parent
 
@@ -40,6 +44,7 @@ INSTALLED_APPS = [
     "django.contrib.sessions",
     "django.contrib.messages",
     "django.contrib.staticfiles",
+    "django.contrib.postgres",
     "django_filters",
     "corsheaders",
     "rest_framework",
@@ -47,7 +52,6 @@ INSTALLED_APPS = [
     "rest_framework_simplejwt",
     # "rest_framework_simplejwt.token_blacklist",
     "drf_spectacular",
-    "silk",
     "core",
     "user",
     "recipe",
@@ -55,6 +59,7 @@ INSTALLED_APPS = [
 
 MIDDLEWARE = [
     "django.middleware.security.SecurityMiddleware",
+    "core.middleware.CompressionMiddleware",
     "django.contrib.sessions.middleware.SessionMiddleware",
     "corsheaders.middleware.CorsMiddleware",
     "django.middleware.common.CommonMiddleware",
@@ -62,9 +67,15 @@ MIDDLEWARE = [
     "django.contrib.auth.middleware.AuthenticationMiddleware",
     "django.contrib.messages.middleware.MessageMiddleware",
     "django.middleware.clickjacking.XFrameOptionsMiddleware",
-    "silk.middleware.SilkyMiddleware",
 ]
 
+# Silk profiles every request and pulls in its profiling dependencies at boot,
+# so it is only loaded when asked for (on by default in DEBUG).
+SILK_ENABLED = bool(int(os.environ.get("SILK_ENABLED", DEBUG)))
+if SILK_ENABLED:
+    INSTALLED_APPS.append("silk")
+    MIDDLEWARE.append("silk.middleware.SilkyMiddleware")
+
 ROOT_URLCONF = "backend.urls"
 
 TEMPLATES = [
@@ -127,6 +138,46 @@ AUTH_PASSWORD_VALIDATORS = [
 ]
 
 
+# Password hashing
+# PASSWORD_HASHER picks the hasher for new hashes (argon2, scrypt or pbkdf2).
+# The others stay listed so older hashes still verify; they are rehashed with
+# the preferred hasher and costs on the next successful login.
+
+PASSWORD_HASHER = os.environ.get("PASSWORD_HASHER", "argon2")
+
+_HASHERS = {
+    "argon2": "core.hashers.TunedArgon2PasswordHasher",
+    "scrypt": "core.hashers.TunedScryptPasswordHasher",
+    "pbkdf2": "core.hashers.TunedPBKDF2PasswordHasher",
+}
+if PASSWORD_HASHER not in _HASHERS:
+    raise ImproperlyConfigured(
+        f"PASSWORD_HASHER must be one of {', '.join(_HASHERS)}, "
+        f"not {PASSWORD_HASHER!r}."
+    )
+PASSWORD_HASHERS = [_HASHERS.pop(PASSWORD_HASHER), *_HASHERS.values()]
+
+ARGON2_TIME_COST = int(os.environ.get("ARGON2_TIME_COST", 2))
+ARGON2_MEMORY_COST = int(os.environ.get("ARGON2_MEMORY_COST", 19456))  # KiB
+ARGON2_PARALLELISM = int(os.environ.get("ARGON2_PARALLELISM", 1))
+
+SCRYPT_WORK_FACTOR = int(os.environ.get("SCRYPT_WORK_FACTOR", 2**14))
+SCRYPT_BLOCK_SIZE = int(os.environ.get("SCRYPT_BLOCK_SIZE", 8))
+SCRYPT_PARALLELISM = int(os.environ.get("SCRYPT_PARALLELISM", 1))
+
+PBKDF2_ITERATIONS = int(os.environ.get("PBKDF2_ITERATIONS", 870000))
+
+# At most AUTH_VERIFY_SLOTS credential checks hash at once per host, across
+# all worker processes, using Redis locks (0 means no limit). A login that
+# finds no free slot within AUTH_VERIFY_QUEUE_TIMEOUT seconds fails, and the
+# API token views answer it with a 429. A slot held longer than
+# AUTH_VERIFY_LOCK_TIMEOUT seconds, as by a killed worker, is freed.
+AUTHENTICATION_BACKENDS = ["core.backends.BoundedModelBackend"]
+AUTH_VERIFY_SLOTS = int(os.environ.get("AUTH_VERIFY_SLOTS", 0))
+AUTH_VERIFY_LOCK_TIMEOUT = float(os.environ.get("AUTH_VERIFY_LOCK_TIMEOUT", 10))
+AUTH_VERIFY_QUEUE_TIMEOUT = float(os.environ.get("AUTH_VERIFY_QUEUE_TIMEOUT", 2))
+
+
 # Internationalization
 # https://docs.djangoproject.com/en/5.1/topics/i18n/
 
@@ -147,6 +198,9 @@ MEDIA_URL = "/static/media/"
 
 MEDIA_ROOT = "/vol/web/media"
 STATIC_ROOT = "/vol/web/static"
+# Files only staff may download, such as admin job exports (core.storage).
+# Unlike MEDIA_ROOT it is not shared with the proxy.
+PRIVATE_ROOT = os.environ.get("PRIVATE_ROOT", "/vol/private")
 
 # Default primary key field type
 # https://docs.djangoproject.com/en/5.1/ref/settings/#default-auto-field
@@ -159,10 +213,29 @@ CORS_ALLOWED_ORIGINS = ["http://localhost:5173"]
 
 EMAIL_BACKEND = "django.core.mail.backends.console.EmailBackend"
 
+# DRF tokens from `user:token` are still accepted while clients move to JWT.
+# Set LEGACY_TOKEN_AUTH=0 to close the compatibility window.
+LEGACY_TOKEN_AUTH = bool(int(os.environ.get("LEGACY_TOKEN_AUTH", 1)))
+AUTH_TOKEN_CACHE_TIMEOUT = int(os.environ.get("AUTH_TOKEN_CACHE_TIMEOUT", 60 * 15))
+
+AUTHENTICATION_CLASSES = ["rest_framework_simplejwt.authentication.JWTAuthentication"]
+if LEGACY_TOKEN_AUTH:
+    AUTHENTICATION_CLASSES.append("core.authentication.CachedTokenAuthentication")
+AUTHENTICATION_CLASSES.append("rest_framework.authentication.SessionAuthentication")
+
+# JSON renderer for API responses; set JSON_RENDERER to
+# rest_framework.renderers.JSONRenderer to go back to the stdlib encoder.
+JSON_RENDERER = os.environ.get("JSON_RENDERER", "core.renderers.ORJSONRenderer")
+
+# Responses smaller than this are sent uncompressed (bytes).
+COMPRESSION_MIN_LENGTH = int(os.environ.get("COMPRESSION_MIN_LENGTH", 1024))
+BROTLI_QUALITY = int(os.environ.get("BROTLI_QUALITY", 4))
+
 REST_FRAMEWORK = {
-    "DEFAULT_AUTHENTICATION_CLASSES": [
-        "rest_framework_simplejwt.authentication.JWTAuthentication",
-        "rest_framework.authentication.SessionAuthentication",
+    "DEFAULT_AUTHENTICATION_CLASSES": AUTHENTICATION_CLASSES,
+    "DEFAULT_RENDERER_CLASSES": [
+        JSON_RENDERER,
+        "rest_framework.renderers.BrowsableAPIRenderer",
     ],
     "DEFAULT_SCHEMA_CLASS": "drf_spectacular.openapi.AutoSchema",
     "DEFAULT_FILTER_BACKENDS": ["django_filters.rest_framework.DjangoFilterBackend"],
@@ -173,6 +246,13 @@ REST_FRAMEWORK = {
     # ],
 }
 
+# Largest page a client can ask for with ?page_size= on keyset-paginated lists,
+# and how long their cached total counts are reused (seconds).
+MAX_PAGE_SIZE = int(os.environ.get("MAX_PAGE_SIZE", 100))
+PAGINATION_COUNT_CACHE_TIMEOUT = int(
+    os.environ.get("PAGINATION_COUNT_CACHE_TIMEOUT", 60)
+)
+
 SIMPLE_JWT = {
     "ACCESS_TOKEN_LIFETIME": timedelta(minutes=60),  # Short-lived access tokens
     "REFRESH_TOKEN_LIFETIME": timedelta(days=1),  # Longer-lived refresh tokens
@@ -192,20 +272,129 @@ SPECTACULAR_SETTINGS = {
     "COMPONENT_SPLIT_REQUEST": True,
 }
 
+# The schema is generated once by `manage.py build_schema` and served from
+# this file; set OPENAPI_STATIC_SCHEMA=0 to generate it on each request.
+OPENAPI_SCHEMA_FILE = Path(
+    os.environ.get("OPENAPI_SCHEMA_FILE", BASE_DIR / "schema.yaml")
+)
+OPENAPI_STATIC_SCHEMA = bool(
+    int(os.environ.get("OPENAPI_STATIC_SCHEMA", int(not DEBUG)))
+)
+
 # Celery
-CELERY_BROKER_URL = os.environ.get("CELERY_BROKER_URL", "redis://redis:6379/0")
-CELERY_RESULT_BACKEND = os.environ.get("CELERY_RESULT_BACKEND", "redis://redis:6379/0")
+# The broker and the results live in their own Redis databases so that queued
+# messages and task results never share keys or memory with the cache (DB 0).
+CELERY_BROKER_URL = os.environ.get("CELERY_BROKER_URL", "redis://redis:6379/1")
+CELERY_RESULT_BACKEND = os.environ.get("CELERY_RESULT_BACKEND", "redis://redis:6379/2")
 CELERY_ACCEPT_CONTENT = ["json"]
 CELERY_TASK_SERIALIZER = "json"
 CELERY_RESULT_SERIALIZER = "json"
+# Nothing reads task results back, so they are only stored for tasks declared
+# with ignore_result=False, and expire after CELERY_RESULT_EXPIRES seconds.
+CELERY_TASK_IGNORE_RESULT = True
+CELERY_RESULT_EXPIRES = int(os.environ.get("CELERY_RESULT_EXPIRES", 60 * 60))
+# Tasks go to the "default" queue unless their base class in core.tasks says
+# otherwise; long batch jobs use HeavyTask and the "heavy" queue, which gets
+# its own worker (see docker-compose.yml).
+CELERY_TASK_DEFAULT_QUEUE = "default"
+CELERY_WORKER_PREFETCH_MULTIPLIER = int(
+    os.environ.get("CELERY_WORKER_PREFETCH_MULTIPLIER", 4)
+)
+# Heavy tasks are acknowledged after they finish. Redis hands an unacknowledged
+# message to another worker after visibility_timeout seconds, so it has to be
+# longer than the slowest task.
+CELERY_BROKER_TRANSPORT_OPTIONS = {
+    "visibility_timeout": int(os.environ.get("CELERY_VISIBILITY_TIMEOUT", 60 * 60 * 6))
+}
+CELERY_BEAT_SCHEDULE = {
+    "archive-orders": {
+        "task": "core.tasks.archive_orders",
+        "schedule": crontab(hour=3, minute=0),
+    },
+}
+
+# How long the product list and a user's order list stay cached (seconds);
+# they are also recomputed as soon as a product or one of the user's orders
+# changes.
+PRODUCT_LIST_CACHE_TIMEOUT = int(os.environ.get("PRODUCT_LIST_CACHE_TIMEOUT", 60 * 15))
+ORDER_LIST_CACHE_TIMEOUT = int(os.environ.get("ORDER_LIST_CACHE_TIMEOUT", 60 * 15))
+
+# Cached lists (core.caching.get_or_compute) are recomputed by one request at a
+# time, holding a lock for at most CACHE_LOCK_TIMEOUT seconds. Other requests
+# get the previous list, kept for CACHE_STALE_TIMEOUT seconds past its expiry,
+# or wait up to CACHE_LOCK_WAIT seconds if there is none. CACHE_XFETCH_BETA
+# scales how early lists are refreshed before they expire; 0 turns it off.
+CACHE_STALE_TIMEOUT = int(os.environ.get("CACHE_STALE_TIMEOUT", 60 * 60))
+CACHE_LOCK_TIMEOUT = int(os.environ.get("CACHE_LOCK_TIMEOUT", 30))
+CACHE_LOCK_WAIT = float(os.environ.get("CACHE_LOCK_WAIT", 10))
+CACHE_XFETCH_BETA = float(os.environ.get("CACHE_XFETCH_BETA", 1))
+
+# Responses to POST /api/orders/ with an Idempotency-Key are replayed for this
+# long (seconds). Concurrent retries wait up to IDEMPOTENCY_LOCK_WAIT seconds
+# for the first request, whose lock expires after IDEMPOTENCY_LOCK_TIMEOUT.
+IDEMPOTENCY_KEY_TIMEOUT = int(os.environ.get("IDEMPOTENCY_KEY_TIMEOUT", 60 * 60 * 24))
+IDEMPOTENCY_LOCK_TIMEOUT = int(os.environ.get("IDEMPOTENCY_LOCK_TIMEOUT", 30))
+IDEMPOTENCY_LOCK_WAIT = float(os.environ.get("IDEMPOTENCY_LOCK_WAIT", 10))
+
+# Admin changelists of unfiltered tables with at least this many rows, by the
+# planner's estimate, show the estimate instead of running COUNT(*).
+ADMIN_ESTIMATED_COUNT_THRESHOLD = int(
+    os.environ.get("ADMIN_ESTIMATED_COUNT_THRESHOLD", 10_000)
+)
+
+# Rows handled per transaction by background admin actions (core.admin_jobs).
+ADMIN_JOB_BATCH_SIZE = int(os.environ.get("ADMIN_JOB_BATCH_SIZE", 500))
+
+# The outbox relay (core.outbox) sends up to OUTBOX_BATCH_SIZE events per
+# transaction and polls every OUTBOX_POLL_INTERVAL seconds when idle. Handled
+# event ids are remembered for OUTBOX_DEDUPE_TIMEOUT seconds, or for
+# OUTBOX_LOCK_TIMEOUT seconds while a handler runs. Sent events are deleted
+# after OUTBOX_RETENTION_DAYS days.
+OUTBOX_BATCH_SIZE = int(os.environ.get("OUTBOX_BATCH_SIZE", 500))
+OUTBOX_POLL_INTERVAL = float(os.environ.get("OUTBOX_POLL_INTERVAL", 1))
+OUTBOX_DEDUPE_TIMEOUT = int(os.environ.get("OUTBOX_DEDUPE_TIMEOUT", 60 * 60 * 24))
+OUTBOX_LOCK_TIMEOUT = int(os.environ.get("OUTBOX_LOCK_TIMEOUT", 60 * 5))
+OUTBOX_RETENTION_DAYS = int(os.environ.get("OUTBOX_RETENTION_DAYS", 7))
+
+# Orders delivered or cancelled more than this many days ago are moved to
+# ArchivedOrder by core.tasks.archive_orders, in batches of this size, up to
+# this many batches per run.
+ORDER_ARCHIVE_AFTER_DAYS = int(os.environ.get("ORDER_ARCHIVE_AFTER_DAYS", 90))
+ORDER_ARCHIVE_BATCH_SIZE = int(os.environ.get("ORDER_ARCHIVE_BATCH_SIZE", 500))
+ORDER_ARCHIVE_MAX_BATCHES = int(os.environ.get("ORDER_ARCHIVE_MAX_BATCHES", 200))
 
 # Redis
+REDIS_URL = os.environ.get("REDIS_URL", "redis://redis:6379/0")
+
 CACHES = {
     "default": {
         "BACKEND": "django_redis.cache.RedisCache",
-        "LOCATION": "redis://redis:6379/0",
+        "LOCATION": REDIS_URL,
         "OPTIONS": {
             "CLIENT_CLASS": "django_redis.client.DefaultClient",
         },
     }
 }
+
+# Async Redis client used by the ASGI views in core.async_views
+ASYNC_CACHE = {
+    "LOCATION": REDIS_URL,
+    "CLIENT_CLASS": "redis.asyncio.Redis",
+    "TIMEOUT": 60 * 15,
+}
+
+# Per-user tag/ingredient name -> id lookups used by recipe writes: entries kept
+# in each process, and how long they live in Redis (seconds).
+RECIPE_ATTR_CACHE_SIZE = int(os.environ.get("RECIPE_ATTR_CACHE_SIZE", 4096))
+RECIPE_ATTR_CACHE_TIMEOUT = int(
+    os.environ.get("RECIPE_ATTR_CACHE_TIMEOUT", 60 * 60 * 24)
+)
+
+# Bucket widths of the recipe facet histograms. Run rebuild_recipe_facets
+# after changing them.
+RECIPE_FACET_PRICE_BUCKET = Decimal(os.environ.get("RECIPE_FACET_PRICE_BUCKET", "5.00"))
+RECIPE_FACET_TIME_BUCKET = int(os.environ.get("RECIPE_FACET_TIME_BUCKET", 15))
+
+# Readiness check: per-probe timeout and how long results are reused (seconds)
+HEALTH_CHECK_TIMEOUT = float(os.environ.get("HEALTH_CHECK_TIMEOUT", 2))
+HEALTH_CHECK_CACHE_SECONDS = float(os.environ.get("HEALTH_CHECK_CACHE_SECONDS", 5))
@@ -2,42 +2,67 @@ from django.conf import settings
 from django.conf.urls.static import static
 from django.contrib import admin
 from django.urls import include, path
-from drf_spectacular.views import (
-    SpectacularAPIView,
-    SpectacularSwaggerView,
-)
-from rest_framework_simplejwt.views import (
-    TokenObtainPairView,
-    TokenRefreshView,
-)
+from django.utils.module_loading import import_string
+from rest_framework_simplejwt.views import TokenRefreshView
 
 from core import views as core_views
+from user import views as user_views
+
+
+def lazy_view(dotted_path, **initkwargs):
+    """Import a class-based view on its first request instead of at startup."""
+    view = None
+
+    def wrapper(request, *args, **kwargs):
+        nonlocal view
+        if view is None:
+            view = import_string(dotted_path).as_view(**initkwargs)
+        return view(request, *args, **kwargs)
+
+    return wrapper
+
+
+if settings.OPENAPI_STATIC_SCHEMA:
+    schema_view = core_views.StaticSchemaView.as_view()
+else:
+    schema_view = lazy_view("drf_spectacular.views.SpectacularAPIView")
 
 urlpatterns = [
     # Admin
     path("admin/", admin.site.urls),
     # Health check
     path("api/health-check/", core_views.health_check, name="health-check"),
+    path(
+        "api/health-check/ready/",
+        core_views.readiness_check,
+        name="readiness-check",
+    ),
     # JWT
-    path("api/token/", TokenObtainPairView.as_view(), name="token_obtain_pair"),
+    path("api/token/", user_views.TokenPairView.as_view(), name="token_obtain_pair"),
     path("api/token/refresh/", TokenRefreshView.as_view(), name="token_refresh"),
     # Schema
-    path("api/schema/", SpectacularAPIView.as_view(), name="api-schema"),
+    path("api/schema/", schema_view, name="api-schema"),
     path(
         "api/docs/",
-        SpectacularSwaggerView.as_view(url_name="api-schema"),
+        lazy_view(
+            "drf_spectacular.views.SpectacularSwaggerView", url_name="api-schema"
+        ),
         name="api-docs",
     ),
     # Core
     path("api/", include("core.urls")),
+    # Async (ASGI) read endpoints
+    path("api/async/", include("core.async_urls")),
     # User
     path("api/user/", include("user.urls")),
     # Recipe
     path("api/recipe/", include("recipe.urls")),
-    # Silk - must be the last URL
-    path("silk/", include("silk.urls", namespace="silk")),
 ]
 
+if settings.SILK_ENABLED:
+    # Silk - must be the last URL
+    urlpatterns += [path("silk/", include("silk.urls", namespace="silk"))]
+
 if settings.DEBUG:
     urlpatterns += static(
         settings.MEDIA_URL,
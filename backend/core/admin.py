@@ -2,11 +2,124 @@
 Django admin customization.
 """
 
+import os
+
+from django.conf import settings
 from django.contrib import admin
 from django.contrib.auth.admin import UserAdmin as BaseUserAdmin
+from django.core.exceptions import PermissionDenied
+from django.core.paginator import Paginator
+from django.db import connection, transaction
+from django.http import FileResponse, Http404
+from django.shortcuts import get_object_or_404
+from django.urls import path, reverse
+from django.utils.functional import cached_property
+from django.utils.html import format_html
 from django.utils.translation import gettext_lazy as _
 
 from core import models
+from core.admin_jobs import dump_query
+from core.tasks import run_admin_job
+
+
+class EstimatedCountPaginator(Paginator):
+    """
+    Paginator that reads the row count of an unfiltered big table from the
+    planner statistics instead of running COUNT(*) over all of it.
+    """
+
+    @cached_property
+    def count(self):
+        query = getattr(self.object_list, "query", None)
+        if query is None or query.where:
+            return super().count
+        table = self.object_list.model._meta.db_table
+        with connection.cursor() as cursor:
+            # Partitioned tables keep their statistics on the partitions.
+            cursor.execute(
+                "SELECT SUM(GREATEST(reltuples, 0)) FROM pg_class "
+                "WHERE oid = %s::regclass "
+                "OR oid IN (SELECT relid FROM pg_partition_tree(%s))",
+                [table, table],
+            )
+            estimate = int(cursor.fetchone()[0] or 0)
+        if estimate < settings.ADMIN_ESTIMATED_COUNT_THRESHOLD:
+            return super().count
+        return estimate
+
+
+def start_job(modeladmin, request, queryset, kind, **params):
+    """
+    Record an AdminJob for the selected rows and hand it to a worker.
+
+    Ticked rows are at most a page, so their keys are stored. With "select
+    all" the job stores the changelist's query instead, resolved here for
+    this admin, and the worker finds and counts the rows.
+    """
+    if request.POST.get("select_across") == "1":
+        selection, total = {"query": dump_query(queryset)}, 0
+    else:
+        ids = list(queryset.values_list("pk", flat=True))
+        selection, total = {"ids": ids}, len(ids)
+    job = models.AdminJob.objects.create(
+        kind=kind,
+        model=queryset.model._meta.label_lower,
+        params={**selection, **params},
+        total=total,
+        created_by=request.user,
+    )
+    transaction.on_commit(lambda: run_admin_job.delay(job.pk))
+    url = reverse("admin:core_adminjob_change", args=[job.pk])
+    modeladmin.message_user(
+        request, format_html('Started <a href="{}">{}</a>.', url, job)
+    )
+
+
+@admin.action(
+    description="Delete selected %(verbose_name_plural)s in the background",
+    permissions=["delete"],
+)
+def delete_in_background(modeladmin, request, queryset):
+    start_job(modeladmin, request, queryset, models.AdminJob.KindChoices.DELETE)
+
+
+@admin.action(description="Export selected %(verbose_name_plural)s to CSV")
+def export_csv(modeladmin, request, queryset):
+    start_job(modeladmin, request, queryset, models.AdminJob.KindChoices.EXPORT)
+
+
+def status_action(status):
+    """Admin action moving the selected orders to `status`."""
+
+    @admin.action(
+        description=f"Mark selected orders as {status.label} in the background",
+        permissions=["change"],
+    )
+    def action(modeladmin, request, queryset):
+        start_job(
+            modeladmin,
+            request,
+            queryset,
+            models.AdminJob.KindChoices.STATUS,
+            status=status,
+        )
+
+    action.__name__ = f"mark_{status.lower()}"
+    return action
+
+
+class LargeTableAdmin(admin.ModelAdmin):
+    """Changelist settings for tables too big to count on every page view."""
+
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
+    actions = [delete_in_background, export_csv]
+
+    def get_actions(self, request):
+        # The built-in delete runs inside the request; use the job instead.
+        actions = super().get_actions(request)
+        actions.pop("delete_selected", None)
+        return actions
 
 
 class UserAdmin(BaseUserAdmin):
@@ -14,6 +127,9 @@ class UserAdmin(BaseUserAdmin):
 
     ordering = ["id"]
     list_display = ["email", "name"]
+    search_fields = ["email", "name"]
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
     fieldsets = (
         (None, {"fields": ("email", "password")}),
         (_("Permissions"), {"fields": ("is_active", "is_staff", "is_superuser")}),
@@ -41,16 +157,117 @@ class UserAdmin(BaseUserAdmin):
 
 class OrderItemInline(admin.TabularInline):
     model = models.OrderItem
+    extra = 0
+    autocomplete_fields = ["product"]
+    # Copied from the product when the item is saved.
+    readonly_fields = ["product_name", "unit_price", "subtotal"]
 
 
-class OrderAdmin(admin.ModelAdmin):
+class OrderAdmin(LargeTableAdmin):
     inlines = [OrderItemInline]
+    list_display = ["order_id", "user", "status", "total", "created_at"]
+    list_filter = ["status"]
+    list_select_related = ["user"]
+    autocomplete_fields = ["user"]
+    readonly_fields = ["total"]
+    actions = [
+        *LargeTableAdmin.actions,
+        *(
+            status_action(status)
+            for status in models.Order.StatusChoices
+            if models.Order.sources(status)
+        ),
+    ]
+
+
+class ProductAdmin(LargeTableAdmin):
+    list_display = ["name", "price", "stock"]
+    search_fields = ["name"]
+
+
+class RecipeAdmin(LargeTableAdmin):
+    list_display = ["title", "user", "time_minutes", "price"]
+    list_select_related = ["user"]
+    autocomplete_fields = ["user", "tags", "ingredients"]
+
+
+class RecipeAttrAdmin(LargeTableAdmin):
+    list_display = ["name", "user"]
+    list_select_related = ["user"]
+    search_fields = ["name"]
+    autocomplete_fields = ["user"]
+
+
+class AdminJobAdmin(admin.ModelAdmin):
+    """Progress of bulk admin actions; the jobs are created by the actions."""
+
+    list_display = [
+        "__str__",
+        "status",
+        "progress",
+        "download",
+        "created_by",
+        "created_at",
+        "finished_at",
+    ]
+    list_filter = ["status", "kind"]
+    list_select_related = ["created_by"]
+    exclude = ["params"]
+    readonly_fields = ["progress", "download"]
+
+    @admin.display(description="Progress")
+    def progress(self, obj):
+        return f"{obj.processed} / {obj.total}"
+
+    @admin.display(description="Result")
+    def download(self, obj):
+        if not obj.result:
+            return "-"
+        url = reverse("admin:core_adminjob_download", args=[obj.pk])
+        return format_html('<a href="{}">Download</a>', url)
+
+    def get_urls(self):
+        return [
+            path(
+                "<int:pk>/download/",
+                self.admin_site.admin_view(self.download_view),
+                name="core_adminjob_download",
+            ),
+            *super().get_urls(),
+        ]
+
+    def download_view(self, request, pk):
+        """
+        Stream a job's export to staff who may view both the job and the
+        exported model; the file is kept in private storage.
+        """
+        job = get_object_or_404(models.AdminJob, pk=pk)
+        app_label, model_name = job.model.split(".")
+        if not (
+            self.has_view_permission(request, job)
+            and request.user.has_perm(f"{app_label}.view_{model_name}")
+        ):
+            raise PermissionDenied
+        if not job.result:
+            raise Http404
+        return FileResponse(
+            job.result.open("rb"),
+            as_attachment=True,
+            filename=os.path.basename(job.result.name),
+        )
+
+    def has_add_permission(self, request):
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
 
 
+admin.site.register(models.AdminJob, AdminJobAdmin)
 admin.site.register(models.User, UserAdmin)
 admin.site.register(models.Order, OrderAdmin)
-admin.site.register(models.Product)
+admin.site.register(models.Product, ProductAdmin)
 
-admin.site.register(models.Recipe)
-admin.site.register(models.Tag)
-admin.site.register(models.Ingredient)
+admin.site.register(models.Recipe, RecipeAdmin)
+admin.site.register(models.Tag, RecipeAttrAdmin)
+admin.site.register(models.Ingredient, RecipeAttrAdmin)
@@ -0,0 +1,125 @@
+"""
+Bulk admin actions run by a Celery worker instead of the request.
+
+Admin actions create an AdminJob holding the selected primary keys or, when
+"select all" was used, the changelist's query as resolved for the admin who
+started it, and enqueue
+`core.tasks.run_admin_job`. The job pages through the selected rows in
+primary key order, ADMIN_JOB_BATCH_SIZE at a time, each batch in its own
+transaction, and records the last key handled after every batch; a retried
+job resumes after it.
+"""
+
+import base64
+import csv
+import io
+import pickle
+import tempfile
+
+from django.apps import apps
+from django.conf import settings
+from django.core.files import File
+from django.db import transaction
+from django.db.models import F
+from django.utils import timezone
+
+from core.caching import order_lists_changed
+from core.models import AdminJob, Order
+
+
+def _delete(model, ids, job):
+    model.objects.filter(pk__in=ids).delete()
+
+
+def _status(model, ids, job):
+    updated = Order.objects.transition(ids, job.params["status"])
+    order_lists_changed(user_id for _, user_id in updated)
+
+
+HANDLERS = {
+    AdminJob.KindChoices.DELETE: _delete,
+    AdminJob.KindChoices.STATUS: _status,
+}
+
+
+def dump_query(queryset):
+    """Serialize the query of `queryset`, without its ordering, for a job."""
+    return base64.b64encode(pickle.dumps(queryset.order_by().query)).decode()
+
+
+def _selection(model, job):
+    """Return the rows the action was run on."""
+    if "ids" in job.params:
+        return model.objects.filter(pk__in=job.params["ids"])
+    queryset = model.objects.all()
+    queryset.query = pickle.loads(base64.b64decode(job.params["query"]))
+    return queryset
+
+
+def _batches(model, job):
+    keys = _selection(model, job).order_by("pk").values_list("pk", flat=True)
+    size = settings.ADMIN_JOB_BATCH_SIZE
+    after = job.params.get("after")
+    while True:
+        page = keys if after is None else keys.filter(pk__gt=after)
+        ids = list(page[:size])
+        if not ids:
+            return
+        yield ids
+        after = ids[-1]
+
+
+def _advance(job, ids):
+    job.params["after"] = ids[-1]
+    AdminJob.objects.filter(pk=job.pk).update(
+        processed=F("processed") + len(ids), params=job.params
+    )
+
+
+def _export(model, job):
+    """Write the selected rows to a CSV file attached to the job."""
+    fields = [field.attname for field in model._meta.concrete_fields]
+    with tempfile.TemporaryFile("w+b") as tmp:
+        out = io.TextIOWrapper(tmp, encoding="utf-8", newline="")
+        writer = csv.writer(out)
+        writer.writerow(fields)
+        # The file is rebuilt from scratch, so start from the first row.
+        job.processed = 0
+        job.params.pop("after", None)
+        for ids in _batches(model, job):
+            rows = model.objects.filter(pk__in=ids).order_by("pk")
+            writer.writerows(rows.values_list(*fields))
+            job.processed += len(ids)
+            AdminJob.objects.filter(pk=job.pk).update(processed=job.processed)
+        out.flush()
+        tmp.seek(0)
+        job.result.save(f"{model._meta.model_name}-{job.pk}.csv", File(tmp))
+        out.detach()
+
+
+def run(job):
+    """Process every remaining batch of the job."""
+    model = apps.get_model(job.model)
+    AdminJob.objects.filter(pk=job.pk).update(status=AdminJob.StatusChoices.RUNNING)
+    try:
+        if not job.total:
+            job.total = _selection(model, job).count()
+            AdminJob.objects.filter(pk=job.pk).update(total=job.total)
+        if job.kind == AdminJob.KindChoices.EXPORT:
+            _export(model, job)
+        else:
+            handler = HANDLERS[job.kind]
+            for ids in _batches(model, job):
+                with transaction.atomic():
+                    handler(model, ids, job)
+                    _advance(job, ids)
+    except Exception as exc:
+        AdminJob.objects.filter(pk=job.pk).update(
+            status=AdminJob.StatusChoices.FAILED,
+            error=str(exc),
+            finished_at=timezone.now(),
+        )
+        raise
+    AdminJob.objects.filter(pk=job.pk).update(
+        status=AdminJob.StatusChoices.DONE, finished_at=timezone.now()
+    )
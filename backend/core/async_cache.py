@@ -0,0 +1,39 @@
+"""
+Async Redis client for the ASGI views.
+"""
+
+import asyncio
+import weakref
+
+from django.conf import settings
+from django.utils.module_loading import import_string
+
+# redis.asyncio connections belong to the loop that opened them. Under uvicorn
+# there is one loop per worker; under WSGI each async view gets a fresh loop.
+_clients = weakref.WeakKeyDictionary()
+
+
+def get_client():
+    """Return the async Redis client for the running event loop."""
+    loop = asyncio.get_running_loop()
+    client = _clients.get(loop)
+    if client is None:
+        client_class = import_string(settings.ASYNC_CACHE["CLIENT_CLASS"])
+        client = client_class.from_url(settings.ASYNC_CACHE["LOCATION"])
+        _clients[loop] = client
+    return client
+
+
+def make_key(prefix, request):
+    """Build a cache key from a prefix and the request's query string."""
+    return f"async:{prefix}:{request.get_full_path()}"
+
+
+async def get(key):
+    return await get_client().get(key)
+
+
+async def set(key, value, timeout=None):
+    if timeout is None:
+        timeout = settings.ASYNC_CACHE["TIMEOUT"]
+    await get_client().set(key, value, ex=timeout)
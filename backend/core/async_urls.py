@@ -0,0 +1,19 @@
+"""
+URL mappings for the async core views, served under ASGI.
+"""
+
+from django.urls import path
+
+from core import async_views
+
+urlpatterns = [
+    path("health-check/", async_views.health_check, name="async-health-check"),
+    path("products/", async_views.product_list, name="async-product-list"),
+    path("products/info/", async_views.product_info, name="async-product-info"),
+    path(
+        "products/<int:product_id>/",
+        async_views.product_detail,
+        name="async-product-detail",
+    ),
+    path("orders/", async_views.user_orders, name="async-user-orders"),
+]
@@ -0,0 +1,161 @@
+"""
+Async read views for the core app, served under ASGI.
+
+These mirror the DRF views in `core.views` for the hot read paths, using the
+async ORM and the async Redis client so a worker keeps serving other requests
+while it waits on PostgreSQL or Redis.
+"""
+
+from asgiref.sync import sync_to_async
+from django.db.models import Max
+from django.http import Http404, HttpResponse, JsonResponse
+from django.views.decorators.http import require_GET
+from rest_framework.exceptions import APIException
+from rest_framework.request import Request
+from rest_framework.settings import api_settings
+from rest_framework.utils.urls import remove_query_param, replace_query_param
+
+from core import async_cache
+from core.caching import get_version
+from core.models import Order, Product
+from core.renderers import ORJSONRenderer
+from core.serializers import (
+    OrderSerializer,
+    ProductInfoSerializer,
+    ProductSerializer,
+)
+from core.views import ProductListCreateAPIView
+
+
+def _json(data):
+    return HttpResponse(ORJSONRenderer().render(data), content_type="application/json")
+
+
+def _error(exc):
+    # Shaped like DRF's exception handler: field errors as they are, any
+    # other error under "detail".
+    data = exc.detail
+    if not isinstance(data, (list, dict)):
+        data = {"detail": data}
+    return JsonResponse(data, status=exc.status_code, safe=False)
+
+
+def _drf_request(request):
+    return Request(
+        request,
+        authenticators=[auth() for auth in api_settings.DEFAULT_AUTHENTICATION_CLASSES],
+    )
+
+
+async def _authenticate(request):
+    """Run the DRF authenticators and return the user, or None."""
+    drf_request = _drf_request(request)
+    user = await sync_to_async(lambda: drf_request.user)()
+    return user if user.is_authenticated else None
+
+
+@require_GET
+async def product_list(request):
+    """List products, with the same filters as `ProductListCreateAPIView`."""
+    # Keyed by the collection version, like the sync list, so a product
+    # change moves readers to a new key.
+    version = await sync_to_async(get_version)("products")
+    key = async_cache.make_key(f"product_list:{version}", request)
+    body = await async_cache.get(key)
+    if body is not None:
+        return HttpResponse(body, content_type="application/json")
+
+    view = ProductListCreateAPIView(
+        request=_drf_request(request), args=(), kwargs={}, format_kwarg=None
+    )
+    try:
+        queryset = view.filter_queryset(Product.objects.order_by("pk"))
+    except APIException as exc:
+        return _error(exc)
+
+    products = [product async for product in queryset]
+    response = _json(ProductSerializer(products, many=True).data)
+    await async_cache.set(key, response.content)
+    return response
+
+
+@require_GET
+async def product_detail(request, product_id):
+    """Retrieve a single product."""
+    try:
+        product = await Product.objects.aget(pk=product_id)
+    except Product.DoesNotExist:
+        raise Http404
+
+    return _json(ProductSerializer(product).data)
+
+
+@require_GET
+async def product_info(request):
+    """Return all products with their count and max price."""
+    queryset = Product.objects.all()
+    products = [product async for product in queryset]
+    aggregate = await queryset.aaggregate(max_price=Max("price"))
+
+    serializer = ProductInfoSerializer(
+        {
+            "products": products,
+            "count": len(products),
+            "max_price": aggregate["max_price"],
+        }
+    )
+    return _json(serializer.data)
+
+
+@require_GET
+async def user_orders(request):
+    """List the authenticated user's orders, paginated like the DRF views."""
+    try:
+        user = await _authenticate(request)
+    except APIException as exc:
+        return _error(exc)
+    if user is None:
+        return JsonResponse(
+            {"detail": "Authentication credentials were not provided."},
+            status=401,
+        )
+
+    try:
+        page = max(int(request.GET.get("page", 1)), 1)
+    except ValueError:
+        page = 1
+    page_size = api_settings.PAGE_SIZE
+
+    queryset = (
+        Order.objects.prefetch_related("items")
+        .filter(user=user)
+        .order_by("-created_at")
+    )
+    count = await queryset.acount()
+    start = (page - 1) * page_size
+    orders = [order async for order in queryset[start : start + page_size]]
+
+    url = request.build_absolute_uri()
+    next_url = None
+    if start + page_size < count:
+        next_url = replace_query_param(url, "page", page + 1)
+    previous_url = None
+    if page == 2:
+        previous_url = remove_query_param(url, "page")
+    elif page > 2:
+        previous_url = replace_query_param(url, "page", page - 1)
+
+    return _json(
+        {
+            "count": count,
+            "next": next_url,
+            "previous": previous_url,
+            "results": OrderSerializer(orders, many=True).data,
+        }
+    )
+
+
+@require_GET
+async def health_check(request):
+    """Return successful response for health check (liveness)."""
+    return JsonResponse({"healthy": True, "status": "ok"})
@@ -0,0 +1,44 @@
+"""
+Authentication classes shared by the API views.
+"""
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.utils.translation import gettext_lazy as _
+from rest_framework import exceptions
+from rest_framework.authentication import TokenAuthentication
+from rest_framework.authtoken.models import Token
+
+
+def token_cache_key(key):
+    """Return the cache key holding the user id for a DRF token."""
+    return f"auth_token:{key}"
+
+
+class CachedTokenAuthentication(TokenAuthentication):
+    """
+    DRF token authentication resolved through the cache.
+
+    Kept for clients that still hold tokens issued by `user:token` while they
+    move to JWT. The token table is only read on a cache miss.
+    """
+
+    def authenticate_credentials(self, key):
+        cache_key = token_cache_key(key)
+        user_id = cache.get(cache_key)
+
+        if user_id is None:
+            user_id = (
+                Token.objects.filter(key=key).values_list("user_id", flat=True).first()
+            )
+            if user_id is None:
+                raise exceptions.AuthenticationFailed(_("Invalid token."))
+            cache.set(cache_key, user_id, settings.AUTH_TOKEN_CACHE_TIMEOUT)
+
+        user = get_user_model().objects.filter(pk=user_id).first()
+        if user is None or not user.is_active:
+            cache.delete(cache_key)
+            raise exceptions.AuthenticationFailed(_("User inactive or deleted."))
+
+        return (user, key)
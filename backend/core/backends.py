@@ -0,0 +1,120 @@
+"""
+Authentication backends.
+"""
+
+import random
+import socket
+import time
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.contrib.auth.backends import ModelBackend
+from django.contrib.auth.hashers import make_password, verify_password
+from django.core.cache import cache
+from django.core.exceptions import PermissionDenied
+from django.utils.translation import gettext_lazy as _
+from redis.exceptions import LockError
+from rest_framework.exceptions import Throttled
+
+BUSY_MESSAGE = _("Too many concurrent logins, retry shortly.")
+
+
+class VerificationBusy(PermissionDenied):
+    """Every verification slot on this host stayed taken."""
+
+
+def slot_key(slot):
+    """Cache key of the lock behind one of this host's verification slots."""
+    return f"auth:verify:{socket.gethostname()}:{slot}"
+
+
+def _acquire_slot():
+    """Return a held slot lock, or None if none came free in time."""
+    slots = list(range(settings.AUTH_VERIFY_SLOTS))
+    deadline = time.monotonic() + settings.AUTH_VERIFY_QUEUE_TIMEOUT
+    while True:
+        random.shuffle(slots)
+        for slot in slots:
+            lock = cache.lock(slot_key(slot), timeout=settings.AUTH_VERIFY_LOCK_TIMEOUT)
+            if lock.acquire(blocking=False):
+                return lock
+        if time.monotonic() >= deadline:
+            return None
+        time.sleep(0.01)
+
+
+def run_bounded(func, *args):
+    """
+    Run a password hashing call in one of this host's verification slots.
+
+    The slots are Redis locks, so they bound hashing across every worker
+    process on the host, not only the threads of one. Raise VerificationBusy
+    when no slot comes free within AUTH_VERIFY_QUEUE_TIMEOUT seconds.
+    """
+    if not settings.AUTH_VERIFY_SLOTS:
+        return func(*args)
+
+    lock = _acquire_slot()
+    if lock is None:
+        raise VerificationBusy(BUSY_MESSAGE)
+    try:
+        return func(*args)
+    finally:
+        try:
+            lock.release()
+        except LockError:
+            # Expired while hashing; the slot is already free.
+            pass
+
+
+class BoundedModelBackend(ModelBackend):
+    """
+    ModelBackend that hashes passwords through `run_bounded`.
+
+    Only the hashing takes a slot, not the database access around it. Hashes
+    made with an outdated hasher or cost are replaced on login.
+
+    Finding no free slot raises VerificationBusy, which `django.contrib.auth.authenticate`
+    treats as a failed login. It also sets `verification_busy` on the request
+    so DRF views using VerificationBusyMixin can answer 429 instead.
+    """
+
+    def authenticate(self, request, username=None, password=None, **kwargs):
+        try:
+            return self._authenticate(request, username, password, **kwargs)
+        except VerificationBusy:
+            if request is not None:
+                request.verification_busy = True
+            raise
+
+    def _authenticate(self, request, username, password, **kwargs):
+        user_model = get_user_model()
+        if username is None:
+            username = kwargs.get(user_model.USERNAME_FIELD)
+        if username is None or password is None:
+            return None
+
+        try:
+            user = user_model._default_manager.get_by_natural_key(username)
+        except user_model.DoesNotExist:
+            # Hash anyway to keep the timing close to an existing user's.
+            run_bounded(make_password, password)
+            return None
+
+        is_correct, must_update = run_bounded(verify_password, password, user.password)
+        if not is_correct:
+            return None
+        if must_update:
+            user.password = run_bounded(make_password, password)
+            user.save(update_fields=["password"])
+
+        return user if self.user_can_authenticate(user) else None
+
+
+class VerificationBusyMixin:
+    """Answer 429 when the view's login found no free verification slot."""
+
+    def handle_exception(self, exc):
+        if getattr(self.request, "verification_busy", False):
+            exc = Throttled(detail=BUSY_MESSAGE)
+        return super().handle_exception(exc)
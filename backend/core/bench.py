@@ -0,0 +1,17 @@
+"""
+Tasks for the `bench_tasks` command.
+
+Kept out of `core.tasks`, so only a worker started with `--include
+core.bench` registers them.
+"""
+
+from celery import shared_task
+from django.core.cache import cache
+
+from core.tasks import LightTask
+
+
+@shared_task(base=LightTask, ignore_result=False)
+def noop(key):
+    """Count a finished task for `bench_tasks`, which decides on its result."""
+    cache.incr(key)
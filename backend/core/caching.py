@@ -0,0 +1,186 @@
+"""
+Cache helpers shared by the API views.
+"""
+
+import hashlib
+import math
+import random
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.utils.cache import get_conditional_response
+from redis.exceptions import LockError
+from rest_framework.response import Response
+
+from core import outbox
+
+
+def _version_key(name):
+    return f"version:{name}"
+
+
+def get_version(name):
+    """
+    Return the current version of a collection.
+
+    Versions start from the clock rather than 1, so a version lost to a cache
+    flush never repeats one that clients may still hold in an ETag.
+    """
+    key = _version_key(name)
+    version = cache.get(key)
+    if version is None:
+        cache.add(key, time.time_ns(), timeout=None)
+        version = cache.get(key)
+    return version
+
+
+def bump_version(name):
+    """Move a collection to a new version after one of its members changed."""
+    try:
+        cache.incr(_version_key(name))
+    except ValueError:
+        cache.add(_version_key(name), time.time_ns(), timeout=None)
+
+
+def make_etag(*parts):
+    """Build a quoted ETag from the given parts."""
+    digest = hashlib.md5(":".join(str(part) for part in parts).encode())
+    return f'"{digest.hexdigest()}"'
+
+
+def order_list_scope(user):
+    """Version name of the orders a user's order list shows."""
+    return "orders" if user.is_staff else f"orders:{user.pk}"
+
+
+def bump_order_lists(user_ids):
+    """Invalidate the cached order lists of these users and of staff."""
+    for user_id in set(user_ids):
+        bump_version(f"orders:{user_id}")
+    bump_version("orders")
+
+
+def order_lists_changed(user_ids):
+    """
+    Invalidate these users' and staff's order lists once the current
+    transaction commits.
+
+    The outbox event, written in the same transaction, repeats the
+    invalidation in case this process stops before the on_commit callback.
+    """
+    user_ids = sorted(set(user_ids))
+    if not user_ids:
+        return
+    key = f"orders:{user_ids[0]}" if len(user_ids) == 1 else ""
+    outbox.enqueue("order.changed", key=key, user_ids=user_ids)
+    transaction.on_commit(lambda: bump_order_lists(user_ids))
+
+
+def _is_fresh(entry, version, early=True):
+    if entry["version"] != version:
+        return False
+    now = time.time()
+    if early:
+        # XFetch: treat the entry as expired a little early, with a chance
+        # that grows towards the expiry and with the time it took to compute.
+        now -= (
+            entry["delta"] * settings.CACHE_XFETCH_BETA * math.log(1 - random.random())
+        )
+    return now < entry["expiry"]
+
+
+def _compute(key, version, compute, timeout):
+    began = time.monotonic()
+    value = compute()
+    entry = {
+        "value": value,
+        "version": version,
+        "delta": time.monotonic() - began,
+        "expiry": time.time() + timeout,
+    }
+    cache.set(key, entry, timeout + settings.CACHE_STALE_TIMEOUT)
+    return value, version
+
+
+def get_or_compute(key, version, compute, timeout):
+    """
+    Return the value cached under `key` and the version it was computed at.
+
+    An entry is fresh for `timeout` seconds while the collection is still at
+    `version`. Otherwise one request at a time, holding a Redis lock, calls
+    `compute()` and stores a new entry. Meanwhile other requests get the
+    stale entry, which is kept CACHE_STALE_TIMEOUT seconds past its expiry.
+    If there is no entry at all, they wait up to CACHE_LOCK_WAIT seconds for
+    the new one. Entries are also recomputed shortly before they expire, at
+    random, so a busy key is refreshed before every request misses it.
+    """
+    entry = cache.get(key)
+    if entry is not None and _is_fresh(entry, version):
+        return entry["value"], entry["version"]
+
+    lock = cache.lock(f"{key}:lock", timeout=settings.CACHE_LOCK_TIMEOUT)
+    if lock.acquire(blocking=False):
+        try:
+            # The previous holder may have stored a new entry since we looked.
+            latest = cache.get(key)
+            if (
+                latest is not None
+                and (entry is None or latest["expiry"] != entry["expiry"])
+                and _is_fresh(latest, version, early=False)
+            ):
+                return latest["value"], latest["version"]
+            return _compute(key, version, compute, timeout)
+        finally:
+            try:
+                lock.release()
+            except LockError:
+                # Expired while computing; nothing left to release.
+                pass
+
+    if entry is not None:
+        return entry["value"], entry["version"]
+    deadline = time.monotonic() + settings.CACHE_LOCK_WAIT
+    while time.monotonic() < deadline:
+        time.sleep(0.05)
+        entry = cache.get(key)
+        if entry is not None:
+            return entry["value"], entry["version"]
+    return _compute(key, version, compute, timeout)
+
+
+class CachedListMixin:
+    """
+    Serve `list` from the cache, per version of `get_list_cache_scope()` and
+    query string, through `get_or_compute`.
+
+    The ETag names the version of the list actually sent, which is the
+    previous one while another request computes the new list.
+    """
+
+    list_cache_scope = None
+    list_cache_timeout = None
+
+    def get_list_cache_scope(self):
+        return self.list_cache_scope
+
+    def list(self, request, *args, **kwargs):
+        scope = self.get_list_cache_scope()
+        path = request.get_full_path()
+        version = get_version(scope)
+        etag = make_etag(scope, version, path)
+        response = get_conditional_response(request, etag=etag)
+        if response is None:
+
+            def compute():
+                return super(CachedListMixin, self).list(request, *args, **kwargs).data
+
+            digest = hashlib.md5(path.encode()).hexdigest()
+            data, version = get_or_compute(
+                f"list:{scope}:{digest}", version, compute, self.list_cache_timeout
+            )
+            etag = make_etag(scope, version, path)
+            response = get_conditional_response(request, etag=etag) or Response(data)
+        response["ETag"] = etag
+        return response
@@ -0,0 +1,128 @@
+"""
+Dependency probes for the readiness check.
+"""
+
+import math
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, wait
+
+import redis
+from django.conf import settings
+from django.db import connections
+
+
+def database_probe_connection():
+    """
+    Return a new connection to the default database that gives up connecting
+    and running statements after HEALTH_CHECK_TIMEOUT.
+    """
+    timeout = settings.HEALTH_CHECK_TIMEOUT
+    connection = connections.create_connection("default")
+    options = connection.settings_dict["OPTIONS"]
+    statement_timeout = f"-c statement_timeout={int(timeout * 1000)}"
+    connection.settings_dict = {
+        **connection.settings_dict,
+        "OPTIONS": {
+            **options,
+            # libpq takes whole seconds.
+            "connect_timeout": max(1, math.ceil(timeout)),
+            "options": f"{options.get('options', '')} {statement_timeout}".strip(),
+        },
+    }
+    return connection
+
+
+def probe_database():
+    """Run `SELECT 1` on the default database."""
+    connection = database_probe_connection()
+    try:
+        with connection.cursor() as cursor:
+            cursor.execute("SELECT 1")
+    finally:
+        connection.close()
+
+
+def probe_cache():
+    """Ping the Redis server behind the default cache."""
+    timeout = settings.HEALTH_CHECK_TIMEOUT
+    with redis.Redis.from_url(
+        settings.CACHES["default"]["LOCATION"],
+        socket_timeout=timeout,
+        socket_connect_timeout=timeout,
+    ) as client:
+        client.ping()
+
+
+def probe_broker():
+    """Open a connection to the Celery broker."""
+    from backend.celery import app
+
+    timeout = settings.HEALTH_CHECK_TIMEOUT
+    with app.connection_for_write(connect_timeout=timeout) as connection:
+        connection.ensure_connection(max_retries=1, timeout=timeout)
+
+
+PROBES = {
+    "database": probe_database,
+    "cache": probe_cache,
+    "broker": probe_broker,
+}
+
+_lock = threading.Lock()
+_cached = None  # (expires_at, results)
+
+
+def _timed(probe):
+    start = time.perf_counter()
+    probe()
+    return round((time.perf_counter() - start) * 1000, 1)
+
+
+def run_probes(probes=None, timeout=None):
+    """
+    Run the probes concurrently and return a result per probe.
+
+    Each probe gets at most `timeout` seconds. A probe that is still running
+    after that is reported as timed out and left to finish on its own thread;
+    the probes set their own connect and read timeouts, so it does finish.
+    """
+    probes = PROBES if probes is None else probes
+    timeout = settings.HEALTH_CHECK_TIMEOUT if timeout is None else timeout
+
+    executor = ThreadPoolExecutor(max_workers=len(probes))
+    futures = {name: executor.submit(_timed, probe) for name, probe in probes.items()}
+    wait(futures.values(), timeout=timeout)
+    executor.shutdown(wait=False)
+
+    results = {}
+    for name, future in futures.items():
+        if not future.done():
+            results[name] = {"ok": False, "error": "timeout"}
+        elif future.exception() is not None:
+            results[name] = {"ok": False, "error": str(future.exception())}
+        else:
+            results[name] = {"ok": True, "latency_ms": future.result()}
+    return results
+
+
+def check_dependencies():
+    """
+    Return the probe results, reusing them for HEALTH_CHECK_CACHE_SECONDS.
+
+    Results are kept in process memory rather than Redis, since Redis is one
+    of the things being checked. Concurrent callers wait for a single run.
+    """
+    global _cached
+    with _lock:
+        now = time.monotonic()
+        if _cached is None or _cached[0] <= now:
+            results = run_probes()
+            _cached = (time.monotonic() + settings.HEALTH_CHECK_CACHE_SECONDS, results)
+        return _cached[1]
+
+
+def clear_cache():
+    global _cached
+    with _lock:
+        _cached = None
@@ -0,0 +1,133 @@
+"""
+Idempotency-Key support for POST endpoints.
+"""
+
+import hashlib
+import json
+
+from django.conf import settings
+from django.core.cache import cache
+from redis.exceptions import LockError
+from rest_framework import exceptions, serializers, status
+from rest_framework.response import Response
+from rest_framework_simplejwt.authentication import (
+    JWTAuthentication,
+    JWTStatelessUserAuthentication,
+)
+
+
+class IdempotentCreateMixin:
+    """
+    Make `create` safe to retry by sending an `Idempotency-Key` header.
+
+    The first response for a key is kept in the cache for
+    IDEMPOTENCY_KEY_TIMEOUT seconds and replayed to later requests with the
+    same key and body. A retry arriving while the first request is still
+    running waits on a lock, so the create runs once.
+
+    A replay for a JWT-authenticated user doesn't touch the database: the user
+    is taken from the validated token's claims instead of the user table, so
+    it is replayed for as long as the token is valid, even if the user has
+    been deactivated since.
+    """
+
+    idempotency_header = "Idempotency-Key"
+
+    def _idempotency_cache_key(self, user_id, key):
+        digest = hashlib.sha256(key.encode()).hexdigest()
+        return f"idempotency:{type(self).__name__}:{user_id}:{digest}"
+
+    def _token_user(self, request):
+        """Return (user, token) from a valid JWT without a database query."""
+        if not any(
+            isinstance(authenticator, JWTAuthentication)
+            for authenticator in self.get_authenticators()
+        ):
+            return None
+        try:
+            return JWTStatelessUserAuthentication().authenticate(request)
+        except exceptions.AuthenticationFailed:
+            return None
+
+    def initial(self, request, *args, **kwargs):
+        """Find a stored response before authentication reads the user."""
+        self._stored_response = None
+        key = request.headers.get(self.idempotency_header)
+        if request.method == "POST" and key:
+            token_user = self._token_user(request)
+            if token_user is not None:
+                user, token = token_user
+                stored = cache.get(self._idempotency_cache_key(user.pk, key))
+                if stored is not None:
+                    # Permission and throttle checks see the token's user.
+                    request.user, request.auth = user, token
+                    self._stored_response = stored
+        super().initial(request, *args, **kwargs)
+
+    def _fingerprint(self, request):
+        body = json.dumps(request.data, sort_keys=True, default=str)
+        return hashlib.sha256(body.encode()).hexdigest()
+
+    def _replay(self, stored, fingerprint):
+        if stored["fingerprint"] != fingerprint:
+            return Response(
+                {"detail": "This Idempotency-Key was used with a different request."},
+                status=status.HTTP_422_UNPROCESSABLE_ENTITY,
+            )
+        return Response(
+            stored["data"],
+            status=stored["status"],
+            headers={**stored["headers"], "Idempotent-Replayed": "true"},
+        )
+
+    def create(self, request, *args, **kwargs):
+        key = request.headers.get(self.idempotency_header)
+        if not key:
+            return super().create(request, *args, **kwargs)
+        if len(key) > 255:
+            raise serializers.ValidationError(
+                {self.idempotency_header: "Use at most 255 characters."}
+            )
+
+        fingerprint = self._fingerprint(request)
+        if self._stored_response is not None:
+            return self._replay(self._stored_response, fingerprint)
+        cache_key = self._idempotency_cache_key(request.user.pk, key)
+        stored = cache.get(cache_key)
+        if stored is not None:
+            return self._replay(stored, fingerprint)
+
+        lock = cache.lock(
+            f"{cache_key}:lock",
+            timeout=settings.IDEMPOTENCY_LOCK_TIMEOUT,
+            blocking_timeout=settings.IDEMPOTENCY_LOCK_WAIT,
+        )
+        if not lock.acquire():
+            return Response(
+                {"detail": "A request with this Idempotency-Key is in progress."},
+                status=status.HTTP_409_CONFLICT,
+            )
+        try:
+            # The request holding the lock before us may have finished it.
+            stored = cache.get(cache_key)
+            if stored is not None:
+                return self._replay(stored, fingerprint)
+
+            response = super().create(request, *args, **kwargs)
+            cache.set(
+                cache_key,
+                {
+                    "fingerprint": fingerprint,
+                    "status": response.status_code,
+                    "data": response.data,
+                    "headers": dict(response.headers),
+                },
+                settings.IDEMPOTENCY_KEY_TIMEOUT,
+            )
+            return response
+        finally:
+            try:
+                lock.release()
+            except LockError:
+                # Expired while the request ran; nothing left to release.
+                pass
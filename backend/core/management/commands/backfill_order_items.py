@@ -0,0 +1,53 @@
+"""
+Django command to copy product names and prices onto existing order items.
+"""
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.db.models import F, OuterRef, Subquery
+
+from core.models import Order, OrderItem, Product
+
+
+class Command(BaseCommand):
+    """Django command to backfill order item snapshots and order totals."""
+
+    help = (
+        "Fill in product_name, unit_price and subtotal of order items created "
+        "before they were stored, using the products' current values, and "
+        "recompute the affected order totals. Safe to interrupt and rerun."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=1000)
+
+    def handle(self, *args, **options):
+        """Entry point for the command."""
+        products = Product.objects.filter(pk=OuterRef("product"))
+        price = Subquery(products.values("price"))
+        pending = OrderItem.objects.filter(product_name="").order_by("pk")
+
+        count = 0
+        last_pk = 0
+        while True:
+            batch = list(
+                pending.filter(pk__gt=last_pk).values_list("pk", "order")[
+                    : options["batch_size"]
+                ]
+            )
+            if not batch:
+                break
+            last_pk = batch[-1][0]
+            with transaction.atomic():
+                OrderItem.objects.filter(pk__in=[pk for pk, _ in batch]).update(
+                    product_name=Subquery(products.values("name")),
+                    unit_price=price,
+                    subtotal=price * F("quantity"),
+                )
+                Order.objects.filter(
+                    pk__in={order for _, order in batch}
+                ).update_totals()
+            count += len(batch)
+            self.stdout.write(f"Backfilled {count} order items")
+
+        self.stdout.write(self.style.SUCCESS(f"Backfilled {count} order items."))
@@ -0,0 +1,66 @@
+"""
+Django command to load test HTTP endpoints with concurrent requests.
+"""
+
+import statistics
+import time
+import urllib.error
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+
+from django.core.management.base import BaseCommand
+
+
+def _fetch(url, headers, timeout):
+    start = time.perf_counter()
+    request = urllib.request.Request(url, headers=headers)
+    try:
+        with urllib.request.urlopen(request, timeout=timeout) as response:
+            response.read()
+            ok = response.status < 400
+    except (urllib.error.URLError, TimeoutError):
+        ok = False
+    return ok, time.perf_counter() - start
+
+
+class Command(BaseCommand):
+    """Django command to compare endpoint throughput under concurrency."""
+
+    help = (
+        "Fire concurrent GET requests at each URL and report throughput, "
+        "e.g. /api/products/ (uWSGI) against /api/async/products/ (ASGI)."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("urls", nargs="+")
+        parser.add_argument("--requests", type=int, default=1000)
+        parser.add_argument("--concurrency", type=int, default=50)
+        parser.add_argument("--timeout", type=float, default=10)
+        parser.add_argument("--token", help="JWT access token for the requests.")
+
+    def handle(self, *args, **options):
+        """Entry point for the command."""
+        headers = {}
+        if options["token"]:
+            headers["Authorization"] = f"Bearer {options['token']}"
+
+        for url in options["urls"]:
+            with ThreadPoolExecutor(max_workers=options["concurrency"]) as pool:
+                start = time.perf_counter()
+                results = list(
+                    pool.map(
+                        lambda _: _fetch(url, headers, options["timeout"]),
+                        range(options["requests"]),
+                    )
+                )
+                elapsed = time.perf_counter() - start
+
+            latencies = sorted(latency for _, latency in results)
+            errors = sum(1 for ok, _ in results if not ok)
+            p95 = latencies[int(len(latencies) * 0.95) - 1]
+            self.stdout.write(
+                f"{url}\n"
+                f"  {len(results) / elapsed:8.1f} req/s  "
+                f"p50 {statistics.median(latencies) * 1000:7.1f} ms  "
+                f"p95 {p95 * 1000:7.1f} ms  errors {errors}"
+            )
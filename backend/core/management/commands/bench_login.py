@@ -0,0 +1,75 @@
+"""
+Django command to benchmark login throughput per password hasher.
+"""
+
+import time
+
+from django.contrib.auth import authenticate, get_user_model
+from django.contrib.auth.hashers import (
+    Argon2PasswordHasher,
+    PBKDF2PasswordHasher,
+    ScryptPasswordHasher,
+)
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.test.utils import override_settings
+
+from core.hashers import (
+    TunedArgon2PasswordHasher,
+    TunedPBKDF2PasswordHasher,
+    TunedScryptPasswordHasher,
+)
+
+HASHERS = [
+    ("pbkdf2 (Django default)", PBKDF2PasswordHasher),
+    ("pbkdf2 (PBKDF2_ITERATIONS)", TunedPBKDF2PasswordHasher),
+    ("argon2 (Django default)", Argon2PasswordHasher),
+    ("argon2 (ARGON2_*)", TunedArgon2PasswordHasher),
+    ("scrypt (Django default)", ScryptPasswordHasher),
+    ("scrypt (SCRYPT_*)", TunedScryptPasswordHasher),
+]
+
+
+class Command(BaseCommand):
+    """Django command to benchmark logins through the authentication backends."""
+
+    help = (
+        "Measure logins per second on a single worker, through authenticate() "
+        "with the user lookup and the verification slots. The benchmark user "
+        "is rolled back afterwards."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--rounds", type=int, default=20)
+        parser.add_argument("--email", default="login-bench@example.com")
+
+    def _bench(self, email, password, rounds):
+        """Return the seconds `rounds` logins of a new user take."""
+        with transaction.atomic():
+            get_user_model().objects.create_user(email=email, password=password)
+            start = time.perf_counter()
+            for _ in range(rounds):
+                if authenticate(username=email, password=password) is None:
+                    raise CommandError(f"Login as {email} failed.")
+            elapsed = time.perf_counter() - start
+            transaction.set_rollback(True)
+        return elapsed
+
+    def handle(self, *args, **options):
+        """Entry point for the command."""
+        rounds = options["rounds"]
+        password = "benchmark-password"
+
+        for label, hasher_class in HASHERS:
+            hasher = f"{hasher_class.__module__}.{hasher_class.__qualname__}"
+            try:
+                with override_settings(PASSWORD_HASHERS=[hasher]):
+                    elapsed = self._bench(options["email"], password, rounds)
+            except ValueError as exc:
+                self.stdout.write(f"{label:<28} skipped: {exc}")
+                continue
+
+            self.stdout.write(
+                f"{label:<28} {rounds / elapsed:8.1f} logins/s "
+                f"{elapsed / rounds * 1000:8.1f} ms/login"
+            )
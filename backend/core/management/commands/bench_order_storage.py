@@ -0,0 +1,128 @@
+"""
+Django command to compare order table layouts on generated data.
+"""
+
+import random
+import statistics
+import time
+import uuid
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+from django.db import connection
+from django.utils import timezone
+
+from core.ids import uuid7
+from core.management.commands.partition_orders import add_months, parse_month
+
+COLUMNS = (
+    "order_id uuid NOT NULL, created_at timestamptz NOT NULL, "
+    "status varchar(10) NOT NULL, user_id bigint NOT NULL, total numeric(12, 2)"
+)
+LAYOUTS = ("uuid4", "uuid7", "partitioned")
+
+
+class Command(BaseCommand):
+    """Django command to time order inserts and date range queries."""
+
+    help = (
+        "Insert generated orders, spread over --months months in time order, "
+        "into a uuid4 keyed table (the old layout), a uuid7 keyed table and a "
+        "uuid7 table partitioned by month, then time one-day range queries on "
+        "each. The tables are dropped afterwards unless --keep."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--orders", type=int, default=1_000_000)
+        parser.add_argument("--months", type=int, default=12)
+        parser.add_argument("--batch-size", type=int, default=10_000)
+        parser.add_argument("--repeat", type=int, default=50)
+        parser.add_argument("--keep", action="store_true")
+
+    def _create(self, cursor, layout, start, months):
+        table = f"bench_orders_{layout}"
+        cursor.execute(f"DROP TABLE IF EXISTS {table}")
+        if layout != "partitioned":
+            cursor.execute(f"CREATE TABLE {table} ({COLUMNS}, PRIMARY KEY (order_id))")
+        else:
+            cursor.execute(
+                f"CREATE TABLE {table} ({COLUMNS}, PRIMARY KEY (order_id, created_at)) "
+                "PARTITION BY RANGE (created_at)"
+            )
+            for i in range(months + 1):
+                month = add_months(start, i)
+                cursor.execute(
+                    f"CREATE TABLE {table}_p{month:%Y_%m} PARTITION OF {table} "
+                    f"FOR VALUES FROM ('{month.isoformat()}') "
+                    f"TO ('{add_months(month, 1).isoformat()}')"
+                )
+        cursor.execute(f"CREATE INDEX ON {table} (created_at)")
+        return table
+
+    def _insert(self, cursor, table, layout, start, span, options):
+        rng = random.Random(0)
+        count = options["orders"]
+        elapsed = 0.0
+        for offset in range(0, count, options["batch_size"]):
+            rows = []
+            for i in range(offset, min(offset + options["batch_size"], count)):
+                created_at = start + span * i / count
+                order_id = uuid.uuid4() if layout == "uuid4" else uuid7(created_at)
+                rows.append((order_id, created_at, "Pending", rng.randint(1, 1000), 1))
+            began = time.perf_counter()
+            with cursor.copy(
+                f"COPY {table} (order_id, created_at, status, user_id, total) "
+                "FROM STDIN"
+            ) as copy:
+                for row in rows:
+                    copy.write_row(row)
+            elapsed += time.perf_counter() - began
+        cursor.execute(f"ANALYZE {table}")
+        return count / elapsed
+
+    def _query(self, cursor, table, start, span, repeat):
+        rng = random.Random(1)
+        sql = (
+            f"SELECT count(*), sum(total) FROM {table} "
+            "WHERE created_at >= %s AND created_at < %s"
+        )
+        timings = []
+        for _ in range(repeat):
+            day = start + span * rng.random()
+            began = time.perf_counter()
+            cursor.execute(sql, [day, day + timedelta(days=1)])
+            cursor.fetchall()
+            timings.append(time.perf_counter() - began)
+        cursor.execute(f"EXPLAIN {sql}", [start, start + timedelta(days=1)])
+        plan = "\n".join(row[0] for row in cursor.fetchall())
+        return statistics.median(timings), plan
+
+    def _size(self, cursor, table):
+        cursor.execute(
+            "SELECT pg_size_pretty(sum(pg_indexes_size(oid))) FROM pg_class "
+            "WHERE oid = %s::regclass "
+            "OR oid IN (SELECT relid FROM pg_partition_tree(%s))",
+            [table, table],
+        )
+        return cursor.fetchone()[0]
+
+    def handle(self, *args, **options):
+        """Entry point for the command."""
+        now = timezone.now()
+        start = add_months(parse_month(f"{now:%Y-%m}"), -options["months"])
+        span = now - start
+
+        with connection.cursor() as cursor:
+            for layout in LAYOUTS:
+                table = self._create(cursor, layout, start, options["months"])
+                rate = self._insert(cursor, table, layout, start, span, options)
+                size = self._size(cursor, table)
+                p50, plan = self._query(cursor, table, start, span, options["repeat"])
+                self.stdout.write(
+                    f"{layout:<12} insert {rate:10.0f} rows/s  "
+                    f"day range p50 {p50 * 1000:8.2f} ms  indexes {size}"
+                )
+                if options["verbosity"] > 1:
+                    self.stdout.write(plan)
+                if not options["keep"]:
+                    cursor.execute(f"DROP TABLE {table}")
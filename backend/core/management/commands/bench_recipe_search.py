@@ -0,0 +1,90 @@
+"""
+Django command to benchmark recipe search on a large generated data set.
+"""
+
+import random
+import statistics
+import time
+from decimal import Decimal
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+
+from core.models import Recipe
+from recipe import search
+
+WORDS = (
+    "chicken beef tofu salmon rice pasta noodle bread soup stew curry salad "
+    "tomato garlic onion pepper lemon ginger basil cheese mushroom spinach "
+    "potato carrot bean lentil chili honey butter yogurt roasted grilled baked "
+    "fried spicy sweet smoky creamy quick easy weeknight family holiday"
+).split()
+
+QUERIES = ("chicken curry", "roasted garlic potato", "spicy", "salmn", "lentil stew")
+
+
+class Command(BaseCommand):
+    """Django command to time search queries over many recipes."""
+
+    help = (
+        "Generate recipes for a benchmark user, then report search latency "
+        "and the query plan. The recipes are removed afterwards unless --keep."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--recipes", type=int, default=1_000_000)
+        parser.add_argument("--batch-size", type=int, default=10_000)
+        parser.add_argument("--repeat", type=int, default=20)
+        parser.add_argument("--email", default="search-bench@example.com")
+        parser.add_argument("--keep", action="store_true")
+
+    def _generate(self, user, count, batch_size):
+        rng = random.Random(0)
+        start = time.perf_counter()
+        for offset in range(0, count, batch_size):
+            with transaction.atomic():
+                recipes = Recipe.objects.bulk_create(
+                    Recipe(
+                        user=user,
+                        title=" ".join(rng.sample(WORDS, 3)).title(),
+                        description=" ".join(rng.choices(WORDS, k=20)),
+                        time_minutes=rng.randint(5, 120),
+                        price=Decimal(rng.randint(100, 5000)) / 100,
+                    )
+                    for _ in range(min(batch_size, count - offset))
+                )
+                search.refresh([recipe.pk for recipe in recipes])
+        with connection.cursor() as cursor:
+            cursor.execute("ANALYZE core_recipe")
+        self.stdout.write(
+            f"Generated {count} recipes in {time.perf_counter() - start:.1f} s"
+        )
+
+    def handle(self, *args, **options):
+        """Entry point for the command."""
+        user, _ = get_user_model().objects.get_or_create(email=options["email"])
+        existing = Recipe.objects.filter(user=user).count()
+        if existing < options["recipes"]:
+            self._generate(user, options["recipes"] - existing, options["batch_size"])
+
+        recipes = Recipe.objects.filter(user=user)
+        for text in QUERIES:
+            timings = []
+            for _ in range(options["repeat"]):
+                start = time.perf_counter()
+                list(search.search(recipes, text).order_by("-rank", "-id")[:5])
+                timings.append(time.perf_counter() - start)
+            self.stdout.write(
+                f"{text!r:<26} p50 {statistics.median(timings) * 1000:8.1f} ms  "
+                f"max {max(timings) * 1000:8.1f} ms"
+            )
+
+        self.stdout.write(search.search(recipes, QUERIES[0]).explain(analyze=True))
+
+        if not options["keep"]:
+            # The generated recipes have no tags, ingredients or facet rows,
+            # so skip the per-recipe delete signals.
+            with connection.cursor() as cursor:
+                cursor.execute("DELETE FROM core_recipe WHERE user_id = %s", [user.pk])
+            user.delete()
@@ -0,0 +1,80 @@
+"""
+Django command to benchmark JSON rendering and compression of large payloads.
+"""
+
+import time
+import uuid
+from decimal import Decimal
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+from django.utils.text import compress_string
+from rest_framework.renderers import JSONRenderer
+
+from core.middleware import brotli
+from core.renderers import ORJSONRenderer
+
+
+def make_orders(count):
+    """Build an order list shaped like `OrderSerializer` output."""
+    now = timezone.now()
+    return [
+        {
+            "order_id": uuid.uuid4(),
+            "user": i % 100,
+            "status": "Pending",
+            "created_at": now,
+            "items": [
+                {
+                    "product_name": f"Product {j}",
+                    "product_price": f"{j}.99",
+                    "quantity": j,
+                    "item_subtotal": Decimal(f"{j * j}.99"),
+                }
+                for j in range(1, 4)
+            ],
+            "total_price": Decimal("123.45"),
+        }
+        for i in range(count)
+    ]
+
+
+class Command(BaseCommand):
+    """Django command to compare renderers and encodings on large payloads."""
+
+    help = (
+        "Time JSONRenderer against ORJSONRenderer on an order list and report "
+        "the bytes on the wire for each content encoding."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--rows", type=int, default=10000)
+        parser.add_argument("--repeat", type=int, default=10)
+
+    def handle(self, *args, **options):
+        """Entry point for the command."""
+        data = make_orders(options["rows"])
+
+        for renderer in (JSONRenderer(), ORJSONRenderer()):
+            start = time.perf_counter()
+            for _ in range(options["repeat"]):
+                body = renderer.render(data)
+            elapsed = (time.perf_counter() - start) / options["repeat"]
+            self.stdout.write(
+                f"{type(renderer).__name__:<16} {elapsed * 1000:8.1f} ms/render"
+            )
+
+        # Same settings as CompressionMiddleware.
+        encodings = {"identity": lambda content: content, "gzip": compress_string}
+        if brotli is not None:
+            encodings["br"] = lambda content: brotli.compress(
+                content, quality=settings.BROTLI_QUALITY
+            )
+        for name, compress in encodings.items():
+            start = time.perf_counter()
+            size = len(compress(body))
+            elapsed = time.perf_counter() - start
+            self.stdout.write(
+                f"{name:<16} {size / 1024:8.1f} KiB  {elapsed * 1000:8.1f} ms"
+            )
@@ -0,0 +1,62 @@
+"""
+Django command to measure Celery task throughput against running workers.
+"""
+
+import time
+import uuid
+
+from django.core.cache import cache
+from django.core.management.base import BaseCommand, CommandError
+
+from core.bench import noop
+
+
+class Command(BaseCommand):
+    """Django command to time publishing and running no-op tasks."""
+
+    help = (
+        "Publish --tasks no-op tasks to --queue and wait until a worker has "
+        "run all of them, reporting publish and end-to-end rates. Start a "
+        "worker for the queue with --include core.bench first. --store-results "
+        "stores each task's result, to compare against the default of ignoring "
+        "them."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--tasks", type=int, default=10_000)
+        parser.add_argument("--queue", default="default")
+        parser.add_argument("--store-results", action="store_true")
+        parser.add_argument("--timeout", type=float, default=300)
+
+    def handle(self, *args, **options):
+        """Entry point for the command."""
+        count = options["tasks"]
+        key = f"bench_tasks:{uuid.uuid4().hex}"
+        cache.set(key, 0, None)
+
+        began = time.perf_counter()
+        for _ in range(count):
+            noop.apply_async(
+                (key,),
+                queue=options["queue"],
+                ignore_result=not options["store_results"],
+            )
+        published = time.perf_counter() - began
+
+        deadline = began + options["timeout"]
+        while (done := cache.get(key)) < count:
+            if time.perf_counter() > deadline:
+                cache.delete(key)
+                raise CommandError(
+                    f"Only {done} of {count} tasks ran within {options['timeout']}s; "
+                    f"is a worker consuming {options['queue']!r}?"
+                )
+            time.sleep(0.05)
+        finished = time.perf_counter() - began
+        cache.delete(key)
+
+        self.stdout.write(
+            f"{count} tasks on {options['queue']!r}: "
+            f"publish {count / published:8.0f} tasks/s  "
+            f"end to end {count / finished:8.0f} tasks/s"
+        )
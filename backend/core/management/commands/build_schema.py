@@ -0,0 +1,66 @@
+"""
+Django command to generate the OpenAPI schema file when the code changes.
+"""
+
+import hashlib
+from importlib.metadata import version
+from pathlib import Path
+
+from django.conf import settings
+from django.core.management import call_command
+from django.core.management.base import BaseCommand
+
+SKIPPED_DIRS = {"migrations", "tests", "__pycache__"}
+
+
+def source_fingerprint():
+    """Hash the project's Python sources and the schema generator settings."""
+    digest = hashlib.sha256()
+    digest.update(version("drf-spectacular").encode())
+    digest.update(repr(sorted(settings.SPECTACULAR_SETTINGS.items())).encode())
+
+    base_dir = Path(settings.BASE_DIR)
+    for path in sorted(base_dir.rglob("*.py")):
+        relative = path.relative_to(base_dir)
+        if SKIPPED_DIRS.intersection(relative.parts):
+            continue
+        digest.update(str(relative).encode())
+        digest.update(path.read_bytes())
+
+    return digest.hexdigest()
+
+
+class Command(BaseCommand):
+    """Django command to build the OpenAPI schema once at build/deploy time."""
+
+    help = (
+        "Write the OpenAPI schema to OPENAPI_SCHEMA_FILE, and a JSON copy "
+        "beside it, skipping generation when the sources have not changed "
+        "since the last run."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--file", default=str(settings.OPENAPI_SCHEMA_FILE))
+        parser.add_argument("--force", action="store_true")
+
+    def handle(self, *args, **options):
+        """Entry point for the command."""
+        path = Path(options["file"])
+        json_path = path.with_suffix(".json")
+        fingerprint_path = path.with_name(f"{path.name}.sha256")
+        fingerprint = source_fingerprint()
+
+        if (
+            not options["force"]
+            and path.exists()
+            and json_path.exists()
+            and fingerprint_path.exists()
+            and fingerprint_path.read_text().strip() == fingerprint
+        ):
+            self.stdout.write("Schema up to date.")
+            return
+
+        call_command("spectacular", file=str(path))
+        call_command("spectacular", file=str(json_path), format="openapi-json")
+        fingerprint_path.write_text(f"{fingerprint}\n")
+        self.stdout.write(self.style.SUCCESS(f"Schema written to {path}"))
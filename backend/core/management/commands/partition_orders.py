@@ -0,0 +1,229 @@
+"""
+Django command to manage monthly partitions of the order table.
+"""
+
+import re
+from datetime import datetime
+from datetime import timezone as dt_timezone
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from django.utils import timezone
+
+from core.models import Order, OrderItem
+
+
+def qn(name):
+    return connection.ops.quote_name(name)
+
+
+def parse_month(value):
+    """Parse a YYYY-MM argument into the first instant of that month."""
+    return datetime.strptime(value, "%Y-%m").replace(tzinfo=dt_timezone.utc)
+
+
+def add_months(month, count):
+    index = month.year * 12 + month.month - 1 + count
+    return month.replace(year=index // 12, month=index % 12 + 1)
+
+
+class Command(BaseCommand):
+    """Django command to create and detach monthly order partitions."""
+
+    help = (
+        "Partition the order table by month of created_at. --convert turns the "
+        "existing table into the default partition (run once). Every run "
+        "creates the partitions from --since up to --ahead months from now, "
+        "moving matching rows out of the default partition, and detaches "
+        "months before --detach-before together with their order items. "
+        "The partitioned primary key is (order_id, created_at), so order_id "
+        "is only unique within a partition, and order items get a trigger "
+        "checking their order exists instead of a foreign key. Every run "
+        "fails if an order item has no order."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--convert", action="store_true")
+        parser.add_argument(
+            "--since", type=parse_month, help="First month to create, YYYY-MM."
+        )
+        parser.add_argument("--ahead", type=int, default=3)
+        parser.add_argument(
+            "--detach-before", type=parse_month, help="YYYY-MM, exclusive."
+        )
+
+    def handle(self, *args, **options):
+        """Entry point for the command."""
+        self.table = Order._meta.db_table
+        self.default = f"{self.table}_default"
+
+        with transaction.atomic(), connection.cursor() as cursor:
+            # ALTER TABLE refuses to run while deferred FK checks are pending.
+            cursor.execute("SET CONSTRAINTS ALL IMMEDIATE")
+            if options["convert"]:
+                self._convert(cursor)
+            elif not self._is_partitioned(cursor):
+                raise CommandError(
+                    f"{self.table} is not partitioned yet, run with --convert."
+                )
+
+            partitions = self._partitions(cursor)
+            now = timezone.now()
+            month = options["since"] or parse_month(f"{now:%Y-%m}")
+            end = add_months(parse_month(f"{now:%Y-%m}"), options["ahead"] + 1)
+            while month < end:
+                if month not in partitions.values():
+                    self._create(cursor, month)
+                month = add_months(month, 1)
+
+            if options["detach_before"]:
+                for name, month in sorted(partitions.items()):
+                    if add_months(month, 1) <= options["detach_before"]:
+                        self._detach(cursor, name, month)
+
+            self._check_orphans(cursor)
+
+    def _is_partitioned(self, cursor):
+        cursor.execute(
+            "SELECT 1 FROM pg_partitioned_table WHERE partrelid = %s::regclass",
+            [self.table],
+        )
+        return cursor.fetchone() is not None
+
+    def _partitions(self, cursor):
+        """Map the monthly partitions' names to their first day."""
+        cursor.execute(
+            "SELECT c.relname FROM pg_inherits i "
+            "JOIN pg_class c ON c.oid = i.inhrelid "
+            "WHERE i.inhparent = %s::regclass",
+            [self.table],
+        )
+        partitions = {}
+        for (name,) in cursor.fetchall():
+            match = re.fullmatch(rf"{self.table}_p(\d{{4}}_\d{{2}})", name)
+            if match:
+                partitions[name] = parse_month(match[1].replace("_", "-"))
+        return partitions
+
+    def _convert(self, cursor):
+        """Swap the order table for a partitioned one holding it as default."""
+        if self._is_partitioned(cursor):
+            raise CommandError(f"{self.table} is already partitioned.")
+        user_table = Order._meta.get_field("user").related_model._meta.db_table
+
+        cursor.execute(f"ALTER TABLE {qn(self.table)} RENAME TO {qn(self.default)}")
+        cursor.execute(
+            f"CREATE TABLE {qn(self.table)} "
+            f"(LIKE {qn(self.default)} INCLUDING DEFAULTS) "
+            "PARTITION BY RANGE (created_at)"
+        )
+        # A unique constraint has to include the partition key.
+        cursor.execute(
+            f"ALTER TABLE {qn(self.table)} ADD PRIMARY KEY (order_id, created_at)"
+        )
+        for column in ("created_at", "user_id", "finished_at"):
+            cursor.execute(
+                f"CREATE INDEX {qn(f'{self.table}_{column}_part_idx')} "
+                f"ON {qn(self.table)} ({column})"
+            )
+        cursor.execute(
+            f"ALTER TABLE {qn(self.table)} ADD FOREIGN KEY (user_id) "
+            f"REFERENCES {qn(user_table)} (id) DEFERRABLE INITIALLY DEFERRED"
+        )
+        # Nothing can reference order_id alone any more. The order items'
+        # foreign key becomes a trigger, and Django still cascades deletes
+        # to the order items itself.
+        cursor.execute(
+            "SELECT conrelid::regclass::text, conname FROM pg_constraint "
+            "WHERE contype = 'f' AND confrelid = %s::regclass",
+            [self.default],
+        )
+        for table, name in cursor.fetchall():
+            cursor.execute(f"ALTER TABLE {qn(table)} DROP CONSTRAINT {qn(name)}")
+        self._create_item_trigger(cursor)
+        # Replaced by the partitioned table's (order_id, created_at) key.
+        cursor.execute(
+            "SELECT conname FROM pg_constraint "
+            "WHERE contype = 'p' AND conrelid = %s::regclass",
+            [self.default],
+        )
+        (pkey,) = cursor.fetchone()
+        cursor.execute(f"ALTER TABLE {qn(self.default)} DROP CONSTRAINT {qn(pkey)}")
+        self._create_order_id_index(cursor, self.default)
+        cursor.execute(
+            f"ALTER TABLE {qn(self.table)} ATTACH PARTITION {qn(self.default)} DEFAULT"
+        )
+        self.stdout.write(f"Converted {self.table} into {self.default}")
+
+    def _create_item_trigger(self, cursor):
+        """Check order items reference an order, as their foreign key did."""
+        item_table = OrderItem._meta.db_table
+        function = f"{item_table}_order_exists"
+        cursor.execute(
+            f"CREATE FUNCTION {qn(function)}() RETURNS trigger "
+            "LANGUAGE plpgsql AS $$ BEGIN "
+            f"IF NOT EXISTS (SELECT 1 FROM {qn(self.table)} "
+            "WHERE order_id = NEW.order_id) THEN "
+            "RAISE foreign_key_violation USING MESSAGE = "
+            f"format('order %s of {item_table} row %s does not exist', "
+            "NEW.order_id, NEW.id); "
+            "END IF; RETURN NULL; END $$"
+        )
+        cursor.execute(
+            f"CREATE CONSTRAINT TRIGGER {qn(f'{item_table}_order_fk')} "
+            f"AFTER INSERT OR UPDATE OF order_id ON {qn(item_table)} "
+            "DEFERRABLE INITIALLY DEFERRED "
+            f"FOR EACH ROW EXECUTE FUNCTION {qn(function)}()"
+        )
+
+    def _create_order_id_index(self, cursor, partition):
+        cursor.execute(
+            f"CREATE UNIQUE INDEX {qn(f'{partition}_order_id_key')} "
+            f"ON {qn(partition)} (order_id)"
+        )
+
+    def _create(self, cursor, month):
+        name = f"{self.table}_p{month:%Y_%m}"
+        start, end = month.isoformat(), add_months(month, 1).isoformat()
+        cursor.execute(
+            f"CREATE TABLE {qn(name)} (LIKE {qn(self.table)} INCLUDING DEFAULTS)"
+        )
+        self._create_order_id_index(cursor, name)
+        # Attaching fails while the default partition holds rows of the month.
+        cursor.execute(
+            f"WITH moved AS (DELETE FROM {qn(self.default)} "
+            "WHERE created_at >= %s AND created_at < %s RETURNING *) "
+            f"INSERT INTO {qn(name)} SELECT * FROM moved",
+            [start, end],
+        )
+        cursor.execute(
+            f"ALTER TABLE {qn(self.table)} ATTACH PARTITION {qn(name)} "
+            f"FOR VALUES FROM ('{start}') TO ('{end}')"
+        )
+        self.stdout.write(f"Created {name}")
+
+    def _detach(self, cursor, name, month):
+        """Detach a month and move its order items into a table beside it."""
+        item_table = OrderItem._meta.db_table
+        items = f"{item_table}_p{month:%Y_%m}"
+        cursor.execute(f"ALTER TABLE {qn(self.table)} DETACH PARTITION {qn(name)}")
+        cursor.execute(
+            f"CREATE TABLE {qn(items)} (LIKE {qn(item_table)} INCLUDING DEFAULTS)"
+        )
+        cursor.execute(
+            f"WITH moved AS (DELETE FROM {qn(item_table)} "
+            f"WHERE order_id IN (SELECT order_id FROM {qn(name)}) RETURNING *) "
+            f"INSERT INTO {qn(items)} SELECT * FROM moved"
+        )
+        self.stdout.write(f"Detached {name} and {items}")
+
+    def _check_orphans(self, cursor):
+        """Fail if an order item's order is in none of the partitions."""
+        item_table = OrderItem._meta.db_table
+        cursor.execute(
+            f"SELECT count(*) FROM {qn(item_table)} i WHERE NOT EXISTS "
+            f"(SELECT 1 FROM {qn(self.table)} o WHERE o.order_id = i.order_id)"
+        )
+        (orphans,) = cursor.fetchone()
+        if orphans:
+            raise CommandError(f"{orphans} rows of {item_table} have no order.")
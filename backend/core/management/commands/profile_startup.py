@@ -0,0 +1,79 @@
+"""
+Django command to profile worker startup imports.
+"""
+
+import os
+import re
+import subprocess
+import sys
+from collections import Counter
+
+from django.core.management.base import BaseCommand, CommandError
+
+# What a WSGI worker does before serving its first request.
+STARTUP_CODE = """
+import time
+start = time.perf_counter()
+import django
+django.setup()
+setup = time.perf_counter() - start
+from django.core.handlers.wsgi import WSGIHandler
+from django.urls import get_resolver
+WSGIHandler()
+get_resolver().url_patterns
+print(f"{setup} {time.perf_counter() - start}")
+"""
+
+IMPORTTIME_LINE = re.compile(r"import time:\s+(\d+) \|\s+\d+ \|\s*(\S+)")
+
+
+def profile_imports():
+    """Run the startup code under `-X importtime` in a fresh interpreter."""
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", STARTUP_CODE],
+        capture_output=True,
+        text=True,
+        env=os.environ.copy(),
+    )
+    if result.returncode != 0:
+        raise CommandError(result.stderr.strip().splitlines()[-1])
+
+    setup, total = (float(value) for value in result.stdout.split()[-2:])
+    imports = []
+    for line in result.stderr.splitlines():
+        match = IMPORTTIME_LINE.match(line)
+        if match:
+            imports.append((match.group(2), int(match.group(1))))
+    return setup, total, imports
+
+
+class Command(BaseCommand):
+    """Django command to report import time per module at worker startup."""
+
+    help = (
+        "Report import self-time at worker startup (django.setup() plus the "
+        "URLconf), aggregated per top-level package or per module."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--top", type=int, default=25)
+        parser.add_argument(
+            "--by-module",
+            action="store_true",
+            help="Report individual modules instead of top-level packages.",
+        )
+
+    def handle(self, *args, **options):
+        """Entry point for the command."""
+        setup, total, imports = profile_imports()
+
+        totals = Counter()
+        for module, self_us in imports:
+            name = module if options["by_module"] else module.split(".")[0]
+            totals[name] += self_us
+
+        self.stdout.write(f"django.setup(): {setup * 1000:8.1f} ms")
+        self.stdout.write(f"with URLconf:   {total * 1000:8.1f} ms")
+        self.stdout.write(f"imports:        {sum(totals.values()) / 1000:8.1f} ms\n")
+        for name, self_us in totals.most_common(options["top"]):
+            self.stdout.write(f"{self_us / 1000:8.1f} ms  {name}")
@@ -0,0 +1,42 @@
+"""
+Django command to rebuild the recipe facet summary table.
+"""
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.db.models import Exists, OuterRef
+
+from core.models import Recipe, RecipeFacet
+from recipe import facets
+
+
+class Command(BaseCommand):
+    """Django command to recompute recipe facet counts from the recipes."""
+
+    help = (
+        "Recompute the RecipeFacet rows of every user with recipes or facet rows, "
+        "or only of the given users. Run after changing the facet bucket widths."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("emails", nargs="*", help="Only rebuild these users.")
+
+    def handle(self, *args, **options):
+        """Entry point for the command."""
+        users = get_user_model().objects.all()
+        if options["emails"]:
+            users = users.filter(email__in=options["emails"])
+        else:
+            users = users.filter(
+                Exists(Recipe.objects.filter(user=OuterRef("pk")))
+                | Exists(RecipeFacet.objects.filter(user=OuterRef("pk")))
+            )
+
+        count = 0
+        for user in users.iterator():
+            with transaction.atomic():
+                facets.rebuild(user)
+            count += 1
+
+        self.stdout.write(self.style.SUCCESS(f"Rebuilt facets for {count} users."))
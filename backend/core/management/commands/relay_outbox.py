@@ -0,0 +1,44 @@
+"""
+Django command to send committed outbox events to Celery.
+"""
+
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from core import outbox
+
+# Seconds between deletions of old sent events.
+PRUNE_INTERVAL = 60 * 60
+
+
+class Command(BaseCommand):
+    """Django command to run the outbox relay."""
+
+    help = (
+        "Send pending outbox events to Celery in batches until stopped, "
+        "polling every OUTBOX_POLL_INTERVAL seconds when there are none. "
+        "With --once, send what is pending and exit."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--once", action="store_true")
+        parser.add_argument("--batch-size", type=int)
+
+    def handle(self, *args, **options):
+        """Entry point for the command."""
+        batch_size = options["batch_size"] or settings.OUTBOX_BATCH_SIZE
+        next_prune = time.monotonic()
+        while True:
+            sent = outbox.relay(batch_size)
+            if sent and options["verbosity"] > 1:
+                self.stdout.write(f"Sent {sent} events")
+            if sent == batch_size:
+                continue
+            if time.monotonic() >= next_prune:
+                outbox.prune()
+                next_prune = time.monotonic() + PRUNE_INTERVAL
+            if options["once"]:
+                return
+            time.sleep(settings.OUTBOX_POLL_INTERVAL)
@@ -2,26 +2,75 @@
 Django command to wait for database to be available.
 """
 
+import random
 import time
+from concurrent.futures import ThreadPoolExecutor
 
-from django.core.management.base import BaseCommand
-from django.db.utils import OperationalError
-from psycopg import OperationalError as Psycopg2OperationalError
+from django.core.management.base import BaseCommand, CommandError
+
+from core import health
 
 
 class Command(BaseCommand):
-    """Django command to wait for database."""
+    """Django command to wait for database (and optionally Redis/broker)."""
+
+    help = (
+        "Wait for the database, and optionally the cache and broker, with "
+        "jittered exponential backoff."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--wait-for",
+            nargs="*",
+            choices=["cache", "broker"],
+            default=[],
+            help="Also wait for these dependencies, concurrently.",
+        )
+        parser.add_argument("--timeout", type=float, default=60)
+        parser.add_argument("--initial-delay", type=float, default=0.1)
+        parser.add_argument("--max-delay", type=float, default=5)
+
+    def _wait(self, name, deadline, initial_delay, max_delay):
+        """Retry the probe until it succeeds or the deadline passes."""
+        delay = initial_delay
+        while True:
+            try:
+                health.PROBES[name]()
+                return
+            except Exception as exc:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    raise CommandError(f"{name.capitalize()} unavailable: {exc}")
+
+                # Full jitter keeps restarting containers from retrying in step.
+                sleep = min(random.uniform(0, delay), remaining)
+                self.stdout.write(
+                    f"{name.capitalize()} unavailable, waiting {sleep:.2f} seconds..."
+                )
+                time.sleep(sleep)
+                delay = min(delay * 2, max_delay)
 
     def handle(self, *args, **options):
         """Entry point for the command."""
-        self.stdout.write("Waiting for database...")
-        db_up = False
-        while db_up is False:
-            try:
-                self.check(databases=["default"])
-                db_up = True
-            except (Psycopg2OperationalError, OperationalError):
-                self.stdout.write("Database unavailable, waiting 1 second...")
-                time.sleep(1)
+        names = ["database", *options["wait_for"]]
+        self.stdout.write(f"Waiting for {', '.join(names)}...")
+        deadline = time.monotonic() + options["timeout"]
+
+        with ThreadPoolExecutor(max_workers=len(names)) as executor:
+            futures = [
+                executor.submit(
+                    self._wait,
+                    name,
+                    deadline,
+                    options["initial_delay"],
+                    options["max_delay"],
+                )
+                for name in names
+            ]
+            for future in futures:
+                future.result()
 
-        self.stdout.write(self.style.SUCCESS("Database available!"))
+        self.stdout.write(
+            self.style.SUCCESS(f"{', '.join(names).capitalize()} available!")
+        )
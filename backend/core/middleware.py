@@ -0,0 +1,96 @@
+"""
+Middleware for the API.
+"""
+
+import secrets
+
+from django.conf import settings
+from django.middleware.gzip import GZipMiddleware
+from django.utils.cache import patch_vary_headers
+from django.utils.regex_helper import _lazy_re_compile
+
+try:
+    import brotli
+except ImportError:  # pragma: no cover
+    brotli = None
+
+re_accepts_brotli = _lazy_re_compile(r"\bbr\b")
+
+
+def _brotli_padding(length):
+    """
+    Return a brotli metadata meta-block carrying `length` (at most 256) bytes.
+
+    Decoders skip metadata, so it changes the compressed size but not the
+    decompressed content.
+    """
+    if not length:
+        return b""
+    # ISLAST=0, MNIBBLES=0 (metadata), reserved bit, MSKIPBYTES=1, then
+    # MSKIPLEN-1 in the next 8 bits, padded to the byte boundary
+    skip = length - 1
+    return bytes((0x16 | (skip & 0x3) << 6, skip >> 2)) + b"a" * length
+
+
+def compress_brotli(data, *, quality, max_random_bytes=None):
+    """
+    Brotli counterpart of django.utils.text.compress_string().
+
+    With `max_random_bytes` a random amount of padding is added to the
+    stream, like the random gzip filename GZipMiddleware uses to mitigate
+    BREACH.
+    """
+    compressor = brotli.Compressor(quality=quality)
+    if not max_random_bytes:
+        return compressor.process(data) + compressor.finish()
+    # flush() ends on a byte boundary, where a meta-block can be inserted
+    return (
+        compressor.process(data)
+        + compressor.flush()
+        + _brotli_padding(secrets.randbelow(max_random_bytes))
+        + compressor.finish()
+    )
+
+
+class CompressionMiddleware(GZipMiddleware):
+    """
+    Compress responses above COMPRESSION_MIN_LENGTH bytes.
+
+    Brotli is used when the client accepts it and the `brotli` package is
+    installed; everything else, streaming responses included, gets gzip.
+    Both add up to `max_random_bytes` of random padding against BREACH.
+    """
+
+    def process_response(self, request, response):
+        if (
+            not response.streaming
+            and len(response.content) < settings.COMPRESSION_MIN_LENGTH
+        ):
+            return response
+
+        ae = request.META.get("HTTP_ACCEPT_ENCODING", "")
+        if (
+            brotli is None
+            or response.streaming
+            or response.has_header("Content-Encoding")
+            or not re_accepts_brotli.search(ae)
+        ):
+            return super().process_response(request, response)
+
+        patch_vary_headers(response, ("Accept-Encoding",))
+        compressed_content = compress_brotli(
+            response.content,
+            quality=settings.BROTLI_QUALITY,
+            max_random_bytes=self.max_random_bytes,
+        )
+        if len(compressed_content) >= len(response.content):
+            return response
+        response.content = compressed_content
+        response.headers["Content-Length"] = str(len(response.content))
+
+        etag = response.get("ETag")
+        if etag and etag.startswith('"'):
+            response.headers["ETag"] = "W/" + etag
+        response.headers["Content-Encoding"] = "br"
+
+        return response
@@ -0,0 +1,28 @@
+# Generated by Django 5.1.4 on 2026-10-19 13:34
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0004_recipe_image'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='product',
+            name='updated_at',
+            field=models.DateTimeField(auto_now=True, db_index=True),
+        ),
+        migrations.AddField(
+            model_name='recipe',
+            name='updated_at',
+            field=models.DateTimeField(auto_now=True, db_index=True),
+        ),
+        migrations.AddField(
+            model_name='user',
+            name='role',
+            field=models.CharField(choices=[('designer', 'Interior Designer'), ('homeowner', 'Homeowner'), ('contractor', 'Contractor'), ('supplier', 'Supplier'), ('architect', 'Architect')], default='homeowner', max_length=20),
+        ),
+    ]
@@ -0,0 +1,71 @@
+# Generated by Django 5.1.4 on 2026-10-19 13:40
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models import Count, F, IntegerField
+from django.db.models.functions import Cast, Floor
+
+
+def fill_recipe_facets(apps, schema_editor):
+    # The counts of recipe.facets.compute as of this migration, for all users
+    # at once; the signals only keep counts current from here on.
+    Recipe = apps.get_model('core', 'Recipe')
+    RecipeFacet = apps.get_model('core', 'RecipeFacet')
+    recipes = Recipe.objects.order_by()
+
+    counts = []
+    for facet, field in (('tag', 'tags'), ('ingredient', 'ingredients')):
+        through = getattr(Recipe, field).through
+        column = f'{facet}_id'
+        counts.append((
+            facet,
+            through.objects.order_by()
+            .values('recipe__user_id', column)
+            .annotate(count=Count('*'))
+            .values_list('recipe__user_id', column, 'count'),
+        ))
+    for facet, width in (
+        ('price', settings.RECIPE_FACET_PRICE_BUCKET),
+        ('time_minutes', settings.RECIPE_FACET_TIME_BUCKET),
+    ):
+        counts.append((
+            facet,
+            recipes.annotate(bucket=Cast(Floor(F(facet) / width), IntegerField()))
+            .values('user_id', 'bucket')
+            .annotate(count=Count('*'))
+            .values_list('user_id', 'bucket', 'count'),
+        ))
+
+    for facet, rows in counts:
+        RecipeFacet.objects.bulk_create(
+            (
+                RecipeFacet(user_id=user_id, facet=facet, value=value, count=count)
+                for user_id, value, count in rows.iterator()
+            ),
+            batch_size=1000,
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0005_product_updated_at_recipe_updated_at_user_role'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='RecipeFacet',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('facet', models.CharField(choices=[('tag', 'Tag'), ('ingredient', 'Ingredient'), ('price', 'Price'), ('time_minutes', 'Time Minutes')], max_length=20)),
+                ('value', models.BigIntegerField()),
+                ('count', models.IntegerField(default=0)),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'constraints': [models.UniqueConstraint(fields=('user', 'facet', 'value'), name='unique_recipe_facet')],
+            },
+        ),
+        migrations.RunPython(fill_recipe_facets, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,60 @@
+# Generated by Django 5.1.4 on 2026-10-19 13:43
+
+import django.contrib.postgres.indexes
+import django.contrib.postgres.search
+from django.contrib.postgres.aggregates import StringAgg
+from django.contrib.postgres.operations import TrigramExtension
+from django.contrib.postgres.search import SearchVector
+from django.db import migrations
+from django.db.models import OuterRef, Subquery, TextField, Value
+from django.db.models.functions import Coalesce
+
+
+def fill_search_vectors(apps, schema_editor):
+    # The expression of recipe.search.search_vector as of this migration.
+    Recipe = apps.get_model("core", "Recipe")
+
+    def names(path):
+        return Coalesce(
+            Subquery(
+                Recipe.objects.filter(pk=OuterRef("pk"))
+                .values("pk")
+                .annotate(names=StringAgg(path, " "))
+                .values("names")
+            ),
+            Value(""),
+            output_field=TextField(),
+        )
+
+    Recipe.objects.update(
+        search_vector=SearchVector("title", weight="A", config="english")
+        + SearchVector("description", weight="B", config="english")
+        + SearchVector(names("tags__name"), weight="C", config="english")
+        + SearchVector(names("ingredients__name"), weight="C", config="english")
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0006_recipefacet'),
+    ]
+
+    operations = [
+        TrigramExtension(),
+        migrations.AddField(
+            model_name='recipe',
+            name='search_vector',
+            field=django.contrib.postgres.search.SearchVectorField(editable=False, null=True),
+        ),
+        # Fill before indexing, so the GIN index is built once.
+        migrations.RunPython(fill_search_vectors, migrations.RunPython.noop),
+        migrations.AddIndex(
+            model_name='recipe',
+            index=django.contrib.postgres.indexes.GinIndex(fields=['search_vector'], name='recipe_search_vector_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='recipe',
+            index=django.contrib.postgres.indexes.GinIndex(fields=['title'], name='recipe_title_trgm_idx', opclasses=['gin_trgm_ops']),
+        ),
+    ]
@@ -0,0 +1,20 @@
+# Generated by Django 5.1.4 on 2026-10-19 16:40
+
+from django.db import migrations, models
+
+import core.ids
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0009_order_snapshots'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='order',
+            name='order_id',
+            field=models.UUIDField(default=core.ids.uuid7, primary_key=True, serialize=False),
+        ),
+    ]
@@ -0,0 +1,31 @@
+# Generated by Django 5.1.4 on 2026-10-19 20:10
+
+import django.core.serializers.json
+from django.db import migrations, models
+
+import core.ids
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0012_adminjob'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='OutboxEvent',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('event_id', models.UUIDField(default=core.ids.uuid7, editable=False, unique=True)),
+                ('topic', models.CharField(max_length=100)),
+                ('key', models.CharField(blank=True, max_length=255)),
+                ('payload', models.JSONField(default=dict, encoder=django.core.serializers.json.DjangoJSONEncoder)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('dispatched_at', models.DateTimeField(blank=True, null=True)),
+            ],
+            options={
+                'indexes': [models.Index(condition=models.Q(('dispatched_at__isnull', True)), fields=['id'], name='core_outbox_pending_idx')],
+            },
+        ),
+    ]
@@ -0,0 +1,20 @@
+# Generated by Django 5.1.4 on 2026-10-20 09:00
+
+from django.db import migrations, models
+
+import core.storage
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0013_outboxevent'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='adminjob',
+            name='result',
+            field=models.FileField(blank=True, storage=core.storage.private_storage, upload_to='admin_jobs/'),
+        ),
+    ]
@@ -0,0 +1,34 @@
+# Generated by Django 5.1.4 on 2026-10-19 15:26
+
+from django.db import migrations, models
+from django.db.models import F
+
+
+def fill_finished_at(apps, schema_editor):
+    # When existing orders finished was not recorded; their creation time is
+    # the archive cut-off they had so far.
+    Order = apps.get_model('core', 'Order')
+    Order.objects.filter(status__in=['Delivered', 'Cancelled']).update(
+        finished_at=F('created_at')
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0014_alter_adminjob_result'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='archivedorder',
+            name='finished_at',
+            field=models.DateTimeField(null=True),
+        ),
+        migrations.AddField(
+            model_name='order',
+            name='finished_at',
+            field=models.DateTimeField(blank=True, db_index=True, null=True),
+        ),
+        migrations.RunPython(fill_finished_at, migrations.RunPython.noop),
+    ]
@@ -4,6 +4,7 @@ Database models.
 
 import os
 import uuid
+from decimal import Decimal
 
 from django.conf import settings
 from django.contrib.auth.models import (
@@ -11,7 +12,16 @@ from django.contrib.auth.models import (
     BaseUserManager,
     PermissionsMixin,
 )
-from django.db import models
+from django.contrib.postgres.indexes import GinIndex
+from django.contrib.postgres.search import SearchVectorField
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import connection, models
+from django.db.models import OuterRef, Q, Subquery, Sum
+from django.db.models.functions import Coalesce
+from django.utils import timezone
+
+from core.ids import uuid7
+from core.storage import private_storage
 
 
 def recipe_image_file_path(instance, filename):
@@ -82,6 +92,7 @@ class Product(models.Model):
     price = models.DecimalField(max_digits=10, decimal_places=2)
     stock = models.PositiveIntegerField()
     image = models.ImageField(upload_to="images/", blank=True, null=True)
+    updated_at = models.DateTimeField(auto_now=True, db_index=True)
 
     @property
     def is_in_stock(self):
@@ -91,6 +102,41 @@ class Product(models.Model):
         return self.name
 
 
+class OrderQuerySet(models.QuerySet):
+    def update_totals(self):
+        """Recompute the stored total of each order from its items."""
+        subtotals = (
+            OrderItem.objects.filter(order=OuterRef("pk"))
+            .values("order")
+            .annotate(total=Sum("subtotal"))
+            .values("total")
+        )
+        return self.update(total=Coalesce(Subquery(subtotals), Decimal(0)))
+
+    def transition(self, order_ids, status, from_status=None):
+        """
+        Move the given orders to `status` where the transition is allowed.
+
+        One UPDATE guarded by the current status, so a concurrent change
+        cannot be overwritten. Returns (order_id, user_id) of each order that
+        was updated.
+        """
+        sources = Order.sources(status)
+        if from_status is not None:
+            sources = [source for source in sources if source == from_status]
+        if not sources or not order_ids:
+            return []
+        finished = ", finished_at = now()" if Order.is_final(status) else ""
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f"UPDATE {self.model._meta.db_table} SET status = %s{finished} "
+                "WHERE order_id = ANY(%s) AND status = ANY(%s) "
+                "RETURNING order_id, user_id",
+                [status, list(order_ids), sources],
+            )
+            return cursor.fetchall()
+
+
 class Order(models.Model):
     """Represents an order in the system"""
 
@@ -100,7 +146,15 @@ class Order(models.Model):
         CANCELLED = "Cancelled"
         DELIVERED = "Delivered"
 
-    order_id = models.UUIDField(primary_key=True, default=uuid.uuid4)
+    # The statuses each status can move to.
+    TRANSITIONS = {
+        StatusChoices.PENDING: {StatusChoices.CONFIRMED, StatusChoices.CANCELLED},
+        StatusChoices.CONFIRMED: {StatusChoices.DELIVERED, StatusChoices.CANCELLED},
+        StatusChoices.CANCELLED: set(),
+        StatusChoices.DELIVERED: set(),
+    }
+
+    order_id = models.UUIDField(primary_key=True, default=uuid7)
     created_at = models.DateTimeField(auto_now_add=True, db_index=True)
     status = models.CharField(
         max_length=10, choices=StatusChoices.choices, default=StatusChoices.PENDING
@@ -110,22 +164,81 @@ class Order(models.Model):
     products = models.ManyToManyField(
         Product, through="OrderItem", related_name="orders"
     )
+    # Sum of the items' subtotals, kept up to date by `core.signals`.
+    total = models.DecimalField(max_digits=12, decimal_places=2, default=0)
+    # When the order reached a status it cannot leave; `core.archive` keys on it.
+    finished_at = models.DateTimeField(null=True, blank=True, db_index=True)
+
+    objects = OrderQuerySet.as_manager()
 
     def __str__(self):
         return f"Order {self.order_id } by {self.user.email}"
 
+    def save(self, *args, **kwargs):
+        if self.finished_at is None and self.is_final(self.status):
+            self.finished_at = timezone.now()
+            update_fields = kwargs.get("update_fields")
+            if update_fields is not None and "status" in update_fields:
+                kwargs["update_fields"] = {*update_fields, "finished_at"}
+        super().save(*args, **kwargs)
+
+    @classmethod
+    def is_final(cls, status):
+        """Whether an order in `status` can no longer change status."""
+        return not cls.TRANSITIONS[status]
+
+    @classmethod
+    def sources(cls, status):
+        """The statuses an order can move to `status` from."""
+        return [
+            source for source, targets in cls.TRANSITIONS.items() if status in targets
+        ]
+
 
 class OrderItem(models.Model):
     order = models.ForeignKey(Order, on_delete=models.CASCADE, related_name="items")
     product = models.ForeignKey(Product, on_delete=models.CASCADE)
     quantity = models.PositiveIntegerField()
+    # The product's name and price when the order was placed.
+    product_name = models.CharField(max_length=255)
+    unit_price = models.DecimalField(max_digits=10, decimal_places=2)
+    subtotal = models.DecimalField(max_digits=12, decimal_places=2)
+
+    def snapshot(self):
+        """Copy the product's current name and price onto the item."""
+        self.product_name = self.product.name
+        self.unit_price = self.product.price
+        self.subtotal = self.unit_price * self.quantity
+
+    def save(self, *args, **kwargs):
+        if self.unit_price is None:
+            self.snapshot()
+        else:
+            self.subtotal = self.unit_price * self.quantity
+        super().save(*args, **kwargs)
 
-    @property
-    def item_subtotal(self):
-        return self.product.price * self.quantity
+    def __str__(self):
+        return f"{self.quantity} x {self.product_name} in Order {self.order_id}"
+
+
+class ArchivedOrder(models.Model):
+    """
+    A delivered or cancelled order moved out of the order tables by
+    `core.archive`, with its items stored inline.
+    """
+
+    order_id = models.UUIDField(primary_key=True)
+    created_at = models.DateTimeField(db_index=True)
+    status = models.CharField(max_length=10, choices=Order.StatusChoices.choices)
+    user = models.ForeignKey(User, on_delete=models.CASCADE)
+    total = models.DecimalField(max_digits=12, decimal_places=2)
+    # product, product_name, unit_price, quantity and subtotal of each item.
+    items = models.JSONField(encoder=DjangoJSONEncoder)
+    finished_at = models.DateTimeField(null=True)
+    archived_at = models.DateTimeField(auto_now_add=True)
 
     def __str__(self):
-        return f"{self.quantity} x {self.product.name} in Order {self.order.order_id}"
+        return f"Archived order {self.order_id}"
 
 
 class Recipe(models.Model):
@@ -143,6 +256,23 @@ class Recipe(models.Model):
     tags = models.ManyToManyField("Tag")
     ingredients = models.ManyToManyField("Ingredient")
     image = models.ImageField(null=True, upload_to=recipe_image_file_path)
+    updated_at = models.DateTimeField(auto_now=True, db_index=True)
+    # Title, description, tag and ingredient names; see `recipe.search`.
+    search_vector = SearchVectorField(null=True, editable=False)
+
+    class Meta:
+        indexes = [
+            GinIndex(fields=["search_vector"], name="recipe_search_vector_idx"),
+            GinIndex(
+                fields=["title"],
+                name="recipe_title_trgm_idx",
+                opclasses=["gin_trgm_ops"],
+            ),
+            # Range filters and orderings of RecipeViewSet.
+            models.Index(fields=["user", "price"], name="recipe_user_price_idx"),
+            models.Index(fields=["user", "time_minutes"], name="recipe_user_time_idx"),
+            models.Index(fields=["user", "title"], name="recipe_user_title_idx"),
+        ]
 
     def __str__(self):
         return self.title
@@ -166,3 +296,99 @@ class Ingredient(models.Model):
 
     def __str__(self):
         return self.name
+
+
+class RecipeFacet(models.Model):
+    """
+    Number of a user's recipes per tag, ingredient, price or time bucket.
+
+    Kept up to date by `recipe.signals`; `rebuild_recipe_facets` recomputes it.
+    """
+
+    class FacetChoices(models.TextChoices):
+        TAG = "tag"
+        INGREDIENT = "ingredient"
+        PRICE = "price"
+        TIME_MINUTES = "time_minutes"
+
+    user = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE)
+    facet = models.CharField(max_length=20, choices=FacetChoices.choices)
+    # Tag or ingredient id, or the bucket number for price and time_minutes.
+    value = models.BigIntegerField()
+    count = models.IntegerField(default=0)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=["user", "facet", "value"], name="unique_recipe_facet"
+            )
+        ]
+
+    def __str__(self):
+        return f"{self.facet}={self.value}: {self.count}"
+
+
+class AdminJob(models.Model):
+    """A bulk admin action run in the background by `core.admin_jobs`."""
+
+    class KindChoices(models.TextChoices):
+        DELETE = "delete"
+        STATUS = "status"
+        EXPORT = "export"
+
+    class StatusChoices(models.TextChoices):
+        PENDING = "pending"
+        RUNNING = "running"
+        DONE = "done"
+        FAILED = "failed"
+
+    kind = models.CharField(max_length=10, choices=KindChoices.choices)
+    # app_label.model_name of the selected rows.
+    model = models.CharField(max_length=100)
+    # Primary keys or, for "select all", the query of the selected rows, and
+    # for STATUS jobs the new status.
+    params = models.JSONField(default=dict, encoder=DjangoJSONEncoder)
+    status = models.CharField(
+        max_length=10, choices=StatusChoices.choices, default=StatusChoices.PENDING
+    )
+    total = models.PositiveIntegerField(default=0)
+    processed = models.PositiveIntegerField(default=0)
+    result = models.FileField(
+        upload_to="admin_jobs/", storage=private_storage, blank=True
+    )
+    error = models.TextField(blank=True)
+    created_by = models.ForeignKey(
+        settings.AUTH_USER_MODEL, null=True, on_delete=models.SET_NULL
+    )
+    created_at = models.DateTimeField(auto_now_add=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+
+    def __str__(self):
+        return f"{self.get_kind_display()} {self.model} #{self.pk}"
+
+
+class OutboxEvent(models.Model):
+    """
+    A side effect of a change, written in the change's transaction and sent
+    to Celery by the outbox relay once committed; see `core.outbox`.
+    """
+
+    event_id = models.UUIDField(default=uuid7, unique=True, editable=False)
+    topic = models.CharField(max_length=100)
+    # Pending events with the same key have the same effect and are sent once.
+    key = models.CharField(max_length=255, blank=True)
+    payload = models.JSONField(default=dict, encoder=DjangoJSONEncoder)
+    created_at = models.DateTimeField(auto_now_add=True)
+    dispatched_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        indexes = [
+            models.Index(
+                fields=["id"],
+                condition=Q(dispatched_at__isnull=True),
+                name="core_outbox_pending_idx",
+            )
+        ]
+
+    def __str__(self):
+        return f"{self.topic} {self.event_id}"
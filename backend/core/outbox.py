@@ -0,0 +1,100 @@
+"""
+Transactional outbox for side effects of model changes.
+
+Signal receivers call `enqueue` to write an OutboxEvent in the transaction
+of the change, so the side effect happens only if the change commits and is
+not lost if the process stops right after. The `relay_outbox` command sends
+committed events to Celery in batches (`relay`), and
+`core.tasks.deliver_outbox_event` runs the handler registered for the
+event's topic (`deliver`).
+
+Delivery is at least once. An event can be sent again if the relay stops
+between publishing a batch and committing it. `deliver` skips an event id
+it has already handled, and handlers should still be safe to repeat.
+"""
+
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.utils import timezone
+
+from core.models import OutboxEvent
+
+HANDLERS = {}
+
+
+def handler(topic):
+    """Register the decorated function to run for `topic` events."""
+
+    def register(func):
+        HANDLERS[topic] = func
+        return func
+
+    return register
+
+
+def enqueue(topic, key="", **payload):
+    """
+    Record a `topic` event in the current transaction.
+
+    The payload is passed to the handler as keyword arguments. Pending events
+    with the same non-empty `key` are taken to have the same effect.
+    """
+    return OutboxEvent.objects.create(topic=topic, key=key, payload=payload)
+
+
+def relay(batch_size=None):
+    """
+    Send the oldest pending events to Celery and return how many were taken.
+
+    Events are locked with SKIP LOCKED, so several relays can run at once.
+    Of the events sharing a key in a batch, only the first is sent.
+    """
+    # core.tasks imports this module.
+    from core.tasks import deliver_outbox_event
+
+    batch_size = batch_size or settings.OUTBOX_BATCH_SIZE
+    with transaction.atomic():
+        events = list(
+            OutboxEvent.objects.filter(dispatched_at__isnull=True)
+            .select_for_update(skip_locked=True)
+            .order_by("id")[:batch_size]
+        )
+        keys = set()
+        for event in events:
+            if event.key:
+                if event.key in keys:
+                    continue
+                keys.add(event.key)
+            deliver_outbox_event.apply_async(
+                (str(event.event_id), event.topic, event.payload),
+                task_id=str(event.event_id),
+            )
+        OutboxEvent.objects.filter(pk__in=[event.pk for event in events]).update(
+            dispatched_at=timezone.now()
+        )
+    return len(events)
+
+
+def deliver(event_id, topic, payload):
+    """Run the handler of an event unless this event id was handled already."""
+    key = f"outbox:{event_id}"
+    if not cache.add(key, "running", settings.OUTBOX_LOCK_TIMEOUT):
+        return False
+    try:
+        HANDLERS[topic](**payload)
+    except Exception:
+        # Let a retry run it again.
+        cache.delete(key)
+        raise
+    cache.set(key, "done", settings.OUTBOX_DEDUPE_TIMEOUT)
+    return True
+
+
+def prune():
+    """Delete events sent more than OUTBOX_RETENTION_DAYS days ago."""
+    before = timezone.now() - timedelta(days=settings.OUTBOX_RETENTION_DAYS)
+    deleted, _ = OutboxEvent.objects.filter(dispatched_at__lt=before).delete()
+    return deleted
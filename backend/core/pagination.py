@@ -0,0 +1,213 @@
+"""
+Pagination for the API.
+"""
+
+import hashlib
+import json
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import Q
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import CursorPagination, _reverse_ordering
+from rest_framework.response import Response
+
+
+class KeysetPagination(CursorPagination):
+    """
+    Cursor pagination with a client page size and an optional exact total.
+
+    `count` is the exact number of results when `include_total=1` is passed.
+    Otherwise it is the last count computed for the same user and filters,
+    cached for PAGINATION_COUNT_CACHE_TIMEOUT seconds, or else the planner's
+    estimate of the row count, so only `include_total=1` runs the COUNT(*).
+    `count_is_estimate` is false only for a count computed exactly for the
+    request.
+
+    The cursor holds the values of every ordering field, not only the first
+    one, so pages follow each other by a keyset comparison however many rows
+    share a value, instead of by an offset that DRF caps at `offset_cutoff`.
+    """
+
+    ordering = "-id"
+    page_size_query_param = "page_size"
+    include_total_query_param = "include_total"
+    # Parameters that select a page rather than the results.
+    page_query_params = ("cursor", "page_size", "include_total", "ordering")
+
+    @property
+    def max_page_size(self):
+        return settings.MAX_PAGE_SIZE
+
+    def get_ordering(self, request, queryset, view):
+        """
+        Keep the ordering the view gave the queryset, if any, with the
+        primary key as a tie breaker so no two rows share a cursor position.
+        """
+        ordering = queryset.query.order_by
+        if not (ordering and all(isinstance(field, str) for field in ordering)):
+            ordering = super().get_ordering(request, queryset, view)
+        ordering = tuple(ordering)
+        pk = queryset.model._meta.pk.name
+        if not any(field.lstrip("-") in ("pk", pk) for field in ordering):
+            ordering += (f"-{pk}" if ordering[-1].startswith("-") else pk,)
+        return ordering
+
+    def _get_position_from_instance(self, instance, ordering):
+        values = []
+        for field in ordering:
+            field_name = field.lstrip("-")
+            if isinstance(instance, dict):
+                values.append(instance[field_name])
+            else:
+                values.append(getattr(instance, field_name))
+        return json.dumps([str(value) for value in values])
+
+    def _after(self, position, reverse):
+        """
+        Match the rows after `position` in the ordering, or before it if
+        `reverse`: the first field past its value, or equal to it and the
+        next field past its value, and so on.
+        """
+        try:
+            values = json.loads(position)
+        except ValueError:
+            raise NotFound(self.invalid_cursor_message)
+        if not isinstance(values, list) or len(values) != len(self.ordering):
+            raise NotFound(self.invalid_cursor_message)
+
+        condition = None
+        for field, value in reversed(list(zip(self.ordering, values))):
+            name = field.lstrip("-")
+            lookup = "lt" if field.startswith("-") != reverse else "gt"
+            past = Q(**{f"{name}__{lookup}": value})
+            if condition is not None:
+                past |= Q(**{name: value}) & condition
+            condition = past
+        # The same bound on the first field alone, as an index condition.
+        if len(values) > 1:
+            condition &= Q(**{f"{name}__{lookup}e": value})
+        return condition
+
+    def _count_cache_key(self, request, view):
+        params = sorted(
+            (key, value)
+            for key, value in request.query_params.lists()
+            if key not in self.page_query_params
+        )
+        digest = hashlib.md5(repr(params).encode()).hexdigest()
+        return f"count:{type(view).__name__}:{request.user.pk}:{digest}"
+
+    def estimate_count(self, queryset):
+        """Return the planner's estimate of the rows in the queryset."""
+        plan = json.loads(queryset.explain(format="json"))
+        return int(plan[0]["Plan"]["Plan Rows"])
+
+    def get_count(self, queryset, request, view):
+        """
+        Return the exact count if asked for, else a recent cached one or an
+        estimate, and whether it is an estimate.
+        """
+        key = self._count_cache_key(request, view)
+        exact = request.query_params.get(self.include_total_query_param) == "1"
+        if exact:
+            count = queryset.count()
+        else:
+            count = cache.get(key)
+            if count is not None:
+                return count, True
+            count = self.estimate_count(queryset)
+        cache.set(key, count, settings.PAGINATION_COUNT_CACHE_TIMEOUT)
+        return count, not exact
+
+    def paginate_queryset(self, queryset, request, view=None):
+        """
+        DRF's cursor pagination, filtering on the whole cursor position
+        rather than on the first ordering field.
+        """
+        self.count, self.count_is_estimate = self.get_count(queryset, request, view)
+        self.request = request
+        self.page_size = self.get_page_size(request)
+        if not self.page_size:
+            return None
+
+        self.base_url = request.build_absolute_uri()
+        self.ordering = self.get_ordering(request, queryset, view)
+        self.cursor = self.decode_cursor(request)
+        if self.cursor is None:
+            offset, reverse, current_position = 0, False, None
+        else:
+            offset, reverse, current_position = self.cursor
+
+        if reverse:
+            queryset = queryset.order_by(*_reverse_ordering(self.ordering))
+        else:
+            queryset = queryset.order_by(*self.ordering)
+        if current_position is not None:
+            queryset = queryset.filter(self._after(current_position, reverse))
+
+        # One extra row tells whether a page follows.
+        results = list(queryset[offset : offset + self.page_size + 1])
+        self.page = results[: self.page_size]
+        if len(results) > len(self.page):
+            has_following_position = True
+            following_position = self._get_position_from_instance(
+                results[-1], self.ordering
+            )
+        else:
+            has_following_position = False
+            following_position = None
+
+        if reverse:
+            self.page.reverse()
+            self.has_next = current_position is not None or offset > 0
+            self.has_previous = has_following_position
+            if self.has_next:
+                self.next_position = current_position
+            if self.has_previous:
+                self.previous_position = following_position
+        else:
+            self.has_next = has_following_position
+            self.has_previous = current_position is not None or offset > 0
+            if self.has_next:
+                self.next_position = following_position
+            if self.has_previous:
+                self.previous_position = current_position
+
+        if (self.has_previous or self.has_next) and self.template is not None:
+            self.display_page_controls = True
+        return self.page
+
+    def get_paginated_response(self, data):
+        return Response(
+            {
+                "count": self.count,
+                "count_is_estimate": self.count_is_estimate,
+                "next": self.get_next_link(),
+                "previous": self.get_previous_link(),
+                "results": data,
+            }
+        )
+
+    def get_paginated_response_schema(self, schema):
+        response_schema = super().get_paginated_response_schema(schema)
+        response_schema["properties"] = {
+            "count": {"type": "integer", "example": 123},
+            "count_is_estimate": {"type": "boolean", "example": True},
+            **response_schema["properties"],
+        }
+        return response_schema
+
+    def get_schema_operation_parameters(self, view):
+        parameters = super().get_schema_operation_parameters(view)
+        parameters.append(
+            {
+                "name": self.include_total_query_param,
+                "required": False,
+                "in": "query",
+                "description": "Set to 1 for an exact count instead of a "
+                "recently cached or estimated one.",
+                "schema": {"type": "integer", "enum": [0, 1]},
+            }
+        )
+        return parameters
@@ -1,7 +1,7 @@
 from django.db import transaction
 from rest_framework import serializers
 
-from .models import Order, OrderItem, Product
+from .models import ArchivedOrder, Order, OrderItem, Product
 
 
 class ProductSerializer(serializers.ModelSerializer):
@@ -26,9 +26,15 @@ class ProductSerializer(serializers.ModelSerializer):
 
 class OrderItemSerializer(serializers.ModelSerializer):
     # product = ProductSerializer()
-    product_name = serializers.CharField(source="product.name")
     product_price = serializers.DecimalField(
-        max_digits=10, decimal_places=2, source="product.price"
+        max_digits=10, decimal_places=2, source="unit_price"
+    )
+    item_subtotal = serializers.DecimalField(
+        max_digits=12,
+        decimal_places=2,
+        source="subtotal",
+        read_only=True,
+        coerce_to_string=False,
     )
 
     class Meta:
@@ -59,30 +65,54 @@ class OrderCreateSerializer(serializers.ModelSerializer):
     order_id = serializers.UUIDField(read_only=True)
     items = OrderItemCreateSerializer(many=True, required=False)
 
+    def _build_items(self, order_items_data):
+        """Unsaved items carrying the products' current name and price."""
+        items = [OrderItem(**item) for item in order_items_data]
+        for item in items:
+            item.snapshot()
+        return items
+
+    def validate_status(self, value):
+        if (
+            self.instance is not None
+            and value != self.instance.status
+            and value not in Order.TRANSITIONS[self.instance.status]
+        ):
+            raise serializers.ValidationError(
+                f"Cannot change status from {self.instance.status} to {value}"
+            )
+        return value
+
     def update(self, instance, validated_data):
-        order_items_data = validated_data.pop("items")
+        order_items_data = validated_data.pop("items", None)
 
         with transaction.atomic():
-            instance = super().update(instance, validated_data)
-
             if order_items_data is not None:
+                items = self._build_items(order_items_data)
+
                 # Clear existing items (optional, depends on requirements)
                 instance.items.all().delete()
 
-                # Recreate items with updated dataß
-                for item in order_items_data:
-                    OrderItem.objects.create(order=instance, **item)
+                # Recreate items with updated data
+                for item in items:
+                    item.order = instance
+                OrderItem.objects.bulk_create(items)
+                validated_data["total"] = sum(item.subtotal for item in items)
 
-        return instance
+            return super().update(instance, validated_data)
 
     def create(self, validated_data):
         order_items_data = validated_data.pop("items")
+        items = self._build_items(order_items_data)
 
         with transaction.atomic():
-            order = Order.objects.create(**validated_data)
+            order = Order.objects.create(
+                total=sum(item.subtotal for item in items), **validated_data
+            )
 
-            for item in order_items_data:
-                OrderItem.objects.create(order=order, **item)
+            for item in items:
+                item.order = order
+            OrderItem.objects.bulk_create(items)
 
         return order
 
@@ -103,11 +133,13 @@ class OrderSerializer(serializers.ModelSerializer):
     order_id = serializers.UUIDField(read_only=True)
     # items = OrderItemSerializer(many=True, read_only=True)
     items = OrderItemSerializer(many=True)
-    total_price = serializers.SerializerMethodField(method_name="total")
-
-    def total(self, obj):
-        order_items = obj.items.all()
-        return sum(order_item.item_subtotal for order_item in order_items)
+    total_price = serializers.DecimalField(
+        max_digits=12,
+        decimal_places=2,
+        source="total",
+        read_only=True,
+        coerce_to_string=False,
+    )
 
     class Meta:
         model = Order
@@ -121,6 +153,62 @@ class OrderSerializer(serializers.ModelSerializer):
         )
 
 
+class OrderBulkStatusSerializer(serializers.Serializer):
+    """Serializer for moving many orders to a new status."""
+
+    order_ids = serializers.ListField(
+        child=serializers.UUIDField(), allow_empty=False, max_length=1000
+    )
+    status = serializers.ChoiceField(choices=Order.StatusChoices.choices)
+    # Only move orders currently in this status.
+    from_status = serializers.ChoiceField(
+        choices=Order.StatusChoices.choices, required=False
+    )
+
+    def validate(self, attrs):
+        from_status = attrs.get("from_status")
+        if not Order.sources(attrs["status"]) or (
+            from_status is not None
+            and attrs["status"] not in Order.TRANSITIONS[from_status]
+        ):
+            raise serializers.ValidationError(
+                f"Cannot change status from {from_status or 'any status'} "
+                f"to {attrs['status']}"
+            )
+        return attrs
+
+
+class OrderBulkStatusResultSerializer(serializers.Serializer):
+    """Outcome of a bulk status change for one order."""
+
+    order_id = serializers.UUIDField()
+    result = serializers.ChoiceField(
+        choices=["updated", "invalid_transition", "not_found"]
+    )
+    # The order's status afterwards; null if it was not found.
+    status = serializers.ChoiceField(
+        choices=Order.StatusChoices.choices, allow_null=True
+    )
+
+
+class ArchivedOrderSerializer(serializers.ModelSerializer):
+    """Renders an archived order like OrderSerializer renders a live one."""
+
+    # The stored item dicts have the OrderItem field names.
+    items = OrderItemSerializer(many=True, read_only=True)
+    total_price = serializers.DecimalField(
+        max_digits=12,
+        decimal_places=2,
+        source="total",
+        read_only=True,
+        coerce_to_string=False,
+    )
+
+    class Meta:
+        model = ArchivedOrder
+        fields = OrderSerializer.Meta.fields
+
+
 class ProductInfoSerializer(serializers.Serializer):
     # Get all products, count of products, and, max price
     products = ProductSerializer(many=True)
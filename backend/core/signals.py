@@ -2,32 +2,98 @@ import os
 
 from django.core.cache import cache
 from django.core.mail import send_mail
-from django.db.models.signals import post_delete, post_save
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save, pre_delete
 from django.dispatch import receiver
+from django.utils import timezone
+from rest_framework.authtoken.models import Token
 
-from core.models import Product, User
+from core import outbox
+from core.authentication import token_cache_key
+from core.caching import bump_order_lists, bump_version, order_lists_changed
+from core.models import Ingredient, Order, OrderItem, Product, Recipe, Tag, User
+
+
+@outbox.handler("product.changed")
+def invalidate_product_lists():
+    # Cached lists are kept so they can be served while the new one is built.
+    bump_version("products")
 
 
 @receiver([post_save, post_delete], sender=Product)
 def invalidate_product_cache(sender, instance, **kwargs):
-    """Invalidate product list when a product is created, updated or deleted."""
-    cache.delete_pattern("*product_list*")
+    """
+    Invalidate the product list once a product change commits.
+
+    The outbox event repeats the invalidation in case this process stops
+    before its on_commit callback runs.
+    """
+    outbox.enqueue("product.changed", key="products")
+    transaction.on_commit(invalidate_product_lists)
+
+
+@receiver([post_save, post_delete], sender=OrderItem, dispatch_uid="order_total")
+def update_order_total(sender, instance, origin=None, **kwargs):
+    """Keep Order.total in step with items saved or deleted one at a time."""
+    if getattr(origin, "model", type(origin)) is Order:
+        # Deleted along with the order.
+        return
+    Order.objects.filter(pk=instance.order_id).update_totals()
+
+
+outbox.handler("order.changed")(bump_order_lists)
+
+
+@receiver([post_save, post_delete], sender=Order, dispatch_uid="order_lists")
+def invalidate_order_lists(sender, instance, **kwargs):
+    """
+    Drop the owner's and staff's cached order lists once the change commits,
+    and again from the outbox.
+    """
+    order_lists_changed([instance.user_id])
+
+
+@receiver(post_save, sender=Tag, dispatch_uid="touch_tag_recipes")
+@receiver(post_save, sender=Ingredient, dispatch_uid="touch_ingredient_recipes")
+@receiver(pre_delete, sender=Tag, dispatch_uid="touch_deleted_tag_recipes")
+@receiver(
+    pre_delete, sender=Ingredient, dispatch_uid="touch_deleted_ingredient_recipes"
+)
+def touch_recipes(sender, instance, created=False, **kwargs):
+    """Bump updated_at on recipes showing a renamed or deleted tag/ingredient."""
+    if created:
+        return
+    field = "tags" if sender is Tag else "ingredients"
+    Recipe.objects.filter(**{field: instance}).update(updated_at=timezone.now())
+
+
+@outbox.handler("user.created")
+def send_welcome_email(email):
+    send_mail(
+        "Welcome!",
+        "Thanks for signing up!",
+        "admin@django.com",
+        [email],
+        fail_silently=False,
+    )
 
 
 @receiver(post_save, sender=User, dispatch_uid="send_welcom_email")
-def send_welcome_email(sender, instance, created, **kwargs):
+def queue_welcome_email(sender, instance, created, **kwargs):
+    """Send the welcome e-mail from the worker once the sign-up commits."""
     if created:
-        send_mail(
-            "Welcome!",
-            "Thanks for signing up!",
-            "admin@django.com",
-            [instance.email],
-            fail_silently=False,
-        )
+        outbox.enqueue("user.created", email=instance.email)
 
 
 @receiver(post_delete, sender=User, dispatch_uid="delete_associated_file")
 def delete_associated_file(sender, instance, **kwargs):
-    if instance.cv:
-        if os.path.isfile(instance.cv.path):
-            os.remove(instance.cv.path)
+    cv = getattr(instance, "cv", None)
+    if cv:
+        if os.path.isfile(cv.path):
+            os.remove(cv.path)
+
+
+@receiver(post_delete, sender=Token, dispatch_uid="invalidate_auth_token_cache")
+def invalidate_auth_token_cache(sender, instance, **kwargs):
+    """Stop accepting a cached token as soon as it is deleted."""
+    cache.delete(token_cache_key(instance.key))
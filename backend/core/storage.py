@@ -0,0 +1,35 @@
+"""
+File storage for files that must not be publicly reachable.
+"""
+
+from django.conf import settings
+from django.core.files.storage import FileSystemStorage
+from django.utils.functional import cached_property
+
+
+class PrivateStorage(FileSystemStorage):
+    """
+    Local files under PRIVATE_ROOT instead of MEDIA_ROOT, which the proxy
+    serves to anyone. They have no URL; views stream them after checking
+    permissions.
+    """
+
+    @cached_property
+    def base_location(self):
+        return self._value_or_setting(self._location, settings.PRIVATE_ROOT)
+
+    def _clear_cached_properties(self, setting, **kwargs):
+        super()._clear_cached_properties(setting, **kwargs)
+        if setting == "PRIVATE_ROOT":
+            self.__dict__.pop("base_location", None)
+            self.__dict__.pop("location", None)
+
+    def url(self, name):
+        raise ValueError("Private files are not served by URL.")
+
+
+_private_storage = PrivateStorage()
+
+
+def private_storage():
+    return _private_storage
@@ -1,6 +1,73 @@
-from celery import shared_task
+from celery import Task, shared_task
+from django.conf import settings
 
+from core import admin_jobs, archive, outbox
+from core.models import AdminJob
 
-@shared_task
+
+class LightTask(Task):
+    """
+    Base for short tasks somebody is waiting on, e.g. e-mails and cache work.
+
+    They run on the "default" queue, whose worker prefetches several messages
+    at a time and acknowledges them on receipt.
+    """
+
+    queue = "default"
+
+
+class HeavyTask(Task):
+    """
+    Base for long batch jobs, e.g. archiving and bulk admin actions.
+
+    They run on the "heavy" queue so they never hold up light tasks. Its
+    worker takes one message at a time, and the message is acknowledged only
+    once the task finishes, so a job lost with its worker is run again. Heavy
+    tasks therefore have to be safe to repeat.
+    """
+
+    queue = "heavy"
+    acks_late = True
+    reject_on_worker_lost = True
+
+
+@shared_task(base=LightTask)
 def add(x, y):
     return x + y
+
+
+@shared_task(base=HeavyTask)
+def archive_orders(batch_size=None, max_batches=None):
+    """
+    Archive old delivered and cancelled orders batch by batch.
+
+    Stops after `max_batches` (default ORDER_ARCHIVE_MAX_BATCHES); the next
+    scheduled run carries on where this one stopped.
+    """
+    max_batches = max_batches or settings.ORDER_ARCHIVE_MAX_BATCHES
+    archived = 0
+    for _ in range(max_batches):
+        count = archive.archive_batch(batch_size=batch_size)
+        archived += count
+        if not count:
+            break
+    return archived
+
+
+@shared_task(base=HeavyTask)
+def run_admin_job(job_id):
+    """Run a bulk admin action; see `core.admin_jobs`."""
+    admin_jobs.run(AdminJob.objects.get(pk=job_id))
+
+
+@shared_task(
+    base=LightTask,
+    acks_late=True,
+    reject_on_worker_lost=True,
+    autoretry_for=(Exception,),
+    retry_backoff=True,
+    max_retries=5,
+)
+def deliver_outbox_event(event_id, topic, payload):
+    """Run the side effect of an outbox event; see `core.outbox`."""
+    outbox.deliver(event_id, topic, payload)
@@ -2,10 +2,20 @@
 Test for the Django admin modifications.
 """
 
+import csv
+import tempfile
+from unittest.mock import patch
+
 from django.contrib.auth import get_user_model
-from django.test import Client, TestCase
+from django.contrib.auth.models import Permission
+from django.db import connection
+from django.test import Client, TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
 from django.urls import reverse
 
+from core.models import AdminJob, Order, OrderItem, OutboxEvent, Product, Recipe
+from core.tasks import run_admin_job
+
 
 class AdminSiteTests(TestCase):
     """Tests from Django admin."""
@@ -45,3 +55,264 @@ class AdminSiteTests(TestCase):
         res = self.client.get(url)
 
         self.assertEqual(res.status_code, 200)
+
+
+class AdminChangelistQueryTests(TestCase):
+    """Test changelist pages run a bounded number of queries on big tables."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.admin_user = get_user_model().objects.create_superuser(
+            email="admin@example.com",
+            password="password123",
+        )
+        users = get_user_model().objects.bulk_create(
+            get_user_model()(email=f"user{i}@example.com") for i in range(100)
+        )
+        cls.product = Product.objects.create(
+            name="Kettle", description="Steel", price=10, stock=5
+        )
+        Product.objects.bulk_create(
+            Product(name=f"Product {i}", description="", price=1, stock=1)
+            for i in range(300)
+        )
+        Order.objects.bulk_create(Order(user=users[i % 100]) for i in range(10_000))
+        Recipe.objects.bulk_create(
+            Recipe(user=users[i % 100], title=f"Recipe {i}", time_minutes=5, price=1)
+            for i in range(10_000)
+        )
+
+    def setUp(self):
+        self.client.force_login(self.admin_user)
+
+    def get_with_bounded_queries(self, url, limit=10):
+        with CaptureQueriesContext(connection) as ctx:
+            res = self.client.get(url)
+
+        self.assertEqual(res.status_code, 200)
+        self.assertLessEqual(len(ctx.captured_queries), limit)
+        return ctx.captured_queries
+
+    def test_changelists(self):
+        for name in ("user", "order", "product", "recipe", "tag", "ingredient"):
+            with self.subTest(name=name):
+                self.get_with_bounded_queries(reverse(f"admin:core_{name}_changelist"))
+
+    def test_filtered_order_changelist(self):
+        url = reverse("admin:core_order_changelist")
+        self.get_with_bounded_queries(f"{url}?status__exact=Pending")
+
+    @override_settings(ADMIN_ESTIMATED_COUNT_THRESHOLD=1000)
+    def test_order_changelist_estimated_count(self):
+        with connection.cursor() as cursor:
+            cursor.execute("ANALYZE core_order")
+
+        queries = self.get_with_bounded_queries(reverse("admin:core_order_changelist"))
+
+        self.assertFalse(
+            any(
+                query["sql"].startswith("SELECT COUNT(*)")
+                and 'FROM "core_order"' in query["sql"]
+                for query in queries
+            )
+        )
+
+    def test_order_change_page(self):
+        order = Order.objects.first()
+        OrderItem.objects.create(order=order, product=self.product, quantity=2)
+
+        url = reverse("admin:core_order_change", args=[order.pk])
+        with CaptureQueriesContext(connection) as ctx:
+            res = self.client.get(url)
+
+        self.assertContains(res, "Kettle")
+        self.assertNotContains(res, "Product 299")
+        self.assertLessEqual(len(ctx.captured_queries), 12)
+
+
+@override_settings(ADMIN_JOB_BATCH_SIZE=2)
+class AdminJobTests(TestCase):
+    """Test bulk admin actions that run as background jobs."""
+
+    def setUp(self):
+        self.admin_user = get_user_model().objects.create_superuser(
+            email="admin@example.com",
+            password="password123",
+        )
+        self.client.force_login(self.admin_user)
+        product = Product.objects.create(
+            name="Kettle", description="Steel", price=10, stock=5
+        )
+        self.orders = [Order.objects.create(user=self.admin_user) for _ in range(5)]
+        for order in self.orders:
+            OrderItem.objects.create(order=order, product=product, quantity=1)
+        self.url = reverse("admin:core_order_changelist")
+
+    def run_action(self, action, orders, url=None, **data):
+        with patch("core.admin.run_admin_job.delay") as delay:
+            with self.captureOnCommitCallbacks(execute=True):
+                res = self.client.post(
+                    url or self.url,
+                    {
+                        "action": action,
+                        "_selected_action": [str(order.pk) for order in orders],
+                        **data,
+                    },
+                )
+        self.assertEqual(res.status_code, 302)
+        job = AdminJob.objects.get()
+        delay.assert_called_once_with(job.pk)
+        run_admin_job(job.pk)
+        job.refresh_from_db()
+        return job
+
+    def test_delete_in_background(self):
+        job = self.run_action("delete_in_background", self.orders[:3])
+
+        self.assertEqual(job.status, AdminJob.StatusChoices.DONE)
+        self.assertEqual((job.processed, job.total), (3, 3))
+        self.assertEqual(Order.objects.count(), 2)
+        self.assertEqual(OrderItem.objects.count(), 2)
+
+    def test_status_in_background(self):
+        Order.objects.filter(pk=self.orders[0].pk).update(
+            status=Order.StatusChoices.DELIVERED
+        )
+        OutboxEvent.objects.all().delete()
+
+        self.run_action("mark_confirmed", self.orders)
+
+        self.assertEqual(
+            sorted(Order.objects.values_list("status", flat=True)),
+            ["Confirmed"] * 4 + ["Delivered"],
+        )
+        payloads = OutboxEvent.objects.filter(topic="order.changed").values_list(
+            "payload", flat=True
+        )
+        self.assertTrue(payloads)
+        self.assertEqual(
+            {tuple(payload["user_ids"]) for payload in payloads},
+            {(self.admin_user.pk,)},
+        )
+
+    def export(self):
+        private_root = tempfile.TemporaryDirectory()
+        self.addCleanup(private_root.cleanup)
+        private = override_settings(PRIVATE_ROOT=private_root.name)
+        private.enable()
+        self.addCleanup(private.disable)
+        return self.run_action("export_csv", self.orders), private_root.name
+
+    def download(self, job):
+        return self.client.get(reverse("admin:core_adminjob_download", args=[job.pk]))
+
+    def test_export_csv(self):
+        job, private_root = self.export()
+
+        self.assertTrue(job.result.path.startswith(private_root))
+        with self.assertRaises(ValueError):
+            job.result.url
+        res = self.download(job)
+        self.assertEqual(res.status_code, 200)
+        rows = list(
+            csv.DictReader(b"".join(res.streaming_content).decode().splitlines())
+        )
+        self.assertEqual(
+            {row["order_id"] for row in rows}, {str(o.pk) for o in self.orders}
+        )
+        self.assertEqual(Order.objects.count(), 5)
+
+    def test_export_download_needs_model_permission(self):
+        job, _ = self.export()
+        staff = get_user_model().objects.create_user(
+            email="staff@example.com", password="password123", is_staff=True
+        )
+        staff.user_permissions.add(Permission.objects.get(codename="view_adminjob"))
+        self.client.force_login(staff)
+
+        self.assertEqual(self.download(job).status_code, 403)
+
+        staff.user_permissions.add(Permission.objects.get(codename="view_order"))
+        self.assertEqual(self.download(job).status_code, 200)
+
+    def test_export_download_not_public(self):
+        job, _ = self.export()
+        self.client.logout()
+
+        res = self.download(job)
+
+        self.assertEqual(res.status_code, 302)
+        self.assertIn(reverse("admin:login"), res.url)
+
+    @override_settings(ADMIN_JOB_BATCH_SIZE=2)
+    def test_delete_all_matching_in_background(self):
+        pending = self.orders[:3]
+        Order.objects.exclude(pk__in=[order.pk for order in pending]).update(
+            status=Order.StatusChoices.DELIVERED
+        )
+        url = f"{self.url}?status__exact=Pending"
+
+        with (
+            patch("core.admin.run_admin_job.delay") as delay,
+            self.captureOnCommitCallbacks(execute=True),
+            CaptureQueriesContext(connection) as ctx,
+        ):
+            self.client.post(
+                url,
+                {
+                    "action": "delete_in_background",
+                    "_selected_action": [str(pending[0].pk)],
+                    "select_across": "1",
+                },
+            )
+
+        # Only the changelist's own count; the keys are not loaded.
+        order_queries = [
+            q["sql"] for q in ctx.captured_queries if "core_order" in q["sql"]
+        ]
+        self.assertTrue(all(sql.startswith("SELECT COUNT(*)") for sql in order_queries))
+        job = AdminJob.objects.get()
+        delay.assert_called_once_with(job.pk)
+        self.assertEqual(list(job.params), ["query"])
+
+        # As when the admin who started it has since been deleted.
+        AdminJob.objects.update(created_by=None)
+        run_admin_job(job.pk)
+        job.refresh_from_db()
+
+        self.assertEqual((job.status, job.processed, job.total), ("done", 3, 3))
+        self.assertEqual(
+            set(Order.objects.values_list("status", flat=True)), {"Delivered"}
+        )
+        self.assertEqual(Order.objects.count(), 2)
+
+    def test_resume_after_interruption(self):
+        ids = sorted(order.pk for order in self.orders)
+        job = AdminJob.objects.create(
+            kind=AdminJob.KindChoices.DELETE,
+            model="core.order",
+            params={"ids": [str(pk) for pk in ids], "after": str(ids[1])},
+            total=5,
+            processed=2,
+        )
+
+        run_admin_job(job.pk)
+
+        self.assertEqual(
+            list(Order.objects.values_list("pk", flat=True).order_by("pk")), ids[:2]
+        )
+
+    def test_synchronous_delete_removed(self):
+        res = self.client.get(self.url)
+
+        self.assertNotContains(res, 'value="delete_selected"')
+        self.assertContains(res, 'value="delete_in_background"')
+
+    def test_job_pages(self):
+        self.run_action("mark_cancelled", self.orders[:1])
+
+        res = self.client.get(reverse("admin:core_adminjob_changelist"))
+        self.assertContains(res, "1 / 1")
+        job = AdminJob.objects.get()
+        res = self.client.get(reverse("admin:core_adminjob_change", args=[job.pk]))
+        self.assertEqual(res.status_code, 200)
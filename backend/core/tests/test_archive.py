@@ -0,0 +1,184 @@
+"""
+Tests for archiving finished orders.
+"""
+
+from datetime import timedelta
+from decimal import Decimal
+
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.reverse import reverse
+from rest_framework.test import APIRequestFactory, force_authenticate
+
+from core.models import ArchivedOrder, Order, OrderItem, OutboxEvent, Product, User
+from core.tasks import archive_orders
+from core.views import UserOrderListAPIView
+
+
+@override_settings(ORDER_ARCHIVE_AFTER_DAYS=30)
+class ArchiveOrdersTests(TestCase):
+    """Test moving old delivered and cancelled orders to the archive."""
+
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(email="user@example.com", password="x")
+        self.client.force_login(self.user)
+        self.product = Product.objects.create(
+            name="Kettle", description="Steel", price=Decimal("20.00"), stock=5
+        )
+
+    def create_order(self, status, days_ago, quantity=1):
+        order = Order.objects.create(user=self.user, status=status)
+        OrderItem.objects.create(order=order, product=self.product, quantity=quantity)
+        when = timezone.now() - timedelta(days=days_ago)
+        Order.objects.filter(pk=order.pk).update(created_at=when)
+        Order.objects.filter(pk=order.pk, finished_at__isnull=False).update(
+            finished_at=when
+        )
+        return order
+
+    def test_archive_terminal_old_orders(self):
+        delivered = self.create_order(Order.StatusChoices.DELIVERED, 60, quantity=2)
+        cancelled = self.create_order(Order.StatusChoices.CANCELLED, 40)
+        pending = self.create_order(Order.StatusChoices.PENDING, 60)
+        recent = self.create_order(Order.StatusChoices.DELIVERED, 5)
+
+        self.assertEqual(archive_orders(batch_size=1), 2)
+
+        self.assertEqual(
+            set(Order.objects.values_list("pk", flat=True)), {pending.pk, recent.pk}
+        )
+        self.assertFalse(
+            OrderItem.objects.filter(order__in=[delivered.pk, cancelled.pk]).exists()
+        )
+        archived = ArchivedOrder.objects.get(pk=delivered.pk)
+        self.assertEqual(archived.total, Decimal("40.00"))
+        self.assertEqual(archived.items[0]["product_name"], "Kettle")
+        self.assertEqual(archived.items[0]["quantity"], 2)
+
+    def test_archive_counts_from_when_orders_finished(self):
+        order = self.create_order(Order.StatusChoices.CONFIRMED, 60)
+        Order.objects.transition([order.pk], Order.StatusChoices.DELIVERED)
+
+        self.assertEqual(archive_orders(), 0)
+        order.refresh_from_db()
+        self.assertAlmostEqual(
+            order.finished_at, timezone.now(), delta=timedelta(minutes=1)
+        )
+
+        finished = timezone.now() - timedelta(days=31)
+        Order.objects.filter(pk=order.pk).update(finished_at=finished)
+        self.assertEqual(archive_orders(), 1)
+        self.assertEqual(ArchivedOrder.objects.get(pk=order.pk).finished_at, finished)
+
+    def test_archive_writes_one_outbox_event_per_batch(self):
+        other = User.objects.create_user(email="other@example.com", password="x")
+        self.create_order(Order.StatusChoices.DELIVERED, 60)
+        order = self.create_order(Order.StatusChoices.CANCELLED, 60)
+        Order.objects.filter(pk=order.pk).update(user=other)
+        OutboxEvent.objects.all().delete()
+
+        self.assertEqual(archive_orders(), 2)
+
+        event = OutboxEvent.objects.get()
+        self.assertEqual(event.topic, "order.changed")
+        self.assertEqual(event.payload, {"user_ids": sorted([self.user.pk, other.pk])})
+
+    def test_max_batches(self):
+        for _ in range(3):
+            self.create_order(Order.StatusChoices.DELIVERED, 60)
+
+        self.assertEqual(archive_orders(batch_size=1, max_batches=2), 2)
+        self.assertEqual(archive_orders(batch_size=1, max_batches=2), 1)
+
+    def test_list_include_archived(self):
+        old = self.create_order(Order.StatusChoices.DELIVERED, 60, quantity=3)
+        live = Order.objects.create(user=self.user)
+        expected = self.client.get(reverse("order-detail", args=[old.pk])).json()
+        with self.captureOnCommitCallbacks(execute=True):
+            archive_orders()
+
+        response = self.client.get(reverse("order-list"))
+        self.assertEqual(
+            [order["order_id"] for order in response.json()], [str(live.pk)]
+        )
+
+        response = self.client.get(reverse("order-list"), {"include_archived": 1})
+        results = response.json()["results"]
+        self.assertEqual(
+            [order["order_id"] for order in results], [str(live.pk), str(old.pk)]
+        )
+        self.assertEqual(results[1], expected)
+
+    def test_list_include_archived_filters(self):
+        self.create_order(Order.StatusChoices.DELIVERED, 60)
+        cancelled = self.create_order(Order.StatusChoices.CANCELLED, 60)
+        archive_orders()
+
+        response = self.client.get(
+            reverse("order-list"), {"include_archived": 1, "status": "Cancelled"}
+        )
+
+        self.assertEqual(
+            [order["order_id"] for order in response.json()["results"]],
+            [str(cancelled.pk)],
+        )
+
+    def test_archived_orders_of_other_users_hidden(self):
+        other = User.objects.create_user(email="other@example.com", password="x")
+        order = self.create_order(Order.StatusChoices.DELIVERED, 60)
+        Order.objects.filter(pk=order.pk).update(user=other)
+        archive_orders()
+
+        response = self.client.get(reverse("order-list"), {"include_archived": 1})
+        self.assertEqual(response.json()["results"], [])
+        url = reverse("order-detail", args=[order.pk])
+        response = self.client.get(url, {"include_archived": 1})
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+    def test_retrieve_archived(self):
+        order = self.create_order(Order.StatusChoices.DELIVERED, 60)
+        archive_orders()
+        url = reverse("order-detail", args=[order.pk])
+
+        self.assertEqual(self.client.get(url).status_code, status.HTTP_404_NOT_FOUND)
+        response = self.client.get(url, {"include_archived": 1})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.json()["total_price"], 20.0)
+
+    def test_paginated_list_include_archived(self):
+        orders = [
+            self.create_order(Order.StatusChoices.DELIVERED, days) for days in (90, 60)
+        ]
+        archive_orders()
+        orders += [Order.objects.create(user=self.user) for _ in range(4)]
+        request = APIRequestFactory().get("/", {"include_archived": 1, "page": 2})
+        force_authenticate(request, self.user)
+
+        response = UserOrderListAPIView.as_view()(request)
+
+        self.assertEqual(response.data["count"], 6)
+        self.assertEqual(
+            [order["order_id"] for order in response.data["results"]],
+            [str(orders[0].pk)],
+        )
+
+    def test_unpaginated_list_include_archived_paged(self):
+        """Test the order viewset pages lists with archived orders."""
+        orders = [
+            self.create_order(Order.StatusChoices.DELIVERED, days) for days in (90, 60)
+        ]
+        archive_orders()
+        orders += [Order.objects.create(user=self.user) for _ in range(4)]
+
+        response = self.client.get(
+            reverse("order-list"), {"include_archived": 1, "page": 2}
+        )
+
+        self.assertEqual(response.json()["count"], 6)
+        self.assertEqual(
+            [order["order_id"] for order in response.json()["results"]],
+            [str(orders[0].pk)],
+        )
@@ -0,0 +1,140 @@
+"""
+Tests for the async (ASGI) read views.
+"""
+
+from decimal import Decimal
+
+from asgiref.sync import sync_to_async
+from django.test import TestCase
+from django.urls import reverse
+from rest_framework import status
+from rest_framework_simplejwt.tokens import RefreshToken
+
+from core.models import Order, OrderItem, Product, User
+
+PRODUCTS_URL = reverse("async-product-list")
+PRODUCT_INFO_URL = reverse("async-product-info")
+ORDERS_URL = reverse("async-user-orders")
+
+
+def create_product(**params):
+    defaults = {
+        "name": "Coffee Machine",
+        "description": "Makes coffee",
+        "price": Decimal("70.99"),
+        "stock": 6,
+    }
+    defaults.update(params)
+    return Product.objects.create(**defaults)
+
+
+class AsyncProductViewTests(TestCase):
+    """Test the async product views."""
+
+    def setUp(self):
+        self.product = create_product()
+        create_product(name="Watch", price=Decimal("500.05"), stock=0)
+
+    async def test_product_list(self):
+        """Test listing products, in stock only as in the sync view."""
+        res = await self.async_client.get(PRODUCTS_URL, {"name__icontains": "co"})
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        data = res.json()
+        self.assertEqual(len(data), 1)
+        self.assertEqual(data[0]["id"], self.product.id)
+        self.assertEqual(data[0]["price"], "70.99")
+
+    async def test_product_list_invalid_filter(self):
+        """Test filter errors keep the shape of the sync view's."""
+        params = {"price__gt": "cheap"}
+        res = await self.async_client.get(PRODUCTS_URL, params)
+        expected = await sync_to_async(self.client.get)("/api/products/", params)
+
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(res.json(), expected.json())
+        self.assertIn("price__gt", res.json())
+
+    async def test_product_list_reflects_changes(self):
+        """Test a cached list is not served after a product changes."""
+        await self.async_client.get(PRODUCTS_URL)
+
+        await sync_to_async(self.rename_product)("Espresso Machine")
+        res = await self.async_client.get(PRODUCTS_URL)
+
+        names = {product["name"] for product in res.json()}
+        self.assertIn("Espresso Machine", names)
+
+    def rename_product(self, name):
+        with self.captureOnCommitCallbacks(execute=True):
+            self.product.name = name
+            self.product.save()
+
+    async def test_product_detail(self):
+        """Test retrieving a product and a missing one."""
+        url = reverse("async-product-detail", args=[self.product.id])
+        res = await self.async_client.get(url)
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(res.json()["name"], self.product.name)
+
+        url = reverse("async-product-detail", args=[self.product.id + 100])
+        res = await self.async_client.get(url)
+        self.assertEqual(res.status_code, status.HTTP_404_NOT_FOUND)
+
+    async def test_product_info(self):
+        """Test the product info aggregates."""
+        res = await self.async_client.get(PRODUCT_INFO_URL)
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(res.json()["count"], 2)
+        self.assertEqual(res.json()["max_price"], 500.05)
+
+    async def test_health_check(self):
+        """Test the async health check."""
+        res = await self.async_client.get(reverse("async-health-check"))
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(res.json(), {"healthy": True, "status": "ok"})
+
+
+class AsyncUserOrdersViewTests(TestCase):
+    """Test the async user orders view."""
+
+    def setUp(self):
+        self.user = User.objects.create_user(email="user1@example.com")
+        other = User.objects.create_user(email="user2@example.com")
+        product = create_product()
+        order = Order.objects.create(user=self.user)
+        OrderItem.objects.create(order=order, product=product, quantity=2)
+        Order.objects.create(user=other)
+        self.token = str(RefreshToken.for_user(self.user).access_token)
+
+    async def test_auth_required(self):
+        """Test the orders view rejects anonymous requests."""
+        res = await self.async_client.get(ORDERS_URL)
+
+        self.assertEqual(res.status_code, status.HTTP_401_UNAUTHORIZED)
+
+    async def test_list_own_orders(self):
+        """Test only the user's orders are returned, with their items."""
+        res = await self.async_client.get(
+            ORDERS_URL, headers={"Authorization": f"Bearer {self.token}"}
+        )
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        data = res.json()
+        self.assertEqual(data["count"], 1)
+        order = data["results"][0]
+        self.assertEqual(order["user"], self.user.id)
+        # Same encoding as the DRF view, which renders raw Decimals as numbers.
+        self.assertEqual(order["items"][0]["item_subtotal"], 141.98)
+
+    async def test_session_auth(self):
+        """Test session authenticated users can list their orders."""
+        await sync_to_async(self.client.force_login)(self.user)
+        self.async_client.cookies = self.client.cookies
+
+        res = await self.async_client.get(ORDERS_URL)
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
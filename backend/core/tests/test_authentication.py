@@ -0,0 +1,74 @@
+"""
+Tests for the shared authentication classes.
+"""
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework import exceptions, status
+from rest_framework.authtoken.models import Token
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.tokens import RefreshToken
+
+from core.authentication import CachedTokenAuthentication, token_cache_key
+
+RECIPES_URL = reverse("recipe:recipe-list")
+
+
+class CachedTokenAuthenticationTests(TestCase):
+    """Test DRF tokens resolved through the cache."""
+
+    def setUp(self):
+        self.user = get_user_model().objects.create_user(
+            email="user@example.com",
+            password="password123",
+        )
+        self.token = Token.objects.create(user=self.user)
+        self.auth = CachedTokenAuthentication()
+        cache.delete(token_cache_key(self.token.key))
+
+    def _token_queries(self):
+        """Authenticate and return the queries that read the token table."""
+        with CaptureQueriesContext(connection) as ctx:
+            user, key = self.auth.authenticate_credentials(self.token.key)
+        self.assertEqual(user, self.user)
+
+        return [q for q in ctx.captured_queries if "authtoken_token" in q["sql"]]
+
+    def test_token_table_read_once(self):
+        """Test the token table is only queried on a cache miss."""
+        self.assertTrue(self._token_queries())
+        self.assertEqual(self._token_queries(), [])
+
+    def test_deleted_token_rejected(self):
+        """Test a deleted token stops authenticating."""
+        self.auth.authenticate_credentials(self.token.key)
+        self.token.delete()
+
+        with self.assertRaises(exceptions.AuthenticationFailed):
+            self.auth.authenticate_credentials(self.token.key)
+
+    def test_inactive_user_rejected(self):
+        """Test a cached token for a deactivated user is rejected."""
+        self.auth.authenticate_credentials(self.token.key)
+        self.user.is_active = False
+        self.user.save()
+
+        with self.assertRaises(exceptions.AuthenticationFailed):
+            self.auth.authenticate_credentials(self.token.key)
+
+    def test_recipe_api_accepts_jwt_and_token(self):
+        """Test the recipe API accepts both JWT and legacy tokens."""
+        client = APIClient()
+        access = RefreshToken.for_user(self.user).access_token
+
+        client.credentials(HTTP_AUTHORIZATION=f"Bearer {access}")
+        res = client.get(RECIPES_URL)
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+
+        client.credentials(HTTP_AUTHORIZATION=f"Token {self.token.key}")
+        res = client.get(RECIPES_URL)
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
@@ -0,0 +1,148 @@
+"""
+Tests for the cached list views and their stampede protection.
+"""
+
+import threading
+import time
+from decimal import Decimal
+from unittest.mock import Mock, patch
+
+from django.core.cache import cache
+from django.db import connection
+from django.test import SimpleTestCase, TransactionTestCase, override_settings
+from rest_framework import status
+from rest_framework.test import APIRequestFactory
+
+from core.caching import bump_version, get_or_compute, get_version, make_etag
+from core.models import Product
+from core.views import ProductListCreateAPIView
+
+REQUESTS = 200
+
+
+class GetOrComputeTests(SimpleTestCase):
+    """Test the versioned, single-flight cache."""
+
+    def setUp(self):
+        cache.clear()
+        self.compute = Mock(side_effect=["first", "second"])
+
+    def get(self, version=1):
+        return get_or_compute("key", version, self.compute, 60)
+
+    def test_fresh_value_computed_once(self):
+        self.assertEqual(self.get(), ("first", 1))
+        self.assertEqual(self.get(), ("first", 1))
+        self.compute.assert_called_once()
+
+    def test_new_version_recomputes(self):
+        self.get()
+
+        self.assertEqual(self.get(version=2), ("second", 2))
+
+    def test_stale_value_served_while_another_computes(self):
+        self.get()
+        lock = cache.lock("key:lock", timeout=10)
+        lock.acquire()
+        self.addCleanup(lock.release)
+
+        self.assertEqual(self.get(version=2), ("first", 1))
+        self.compute.assert_called_once()
+
+    @override_settings(CACHE_LOCK_WAIT=0.1)
+    def test_computes_after_waiting_for_missing_value(self):
+        lock = cache.lock("key:lock", timeout=10)
+        lock.acquire()
+        self.addCleanup(lock.release)
+
+        self.assertEqual(self.get(), ("first", 1))
+
+    def test_slow_value_refreshed_before_expiry(self):
+        cache.set(
+            "key",
+            {"value": "old", "version": 1, "delta": 30, "expiry": time.time() + 10},
+        )
+
+        with patch("core.caching.random.random", return_value=0.99):
+            self.assertEqual(self.get(), ("first", 1))
+
+    def test_quick_value_kept_until_expiry(self):
+        cache.set(
+            "key",
+            {"value": "old", "version": 1, "delta": 0.001, "expiry": time.time() + 10},
+        )
+
+        with patch("core.caching.random.random", return_value=0.99):
+            self.assertEqual(self.get(), ("old", 1))
+
+
+class ProductListStampedeTests(TransactionTestCase):
+    """Test simultaneous product list requests compute the list once."""
+
+    def setUp(self):
+        cache.clear()
+        Product.objects.create(
+            name="Kettle", description="Steel", price=Decimal("20.00"), stock=5
+        )
+        self.view = ProductListCreateAPIView.as_view()
+        self.computed = 0
+        list_products = ProductListCreateAPIView.filter_queryset
+
+        def slow_list(view, queryset):
+            self.computed += 1
+            # A slow query, so every request arrives while it runs.
+            time.sleep(0.5)
+            return list_products(view, queryset)
+
+        patcher = patch.object(ProductListCreateAPIView, "filter_queryset", slow_list)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def get_concurrently(self):
+        barrier = threading.Barrier(REQUESTS)
+        responses = []
+
+        def get():
+            request = APIRequestFactory().get("/api/products/")
+            barrier.wait()
+            try:
+                responses.append(self.view(request))
+            finally:
+                connection.close()
+
+        threads = [threading.Thread(target=get) for _ in range(REQUESTS)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        return responses
+
+    def test_one_recompute_after_invalidation(self):
+        self.view(APIRequestFactory().get("/api/products/"))
+        old_version = get_version("products")
+        Product.objects.create(
+            name="Toaster", description="Steel", price=Decimal("30.00"), stock=5
+        )
+        bump_version("products")
+        self.computed = 0
+
+        responses = self.get_concurrently()
+
+        self.assertEqual(self.computed, 1)
+        self.assertEqual(len(responses), REQUESTS)
+        self.assertTrue(all(r.status_code == status.HTTP_200_OK for r in responses))
+        # The others were served the previous list, labelled as such.
+        served = sorted((len(r.data), r["ETag"]) for r in responses)
+        path = "/api/products/"
+        self.assertEqual(
+            served,
+            [(1, make_etag("products", old_version, path))] * (REQUESTS - 1)
+            + [(2, make_etag("products", get_version("products"), path))],
+        )
+
+    def test_one_compute_on_empty_cache(self):
+        responses = self.get_concurrently()
+
+        self.assertEqual(self.computed, 1)
+        self.assertEqual(len(responses), REQUESTS)
+        self.assertEqual({len(response.data) for response in responses}, {1})
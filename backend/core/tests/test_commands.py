@@ -2,34 +2,74 @@
 Test the custom Django management commands.
 """
 
-from unittest.mock import patch
+from unittest.mock import Mock, patch
 
-from django.core.management import call_command
+from django.core.management import CommandError, call_command
 from django.db.utils import OperationalError
 from django.test import SimpleTestCase
 from psycopg import OperationalError as Psycopg2OperationalError
 
+from core import health
 
-@patch("core.management.commands.wait_for_db.Command.check")
+
+@patch("time.sleep")
 class CommandsTestCase(SimpleTestCase):
     """Test commands."""
 
-    def test_wait_for_db_ready(self, patched_check):
+    def test_wait_for_db_ready(self, patched_sleep):
         """Test waiting for database if database ready."""
-        patched_check.return_value = True
+        probe = Mock(return_value=None)
 
-        call_command("wait_for_db")
+        with patch.dict(health.PROBES, {"database": probe}):
+            call_command("wait_for_db")
 
-        patched_check.assert_called_once_with(databases=["default"])
+        probe.assert_called_once_with()
+        patched_sleep.assert_not_called()
 
-    @patch("time.sleep")
-    def test_wait_for_db_delay(self, patched_sleep, patched_check):
+    def test_wait_for_db_delay(self, patched_sleep):
         """Test waiting for database when getting OperationalError."""
-        patched_check.side_effect = (
-            [Psycopg2OperationalError] * 2 + [OperationalError] * 3 + [True]
+        probe = Mock(
+            side_effect=[Psycopg2OperationalError] * 2 + [OperationalError] * 3 + [None]
         )
 
-        call_command("wait_for_db")
+        with patch.dict(health.PROBES, {"database": probe}):
+            call_command("wait_for_db")
+
+        self.assertEqual(probe.call_count, 6)
+        self.assertEqual(patched_sleep.call_count, 5)
+
+    def test_wait_for_db_backoff(self, patched_sleep):
+        """Test retry delays are jittered and grow up to the max delay."""
+        probe = Mock(side_effect=[OperationalError] * 8 + [None])
+
+        with (
+            patch.dict(health.PROBES, {"database": probe}),
+            patch("random.uniform", side_effect=lambda low, high: high),
+        ):
+            call_command("wait_for_db", initial_delay=0.5, max_delay=4)
+
+        delays = [call.args[0] for call in patched_sleep.call_args_list]
+        self.assertEqual(delays, [0.5, 1, 2, 4, 4, 4, 4, 4])
+
+    def test_wait_for_db_timeout(self, patched_sleep):
+        """Test the command gives up once the timeout has passed."""
+        probe = Mock(side_effect=OperationalError("connection refused"))
+
+        with patch.dict(health.PROBES, {"database": probe}):
+            with self.assertRaises(CommandError):
+                call_command("wait_for_db", timeout=0)
+
+    def test_wait_for_cache_and_broker(self, patched_sleep):
+        """Test waiting for the cache and broker alongside the database."""
+        probes = {
+            "database": Mock(return_value=None),
+            "cache": Mock(side_effect=[ConnectionError, None]),
+            "broker": Mock(return_value=None),
+        }
+
+        with patch.dict(health.PROBES, probes):
+            call_command("wait_for_db", wait_for=["cache", "broker"])
 
-        self.assertEqual(patched_check.call_count, 6)
-        patched_check.assert_called_with(databases=["default"])
+        for probe in probes.values():
+            self.assertTrue(probe.called)
+        self.assertEqual(probes["cache"].call_count, 2)
@@ -0,0 +1,111 @@
+"""
+Tests for password hashing and the bounded authentication backend.
+"""
+
+import runpy
+from unittest.mock import patch
+
+from django.contrib.auth import authenticate, get_user_model
+from django.contrib.auth.hashers import identify_hasher, make_password
+from django.core.cache import cache
+from django.core.exceptions import ImproperlyConfigured
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from rest_framework import status
+
+from core.backends import VerificationBusy, run_bounded, slot_key
+
+EMAIL = "user@example.com"
+PASSWORD = "password123"
+
+
+class PasswordHasherTests(TestCase):
+    """Test hasher selection and rehash on login."""
+
+    def test_new_password_uses_preferred_hasher(self):
+        """Test new passwords are hashed with the preferred hasher."""
+        user = get_user_model().objects.create_user(email=EMAIL, password=PASSWORD)
+
+        self.assertEqual(identify_hasher(user.password).algorithm, "argon2")
+
+    def test_outdated_hash_rehashed_on_login(self):
+        """Test a PBKDF2 hash is replaced with the preferred hasher on login."""
+        user = get_user_model().objects.create_user(email=EMAIL)
+        user.password = make_password(PASSWORD, hasher="pbkdf2_sha256")
+        user.save()
+
+        self.assertEqual(authenticate(username=EMAIL, password=PASSWORD), user)
+
+        user.refresh_from_db()
+        self.assertEqual(identify_hasher(user.password).algorithm, "argon2")
+
+    def test_changed_cost_rehashed_on_login(self):
+        """Test hashes are updated when the tuned costs change."""
+        user = get_user_model().objects.create_user(email=EMAIL, password=PASSWORD)
+
+        with self.settings(ARGON2_TIME_COST=3):
+            authenticate(username=EMAIL, password=PASSWORD)
+
+        user.refresh_from_db()
+        self.assertIn("t=3", user.password)
+
+    def test_wrong_password_not_rehashed(self):
+        """Test a failed login leaves the stored hash untouched."""
+        user = get_user_model().objects.create_user(email=EMAIL)
+        user.password = make_password(PASSWORD, hasher="pbkdf2_sha256")
+        user.save()
+
+        self.assertIsNone(authenticate(username=EMAIL, password="wrong"))
+
+        user.refresh_from_db()
+        self.assertEqual(identify_hasher(user.password).algorithm, "pbkdf2_sha256")
+
+    def test_unknown_hasher_setting(self):
+        """Test an unknown PASSWORD_HASHER names the choices."""
+        with patch.dict("os.environ", {"PASSWORD_HASHER": "md5"}):
+            with self.assertRaisesMessage(ImproperlyConfigured, "argon2, scrypt"):
+                runpy.run_module("backend.settings")
+
+
+@override_settings(AUTH_VERIFY_SLOTS=1, AUTH_VERIFY_QUEUE_TIMEOUT=0.01)
+class BoundedVerificationTests(TestCase):
+    """Test credential checks bounded by the verification slots."""
+
+    def test_login_takes_and_frees_slot(self):
+        """Test logins succeed and give their slot back afterwards."""
+        user = get_user_model().objects.create_user(email=EMAIL, password=PASSWORD)
+
+        self.assertEqual(authenticate(username=EMAIL, password=PASSWORD), user)
+        self.assertEqual(authenticate(username=EMAIL, password=PASSWORD), user)
+        self.assertFalse(cache.lock(slot_key(0)).locked())
+
+    def hold_slot(self):
+        """Take the only slot, as another worker process would, until the end."""
+        lock = cache.lock(slot_key(0), timeout=5)
+        lock.acquire()
+        self.addCleanup(lock.release)
+
+    def test_taken_slots_reject(self):
+        """Test a check with no free slot is rejected instead of waiting on."""
+        self.hold_slot()
+
+        with self.assertRaises(VerificationBusy):
+            run_bounded(make_password, PASSWORD)
+
+    def test_taken_slots_fail_login(self):
+        """Test a login outside DRF fails instead of raising."""
+        get_user_model().objects.create_user(email=EMAIL, password=PASSWORD)
+        self.hold_slot()
+
+        self.assertIsNone(authenticate(username=EMAIL, password=PASSWORD))
+
+    def test_taken_slots_token_views_429(self):
+        """Test the token views answer 429 while every slot is taken."""
+        get_user_model().objects.create_user(email=EMAIL, password=PASSWORD)
+        self.hold_slot()
+
+        for url in (reverse("user:token"), reverse("token_obtain_pair")):
+            with self.subTest(url=url):
+                res = self.client.post(url, {"email": EMAIL, "password": PASSWORD})
+
+                self.assertEqual(res.status_code, status.HTTP_429_TOO_MANY_REQUESTS)
@@ -2,11 +2,40 @@
 Tests for the health check API.
 """
 
-from django.test import TestCase
+import socket
+import threading
+import time
+from unittest.mock import patch
+
+import redis
+from django.conf import settings
+from django.db import OperationalError, connections
+from django.test import TestCase, override_settings
 from django.urls import reverse
 from rest_framework import status
 from rest_framework.test import APIClient
 
+from core import health
+
+READY_URL = reverse("readiness-check")
+
+
+def ok():
+    pass
+
+
+def down():
+    raise ConnectionError("connection refused")
+
+
+def silent_server(test):
+    """Listen on a local port that accepts connections but never replies."""
+    server = socket.socket()
+    server.bind(("127.0.0.1", 0))
+    server.listen()
+    test.addCleanup(server.close)
+    return server.getsockname()[1]
+
 
 class HealthCheckTestCase(TestCase):
     """Test the health check API."""
@@ -20,4 +49,102 @@ class HealthCheckTestCase(TestCase):
         res = self.client.get(url)
 
         self.assertEqual(res.status_code, status.HTTP_200_OK)
-        self.assertEqual(res.data, {"status": "ok"})
+        self.assertEqual(res.data, {"healthy": True, "status": "ok"})
+
+
+class ReadinessCheckTestCase(TestCase):
+    """Test the readiness check API."""
+
+    def setUp(self):
+        self.client = APIClient()
+        health.clear_cache()
+        self.addCleanup(health.clear_cache)
+
+    def test_database_probe(self):
+        """Test the real database probe succeeds."""
+        results = health.run_probes({"database": health.probe_database})
+
+        self.assertTrue(results["database"]["ok"])
+
+    @override_settings(HEALTH_CHECK_TIMEOUT=0.2)
+    def test_database_probe_bounded(self):
+        """Test the database probe sets its own connect and statement timeouts."""
+        connection = health.database_probe_connection()
+        self.addCleanup(connection.close)
+        with connection.cursor() as cursor:
+            cursor.execute("SHOW statement_timeout")
+            self.assertEqual(cursor.fetchone()[0], "200ms")
+
+        port = silent_server(self)
+        start = time.monotonic()
+        with patch.dict(
+            connections.settings["default"], {"HOST": "127.0.0.1", "PORT": port}
+        ):
+            with self.assertRaises(OperationalError):
+                health.probe_database()
+        # libpq waits at least 2 seconds to connect.
+        self.assertLess(time.monotonic() - start, 5)
+
+    def test_cache_probe_bounded(self):
+        """Test the cache probe gives up on a Redis server that doesn't reply."""
+        port = silent_server(self)
+        cache = {**settings.CACHES["default"], "LOCATION": f"redis://127.0.0.1:{port}"}
+
+        start = time.monotonic()
+        with override_settings(HEALTH_CHECK_TIMEOUT=0.2, CACHES={"default": cache}):
+            with self.assertRaises(redis.TimeoutError):
+                health.probe_cache()
+        self.assertLess(time.monotonic() - start, 1)
+
+    @patch.dict(health.PROBES, {"database": ok, "cache": ok, "broker": ok}, clear=True)
+    def test_ready(self):
+        """Test a 200 with per-probe results when all dependencies are up."""
+        res = self.client.get(READY_URL)
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(res.data["status"], "ok")
+        self.assertTrue(res.data["healthy"])
+        self.assertEqual(set(res.data["checks"]), {"database", "cache", "broker"})
+
+    @patch.dict(health.PROBES, {"database": ok, "cache": down}, clear=True)
+    def test_dependency_down(self):
+        """Test a 503 naming the failing dependency."""
+        res = self.client.get(READY_URL)
+
+        self.assertEqual(res.status_code, status.HTTP_503_SERVICE_UNAVAILABLE)
+        self.assertFalse(res.data["healthy"])
+        self.assertTrue(res.data["checks"]["database"]["ok"])
+        self.assertFalse(res.data["checks"]["cache"]["ok"])
+        self.assertIn("refused", res.data["checks"]["cache"]["error"])
+
+    def test_probes_run_concurrently_with_timeout(self):
+        """Test a hung probe times out without delaying the others."""
+        release = threading.Event()
+        self.addCleanup(release.set)
+
+        def hang():
+            release.wait(5)
+
+        def slow():
+            time.sleep(0.05)
+
+        start = time.monotonic()
+        results = health.run_probes(
+            {"hang": hang, "slow1": slow, "slow2": slow}, timeout=0.2
+        )
+        elapsed = time.monotonic() - start
+
+        self.assertLess(elapsed, 1)
+        self.assertEqual(results["hang"], {"ok": False, "error": "timeout"})
+        self.assertTrue(results["slow1"]["ok"])
+        self.assertTrue(results["slow2"]["ok"])
+
+    @override_settings(HEALTH_CHECK_CACHE_SECONDS=60)
+    def test_results_cached(self):
+        """Test frequent polling reuses the last probe results."""
+        with patch.dict(health.PROBES, {"database": ok}, clear=True):
+            self.client.get(READY_URL)
+        with patch.dict(health.PROBES, {"database": down}, clear=True):
+            res = self.client.get(READY_URL)
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
@@ -0,0 +1,148 @@
+"""
+Tests for Idempotency-Key support on order creation.
+"""
+
+import threading
+
+from django.core.cache import cache
+from django.db import connection
+from django.test import TestCase, TransactionTestCase
+from django.test.utils import CaptureQueriesContext
+from rest_framework import status
+from rest_framework.reverse import reverse
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.tokens import RefreshToken
+
+from core.models import Order, Product, User
+
+ORDERS_URL = reverse("order-list")
+
+
+def jwt_client(user):
+    client = APIClient()
+    token = RefreshToken.for_user(user).access_token
+    client.credentials(HTTP_AUTHORIZATION=f"Bearer {token}")
+    return client
+
+
+class IdempotencyKeyTests(TestCase):
+    """Test retried order creation with an Idempotency-Key."""
+
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(email="user@example.com", password="x")
+        self.client = jwt_client(self.user)
+        self.product = Product.objects.create(
+            name="Kettle", description="Steel", price=10, stock=5
+        )
+        self.payload = {"items": [{"product": self.product.id, "quantity": 1}]}
+
+    def post(self, key=None, payload=None, client=None):
+        headers = {"Idempotency-Key": key} if key else {}
+        return (client or self.client).post(
+            ORDERS_URL, payload or self.payload, format="json", headers=headers
+        )
+
+    def test_retry_replays_first_response(self):
+        first = self.post("abc")
+
+        with CaptureQueriesContext(connection) as ctx:
+            second = self.post("abc")
+
+        self.assertEqual(first.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(second.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(second.json(), first.json())
+        self.assertEqual(second.headers["Idempotent-Replayed"], "true")
+        self.assertEqual(Order.objects.count(), 1)
+        self.assertEqual(ctx.captured_queries, [])
+
+    def test_replay_with_session_reads_user(self):
+        session_client = APIClient()
+        session_client.force_login(self.user)
+        first = self.post("abc", client=session_client)
+
+        second = self.post("abc", client=session_client)
+
+        self.assertEqual(second.json(), first.json())
+        self.assertEqual(second.headers["Idempotent-Replayed"], "true")
+        self.assertEqual(Order.objects.count(), 1)
+
+    def test_replay_needs_valid_token(self):
+        self.post("abc")
+        self.client.credentials(HTTP_AUTHORIZATION="Bearer invalid")
+
+        response = self.post("abc")
+
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+
+    def test_key_reused_with_other_body(self):
+        self.post("abc")
+
+        response = self.post("abc", {"items": []})
+
+        self.assertEqual(response.status_code, status.HTTP_422_UNPROCESSABLE_ENTITY)
+        self.assertEqual(Order.objects.count(), 1)
+
+    def test_keys_scoped_per_user(self):
+        other = User.objects.create_user(email="other@example.com", password="x")
+
+        self.post("abc")
+        self.post("abc", client=jwt_client(other))
+
+        self.assertEqual(Order.objects.count(), 2)
+
+    def test_without_key(self):
+        self.post()
+        self.post()
+
+        self.assertEqual(Order.objects.count(), 2)
+
+    def test_failed_request_not_stored(self):
+        response = self.post("abc", {"items": [{"product": 0, "quantity": 1}]})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+        response = self.post("abc", {"items": [{"product": 0, "quantity": 1}]})
+        self.assertNotIn("Idempotent-Replayed", response.headers)
+
+
+class ConcurrentIdempotencyKeyTests(TransactionTestCase):
+    """Test simultaneous retries create one order."""
+
+    def setUp(self):
+        cache.clear()
+
+    def test_concurrent_retries(self):
+        user = User.objects.create_user(email="user@example.com", password="x")
+        product = Product.objects.create(
+            name="Kettle", description="Steel", price=10, stock=5
+        )
+        payload = {"items": [{"product": product.id, "quantity": 1}]}
+        barrier = threading.Barrier(8)
+        responses = []
+
+        def retry():
+            client = jwt_client(user)
+            barrier.wait()
+            try:
+                responses.append(
+                    client.post(
+                        ORDERS_URL,
+                        payload,
+                        format="json",
+                        headers={"Idempotency-Key": "abc"},
+                    )
+                )
+            finally:
+                connection.close()
+
+        threads = [threading.Thread(target=retry) for _ in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(Order.objects.count(), 1)
+        self.assertEqual(
+            {response.json()["order_id"] for response in responses},
+            {str(Order.objects.get().pk)},
+        )
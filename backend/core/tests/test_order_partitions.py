@@ -0,0 +1,155 @@
+"""
+Tests for time-ordered order ids and monthly order partitions.
+"""
+
+from datetime import timedelta
+from io import StringIO
+
+from django.core.cache import cache
+from django.core.management import CommandError, call_command
+from django.db import IntegrityError, connection, transaction
+from django.test import TestCase
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.reverse import reverse
+
+from core.ids import uuid7, uuid7_time
+from core.models import Order, OrderItem, Product, User
+
+
+class UUID7Tests(TestCase):
+    """Test the version 7 UUIDs used as order ids."""
+
+    def test_uuid7_time(self):
+        now = timezone.now()
+        value = uuid7(now)
+
+        self.assertEqual(value.version, 7)
+        self.assertLess(abs(uuid7_time(value) - now), timedelta(milliseconds=1))
+
+    def test_uuid7_sorts_by_time(self):
+        now = timezone.now()
+        values = [uuid7(now + timedelta(milliseconds=i)) for i in range(50)]
+
+        self.assertEqual(sorted(values), values)
+
+    def test_orders_use_uuid7(self):
+        user = User.objects.create_user(email="user@example.com")
+
+        self.assertEqual(Order.objects.create(user=user).order_id.version, 7)
+
+
+class PartitionOrdersTests(TestCase):
+    """Test the partition_orders command."""
+
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(email="user@example.com", password="x")
+        self.client.force_login(self.user)
+        self.product = Product.objects.create(
+            name="Kettle", description="Steel", price=10, stock=5
+        )
+        self.order = Order.objects.create(user=self.user)
+        OrderItem.objects.create(order=self.order, product=self.product, quantity=1)
+        # Two years ago, so it stays in the default partition.
+        self.old = Order.objects.create(user=self.user)
+        Order.objects.filter(pk=self.old.pk).update(
+            created_at=timezone.now() - timedelta(days=730)
+        )
+
+    def partition_of(self, order):
+        with connection.cursor() as cursor:
+            cursor.execute(
+                "SELECT tableoid::regclass::text FROM core_order WHERE order_id = %s",
+                [order.pk],
+            )
+            return cursor.fetchone()[0]
+
+    def test_requires_convert(self):
+        with self.assertRaises(CommandError):
+            call_command("partition_orders", stdout=StringIO())
+
+    def test_convert(self):
+        call_command("partition_orders", "--convert", stdout=StringIO())
+
+        now = timezone.now()
+        self.assertEqual(self.partition_of(self.order), f"core_order_p{now:%Y_%m}")
+        self.assertEqual(self.partition_of(self.old), "core_order_default")
+
+        response = self.client.get(
+            reverse("order-list"), {"created_at": f"{now:%Y-%m-%d}"}
+        )
+        self.assertEqual(
+            [order["order_id"] for order in response.json()], [str(self.order.pk)]
+        )
+        response = self.client.post(
+            reverse("order-list"),
+            {"items": [{"product": self.product.id, "quantity": 2}]},
+            content_type="application/json",
+        )
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+
+        self.order.delete()
+        self.assertFalse(OrderItem.objects.filter(order_id=self.order.pk).exists())
+
+    def test_convert_keeps_item_references(self):
+        call_command("partition_orders", "--convert", stdout=StringIO())
+        with connection.cursor() as cursor:
+            cursor.execute("SET CONSTRAINTS ALL IMMEDIATE")
+
+        missing = uuid7()
+        with self.assertRaisesMessage(IntegrityError, f"order {missing} of"):
+            with transaction.atomic():
+                OrderItem.objects.create(
+                    order_id=missing, product=self.product, quantity=1
+                )
+
+        OrderItem.objects.create(order=self.old, product=self.product, quantity=1)
+
+    def test_order_id_unique_within_partition(self):
+        call_command("partition_orders", "--convert", stdout=StringIO())
+        other = Order.objects.create(user=self.user)
+
+        with self.assertRaises(IntegrityError), transaction.atomic():
+            Order.objects.filter(pk=other.pk).update(order_id=self.order.pk)
+
+    def test_orphaned_items_fail_the_run(self):
+        call_command("partition_orders", "--convert", stdout=StringIO())
+        with connection.cursor() as cursor:
+            cursor.execute(
+                "DELETE FROM core_order WHERE order_id = %s", [self.order.pk]
+            )
+
+        with self.assertRaisesMessage(CommandError, "1 rows of core_orderitem"):
+            call_command("partition_orders", stdout=StringIO())
+
+    def test_create_past_months(self):
+        call_command("partition_orders", "--convert", stdout=StringIO())
+        self.old.refresh_from_db()
+
+        call_command(
+            "partition_orders",
+            "--since",
+            f"{self.old.created_at:%Y-%m}",
+            stdout=StringIO(),
+        )
+
+        self.assertEqual(
+            self.partition_of(self.old), f"core_order_p{self.old.created_at:%Y_%m}"
+        )
+
+    def test_detach(self):
+        now = timezone.now()
+        call_command("partition_orders", "--convert", stdout=StringIO())
+
+        next_month = f"{now + timedelta(days=32):%Y-%m}"
+        call_command(
+            "partition_orders", "--detach-before", next_month, stdout=StringIO()
+        )
+
+        self.assertFalse(Order.objects.filter(pk=self.order.pk).exists())
+        self.assertTrue(Order.objects.filter(pk=self.old.pk).exists())
+        self.assertFalse(OrderItem.objects.filter(order_id=self.order.pk).exists())
+        with connection.cursor() as cursor:
+            cursor.execute(f"SELECT order_id FROM core_orderitem_p{now:%Y_%m}")
+            self.assertEqual(cursor.fetchall(), [(self.order.pk,)])
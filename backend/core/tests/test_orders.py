@@ -1,12 +1,22 @@
+import uuid
+from decimal import Decimal
+from io import StringIO
+from unittest.mock import patch
+
+from django.core.cache import cache
+from django.core.management import call_command
+from django.db import connection
 from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
 from rest_framework import status
 from rest_framework.reverse import reverse
 
-from core.models import Order, User
+from core.models import Order, OrderItem, OutboxEvent, Product, User
 
 
 class UserOrderTestCase(TestCase):
     def setUp(self):
+        cache.clear()
         user1 = User.objects.create_user(email="user1@example.com", password="test")
         user2 = User.objects.create_user(email="user2@example.com", password="test")
         Order.objects.create(user=user1)
@@ -24,3 +34,214 @@ class UserOrderTestCase(TestCase):
     def test_user_order_list_unauthenticated(self):
         response = self.client.get(reverse("order-list"))
         self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+
+
+class OrderSnapshotTestCase(TestCase):
+    """Test order items keep the product name and price they were bought at."""
+
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(email="user1@example.com", password="test")
+        self.client.force_login(self.user)
+        self.product = Product.objects.create(
+            name="Kettle", description="Steel", price=Decimal("20.00"), stock=5
+        )
+
+    def create_order(self, quantity=2):
+        response = self.client.post(
+            reverse("order-list"),
+            {"items": [{"product": self.product.id, "quantity": quantity}]},
+            content_type="application/json",
+        )
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        return Order.objects.get(order_id=response.json()["order_id"])
+
+    def test_create_order_stores_snapshot_and_total(self):
+        order = self.create_order()
+
+        item = order.items.get()
+        self.assertEqual(item.product_name, "Kettle")
+        self.assertEqual(item.unit_price, Decimal("20.00"))
+        self.assertEqual(item.subtotal, Decimal("40.00"))
+        self.assertEqual(order.total, Decimal("40.00"))
+
+    def test_repricing_keeps_order_values(self):
+        self.create_order()
+        self.product.name = "Electric Kettle"
+        self.product.price = Decimal("35.00")
+        self.product.save()
+
+        with CaptureQueriesContext(connection) as ctx:
+            response = self.client.get(reverse("order-list"))
+
+        [order] = response.json()
+        self.assertEqual(order["total_price"], 40.0)
+        self.assertEqual(order["items"][0]["product_name"], "Kettle")
+        self.assertEqual(order["items"][0]["product_price"], "20.00")
+        self.assertFalse(
+            any('"core_product"' in query["sql"] for query in ctx.captured_queries)
+        )
+
+    def test_item_changes_update_total(self):
+        order = self.create_order()
+
+        item = OrderItem.objects.create(order=order, product=self.product, quantity=1)
+        order.refresh_from_db()
+        self.assertEqual(order.total, Decimal("60.00"))
+
+        item.delete()
+        order.refresh_from_db()
+        self.assertEqual(order.total, Decimal("40.00"))
+
+    def test_backfill_order_items(self):
+        order = self.create_order(quantity=3)
+        OrderItem.objects.update(product_name="", unit_price=0, subtotal=0)
+        Order.objects.update(total=0)
+
+        call_command("backfill_order_items", batch_size=1, stdout=StringIO())
+
+        item = order.items.get()
+        order.refresh_from_db()
+        self.assertEqual(item.product_name, "Kettle")
+        self.assertEqual(item.subtotal, Decimal("60.00"))
+        self.assertEqual(order.total, Decimal("60.00"))
+
+
+class OrderStatusTestCase(TestCase):
+    """Test changing order status, one at a time and in bulk."""
+
+    def setUp(self):
+        cache.clear()
+        self.staff = User.objects.create_user(email="staff@example.com", password="x")
+        self.staff.is_staff = True
+        self.staff.save()
+        self.user = User.objects.create_user(email="user1@example.com", password="x")
+        self.pending = Order.objects.create(user=self.user)
+        self.confirmed = Order.objects.create(
+            user=self.user, status=Order.StatusChoices.CONFIRMED
+        )
+        self.delivered = Order.objects.create(
+            user=self.user, status=Order.StatusChoices.DELIVERED
+        )
+        self.url = reverse("order-bulk-status")
+
+    def bulk(self, order_ids, status_, **extra):
+        self.client.force_login(self.staff)
+        with self.captureOnCommitCallbacks(execute=True):
+            return self.client.post(
+                self.url,
+                {
+                    "order_ids": [str(pk) for pk in order_ids],
+                    "status": status_,
+                    **extra,
+                },
+                content_type="application/json",
+            )
+
+    def test_bulk_status(self):
+        missing = uuid.uuid4()
+        with CaptureQueriesContext(connection) as ctx:
+            response = self.bulk(
+                [self.pending.pk, self.confirmed.pk, self.delivered.pk, missing],
+                "Cancelled",
+            )
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(
+            [(row["result"], row["status"]) for row in response.json()],
+            [
+                ("updated", "Cancelled"),
+                ("updated", "Cancelled"),
+                ("invalid_transition", "Delivered"),
+                ("not_found", None),
+            ],
+        )
+        updates = [
+            q["sql"]
+            for q in ctx.captured_queries
+            if q["sql"].startswith("UPDATE core_order ")
+        ]
+        self.assertEqual(len(updates), 1)
+        self.pending.refresh_from_db()
+        self.assertEqual(self.pending.status, Order.StatusChoices.CANCELLED)
+
+    def test_bulk_status_writes_outbox_event(self):
+        OutboxEvent.objects.all().delete()
+
+        self.bulk([self.pending.pk, self.confirmed.pk], "Cancelled")
+
+        event = OutboxEvent.objects.get()
+        self.assertEqual(event.topic, "order.changed")
+        self.assertEqual(event.key, f"orders:{self.user.pk}")
+        self.assertEqual(event.payload, {"user_ids": [self.user.pk]})
+
+    def test_bulk_status_rolls_back_when_outbox_write_fails(self):
+        with patch("core.caching.outbox.enqueue", side_effect=RuntimeError):
+            with self.assertRaises(RuntimeError):
+                self.bulk([self.pending.pk], "Confirmed")
+
+        self.pending.refresh_from_db()
+        self.assertEqual(self.pending.status, Order.StatusChoices.PENDING)
+
+    def test_bulk_status_from_status(self):
+        response = self.bulk(
+            [self.pending.pk, self.confirmed.pk], "Cancelled", from_status="Confirmed"
+        )
+
+        self.assertEqual(
+            [row["result"] for row in response.json()],
+            ["invalid_transition", "updated"],
+        )
+
+    def test_bulk_status_rejects_impossible_transition(self):
+        response = self.bulk([self.pending.pk], "Pending")
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+        response = self.bulk([self.pending.pk], "Delivered", from_status="Pending")
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_bulk_status_staff_only(self):
+        self.client.force_login(self.user)
+
+        response = self.client.post(
+            self.url,
+            {"order_ids": [str(self.pending.pk)], "status": "Confirmed"},
+            content_type="application/json",
+        )
+
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+
+    def test_bulk_status_invalidates_user_list(self):
+        self.client.force_login(self.user)
+        self.client.get(reverse("order-list"))
+
+        self.bulk([self.pending.pk], "Confirmed")
+
+        self.client.force_login(self.user)
+        statuses = {
+            order["order_id"]: order["status"]
+            for order in self.client.get(reverse("order-list")).json()
+        }
+        self.assertEqual(statuses[str(self.pending.pk)], "Confirmed")
+
+    def test_order_list_cached_per_user(self):
+        other = User.objects.create_user(email="user2@example.com", password="x")
+        self.client.force_login(self.user)
+        self.client.get(reverse("order-list"))
+
+        self.client.force_login(other)
+        self.assertEqual(self.client.get(reverse("order-list")).json(), [])
+
+    def test_patch_status_without_items(self):
+        self.client.force_login(self.user)
+        url = reverse("order-detail", args=[self.pending.pk])
+
+        response = self.client.patch(
+            url, {"status": "Confirmed"}, content_type="application/json"
+        )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+        response = self.client.patch(
+            url, {"status": "Pending"}, content_type="application/json"
+        )
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
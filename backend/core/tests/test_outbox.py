@@ -0,0 +1,140 @@
+"""
+Tests for the transactional outbox.
+"""
+
+from datetime import timedelta
+from decimal import Decimal
+from unittest.mock import Mock, patch
+
+from django.core import mail
+from django.core.cache import cache
+from django.core.management import call_command
+from django.db import transaction
+from django.test import TestCase
+from django.utils import timezone
+from kombu.exceptions import OperationalError
+
+from core import outbox
+from core.caching import get_version
+from core.models import OutboxEvent, Product, User
+from core.tasks import deliver_outbox_event
+
+
+def create_product(**params):
+    defaults = {
+        "name": "Kettle",
+        "description": "Steel",
+        "price": Decimal("20.00"),
+        "stock": 5,
+    }
+    defaults.update(params)
+    return Product.objects.create(**defaults)
+
+
+class OutboxEnqueueTests(TestCase):
+    """Test that model changes write outbox events in their transaction."""
+
+    def test_product_change_writes_event(self):
+        create_product()
+
+        event = OutboxEvent.objects.get()
+        self.assertEqual(event.topic, "product.changed")
+        self.assertEqual(event.key, "products")
+        self.assertIsNone(event.dispatched_at)
+
+    def test_rolled_back_change_writes_no_event(self):
+        with self.assertRaises(RuntimeError), transaction.atomic():
+            User.objects.create_user(email="user@example.com", password="x")
+            raise RuntimeError
+
+        self.assertFalse(OutboxEvent.objects.exists())
+
+    def test_signup_queues_welcome_email(self):
+        User.objects.create_user(email="user@example.com", password="x")
+
+        self.assertEqual(mail.outbox, [])
+        event = OutboxEvent.objects.get(topic="user.created")
+        self.assertEqual(event.payload, {"email": "user@example.com"})
+
+
+@patch("core.tasks.deliver_outbox_event.apply_async")
+class OutboxRelayTests(TestCase):
+    """Test sending pending events to Celery."""
+
+    def setUp(self):
+        create_product(name="Kettle")
+        create_product(name="Toaster")
+        User.objects.create_user(email="user@example.com", password="x")
+
+    def test_relay_sends_events_once_per_key(self, apply_async):
+        self.assertEqual(outbox.relay(), 3)
+
+        topics = [call.args[0][1] for call in apply_async.call_args_list]
+        self.assertEqual(topics, ["product.changed", "user.created"])
+        event = OutboxEvent.objects.get(topic="user.created")
+        apply_async.assert_called_with(
+            (str(event.event_id), "user.created", {"email": "user@example.com"}),
+            task_id=str(event.event_id),
+        )
+        self.assertFalse(OutboxEvent.objects.filter(dispatched_at=None).exists())
+        self.assertEqual(outbox.relay(), 0)
+
+    def test_relay_batches(self, apply_async):
+        self.assertEqual(outbox.relay(batch_size=2), 2)
+        self.assertEqual(outbox.relay(batch_size=2), 1)
+
+    def test_failed_publish_leaves_events_pending(self, apply_async):
+        apply_async.side_effect = OperationalError
+
+        with self.assertRaises(OperationalError):
+            outbox.relay()
+
+        self.assertEqual(OutboxEvent.objects.filter(dispatched_at=None).count(), 3)
+
+    def test_command_relays_and_prunes(self, apply_async):
+        old = OutboxEvent.objects.create(
+            topic="product.changed",
+            dispatched_at=timezone.now() - timedelta(days=30),
+        )
+
+        call_command("relay_outbox", "--once")
+
+        self.assertEqual(apply_async.call_count, 2)
+        self.assertFalse(OutboxEvent.objects.filter(pk=old.pk).exists())
+        self.assertEqual(OutboxEvent.objects.count(), 3)
+
+
+class OutboxDeliveryTests(TestCase):
+    """Test running event handlers in the worker."""
+
+    def setUp(self):
+        cache.clear()
+
+    def test_delivery_sends_welcome_email_once(self):
+        args = ("0192b1c2-0000-7000-8000-000000000000", "user.created")
+        payload = {"email": "user@example.com"}
+
+        deliver_outbox_event.apply((*args, payload))
+        deliver_outbox_event.apply((*args, payload))
+
+        self.assertEqual(len(mail.outbox), 1)
+        self.assertEqual(mail.outbox[0].to, ["user@example.com"])
+
+    def test_failed_handler_runs_again(self):
+        handler = Mock(side_effect=[RuntimeError, None])
+
+        with patch.dict(outbox.HANDLERS, {"test": handler}):
+            with self.assertRaises(RuntimeError):
+                outbox.deliver("event", "test", {"value": 1})
+            self.assertTrue(outbox.deliver("event", "test", {"value": 1}))
+            self.assertFalse(outbox.deliver("event", "test", {"value": 1}))
+
+        self.assertEqual(handler.call_count, 2)
+        handler.assert_called_with(value=1)
+
+    def test_product_event_invalidates_product_lists(self):
+        version = get_version("products")
+
+        outbox.deliver("event", "product.changed", {})
+
+        self.assertNotEqual(get_version("products"), version)
@@ -0,0 +1,99 @@
+"""
+Tests for the product API.
+"""
+
+from decimal import Decimal
+from unittest.mock import patch
+
+from django.core.cache import cache
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from core.models import Product
+from core.serializers import ProductSerializer
+
+PRODUCTS_URL = "/api/products/"
+
+
+def detail_url(product_id):
+    return f"/api/products/{product_id}/"
+
+
+def create_product(**params):
+    defaults = {
+        "name": "Coffee Machine",
+        "description": "Makes coffee",
+        "price": Decimal("70.99"),
+        "stock": 6,
+    }
+    defaults.update(params)
+    return Product.objects.create(**defaults)
+
+
+class ProductConditionalRequestTests(TestCase):
+    """Test ETag and Last-Modified handling on product reads."""
+
+    def setUp(self):
+        self.client = APIClient()
+        self.product = create_product()
+        cache.clear()
+
+    def test_detail_not_modified(self):
+        """Test a 304 from one query and no serialization."""
+        url = detail_url(self.product.id)
+        etag = self.client.get(url)["ETag"]
+
+        with (
+            patch.object(ProductSerializer, "to_representation") as to_repr,
+            CaptureQueriesContext(connection) as ctx,
+        ):
+            res = self.client.get(url, headers={"If-None-Match": etag})
+
+        self.assertEqual(res.status_code, status.HTTP_304_NOT_MODIFIED)
+        self.assertEqual(len(ctx.captured_queries), 1)
+        to_repr.assert_not_called()
+
+    def test_detail_modified(self):
+        """Test an updated product is served in full again."""
+        url = detail_url(self.product.id)
+        res = self.client.get(url)
+        etag, last_modified = res["ETag"], res["Last-Modified"]
+
+        res = self.client.get(url, headers={"If-Modified-Since": last_modified})
+        self.assertEqual(res.status_code, status.HTTP_304_NOT_MODIFIED)
+
+        # HTTP dates only have second precision; the ETag catches the change.
+        self.product.price = Decimal("60.00")
+        self.product.save()
+
+        res = self.client.get(url, headers={"If-None-Match": etag})
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(res.data["price"], "60.00")
+
+    def test_list_not_modified(self):
+        """Test the product list revalidates from the cache alone."""
+        etag = self.client.get(PRODUCTS_URL)["ETag"]
+
+        with (
+            patch.object(ProductSerializer, "to_representation") as to_repr,
+            CaptureQueriesContext(connection) as ctx,
+        ):
+            res = self.client.get(PRODUCTS_URL, headers={"If-None-Match": etag})
+
+        self.assertEqual(res.status_code, status.HTTP_304_NOT_MODIFIED)
+        self.assertEqual(ctx.captured_queries, [])
+        to_repr.assert_not_called()
+
+    def test_list_changes_with_collection(self):
+        """Test adding a product changes the list validator."""
+        etag = self.client.get(PRODUCTS_URL)["ETag"]
+        with self.captureOnCommitCallbacks(execute=True):
+            create_product(name="Watch")
+
+        res = self.client.get(PRODUCTS_URL, headers={"If-None-Match": etag})
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(res.data), 2)
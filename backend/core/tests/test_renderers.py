@@ -0,0 +1,113 @@
+"""
+Tests for the JSON renderer and response compression.
+"""
+
+import gzip
+import uuid
+from decimal import Decimal
+from unittest import skipIf
+from unittest.mock import patch
+
+from django.http import HttpResponse
+from django.test import RequestFactory, SimpleTestCase, override_settings
+from django.utils import timezone
+from django.utils.translation import gettext_lazy
+from rest_framework.renderers import JSONRenderer
+
+from core.middleware import CompressionMiddleware, brotli
+from core.renderers import ORJSONRenderer
+
+
+class ORJSONRendererTests(SimpleTestCase):
+    """Test the orjson renderer."""
+
+    def test_matches_json_renderer(self):
+        """Test the output is identical to DRF's JSONRenderer."""
+        data = {
+            "order_id": uuid.uuid4(),
+            "created_at": timezone.now(),
+            "total_price": Decimal("12.50"),
+            "detail": gettext_lazy("Not found."),
+            "name": "Café \u2028",
+            "items": [{"quantity": 2}],
+            1: None,
+        }
+
+        self.assertEqual(ORJSONRenderer().render(data), JSONRenderer().render(data))
+
+    def test_indent(self):
+        """Test indented output is still honoured."""
+        data = {"a": [1, 2]}
+
+        self.assertEqual(
+            ORJSONRenderer().render(data, "application/json; indent=4"),
+            JSONRenderer().render(data, "application/json; indent=4"),
+        )
+
+    def test_none(self):
+        """Test no data renders an empty body."""
+        self.assertEqual(ORJSONRenderer().render(None), b"")
+
+
+@override_settings(COMPRESSION_MIN_LENGTH=100)
+class CompressionMiddlewareTests(SimpleTestCase):
+    """Test response compression."""
+
+    def setUp(self):
+        self.factory = RequestFactory()
+        self.body = b'{"name": "Coffee Machine"}' * 20
+
+    def _get(self, body, accept_encoding):
+        request = self.factory.get("/", headers={"Accept-Encoding": accept_encoding})
+        middleware = CompressionMiddleware(lambda request: HttpResponse(body))
+        return middleware(request)
+
+    def test_small_response_uncompressed(self):
+        """Test responses below the threshold are sent as is."""
+        res = self._get(self.body[:50], "gzip, br")
+
+        self.assertFalse(res.has_header("Content-Encoding"))
+        self.assertEqual(res.content, self.body[:50])
+
+    def test_gzip(self):
+        """Test gzip is used when the client accepts it."""
+        res = self._get(self.body, "gzip")
+
+        self.assertEqual(res["Content-Encoding"], "gzip")
+        self.assertEqual(gzip.decompress(res.content), self.body)
+        self.assertIn("Accept-Encoding", res["Vary"])
+
+    @skipIf(brotli is None, "brotli is not installed")
+    def test_brotli_preferred(self):
+        """Test brotli is preferred when the client accepts both."""
+        res = self._get(self.body, "gzip, deflate, br")
+
+        self.assertEqual(res["Content-Encoding"], "br")
+        self.assertEqual(brotli.decompress(res.content), self.body)
+        self.assertIn("Accept-Encoding", res["Vary"])
+
+    @skipIf(brotli is None, "brotli is not installed")
+    def test_brotli_random_padding(self):
+        """Test brotli responses get random padding against BREACH."""
+        lengths = {}
+        for padding in (0, 1, 5, 99):
+            with patch("core.middleware.secrets.randbelow", return_value=padding):
+                res = self._get(self.body, "br")
+            self.assertEqual(brotli.decompress(res.content), self.body)
+            lengths[padding] = len(res.content)
+
+        self.assertEqual(lengths[99] - lengths[5], 94)
+        self.assertGreater(lengths[1], lengths[0])
+
+    def test_brotli_unavailable(self):
+        """Test gzip is used when brotli is not installed."""
+        with patch("core.middleware.brotli", None):
+            res = self._get(self.body, "br, gzip")
+
+        self.assertEqual(res["Content-Encoding"], "gzip")
+
+    def test_no_accept_encoding(self):
+        """Test nothing is compressed for clients that do not ask for it."""
+        res = self._get(self.body, "")
+
+        self.assertFalse(res.has_header("Content-Encoding"))
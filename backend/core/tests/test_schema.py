@@ -0,0 +1,96 @@
+"""
+Tests for the prebuilt OpenAPI schema.
+"""
+
+import json
+import tempfile
+from pathlib import Path
+from unittest.mock import patch
+
+from django.core.management import call_command
+from django.http import Http404
+from django.test import RequestFactory, SimpleTestCase, override_settings
+
+from core.views import StaticSchemaView
+
+
+class BuildSchemaCommandTests(SimpleTestCase):
+    """Test the build_schema command."""
+
+    def setUp(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.path = Path(tmp.name) / "schema.yaml"
+
+    def test_build_schema(self):
+        """Test the schema and its fingerprint are written."""
+        call_command("build_schema", file=str(self.path))
+
+        self.assertIn("openapi:", self.path.read_text())
+        self.assertIn("openapi", json.loads(self.path.with_suffix(".json").read_text()))
+        self.assertTrue(Path(f"{self.path}.sha256").exists())
+
+    def test_unchanged_sources_skipped(self):
+        """Test the schema is only regenerated when the sources change."""
+        call_command("build_schema", file=str(self.path))
+
+        with patch("core.management.commands.build_schema.call_command") as spec:
+            call_command("build_schema", file=str(self.path))
+            spec.assert_not_called()
+
+            call_command("build_schema", file=str(self.path), force=True)
+            self.assertEqual(spec.call_count, 2)
+
+
+class StaticSchemaViewTests(SimpleTestCase):
+    """Test serving the prebuilt schema."""
+
+    def setUp(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.path = Path(tmp.name) / "schema.yaml"
+        self.path.write_text("openapi: 3.0.3\n")
+        self.factory = RequestFactory()
+        self.view = StaticSchemaView.as_view()
+
+    def test_serves_file_with_etag(self):
+        """Test the schema file is served with an ETag."""
+        with override_settings(OPENAPI_SCHEMA_FILE=self.path):
+            res = self.view(self.factory.get("/api/schema/"))
+
+        self.assertEqual(res.status_code, 200)
+        self.assertEqual(b"".join(res.streaming_content), b"openapi: 3.0.3\n")
+        self.assertTrue(res["ETag"])
+
+    def test_if_none_match(self):
+        """Test a matching If-None-Match gets a 304 and a changed file a 200."""
+        with override_settings(OPENAPI_SCHEMA_FILE=self.path):
+            etag = self.view(self.factory.get("/api/schema/"))["ETag"]
+            res = self.view(
+                self.factory.get("/api/schema/", headers={"If-None-Match": etag})
+            )
+            self.assertEqual(res.status_code, 304)
+
+            self.path.write_text("openapi: 3.0.3\ninfo: {}\n")
+            res = self.view(
+                self.factory.get("/api/schema/", headers={"If-None-Match": etag})
+            )
+            self.assertEqual(res.status_code, 200)
+            self.assertNotEqual(res["ETag"], etag)
+
+    def test_serves_json(self):
+        """Test ?format=json serves the JSON copy with its own ETag."""
+        self.path.with_suffix(".json").write_text('{"openapi": "3.0.3"}')
+        with override_settings(OPENAPI_SCHEMA_FILE=self.path):
+            yaml_etag = self.view(self.factory.get("/api/schema/"))["ETag"]
+            res = self.view(self.factory.get("/api/schema/", {"format": "json"}))
+
+        self.assertEqual(res["Content-Type"], "application/vnd.oai.openapi+json")
+        self.assertEqual(b"".join(res.streaming_content), b'{"openapi": "3.0.3"}')
+        self.assertNotEqual(res["ETag"], yaml_etag)
+
+    def test_unknown_format(self):
+        """Test a format the schema isn't built in is not found."""
+        with override_settings(OPENAPI_SCHEMA_FILE=self.path):
+            with self.assertRaises(Http404):
+                self.view(self.factory.get("/api/schema/", {"format": "xml"}))
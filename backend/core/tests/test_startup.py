@@ -0,0 +1,44 @@
+"""
+Tests for worker startup cost.
+"""
+
+import os
+
+from django.conf import settings
+from django.test import SimpleTestCase
+
+from core.management.commands.profile_startup import profile_imports
+
+# Generous enough for a cold CI container; a regression that pulls a heavy
+# dependency back into startup still shows up well before this.
+SETUP_BUDGET_SECONDS = float(os.environ.get("SETUP_BUDGET_SECONDS", 2.0))
+
+DEFERRED_MODULES = [
+    "drf_spectacular.generators",
+    "PIL.Image",
+    "jwt",
+]
+
+
+class StartupTests(SimpleTestCase):
+    """Test worker startup stays cheap."""
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.setup, cls.total, imports = profile_imports()
+        cls.modules = {module for module, _ in imports}
+
+    def test_setup_within_budget(self):
+        """Test django.setup() finishes within the time budget."""
+        self.assertLess(self.setup, SETUP_BUDGET_SECONDS)
+
+    def test_heavy_modules_deferred(self):
+        """Test heavy dependencies are not imported before the first request."""
+        modules = DEFERRED_MODULES
+        if not settings.SILK_ENABLED:
+            modules = [*modules, "silk.middleware"]
+
+        for module in modules:
+            with self.subTest(module=module):
+                self.assertNotIn(module, self.modules)
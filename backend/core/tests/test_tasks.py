@@ -0,0 +1,85 @@
+"""
+Tests for Celery queues and task results.
+"""
+
+import uuid
+from unittest.mock import patch
+from urllib.parse import urlparse
+
+from celery import states
+from django.conf import settings
+from django.core.cache import cache
+from django.test import SimpleTestCase
+from django_redis import get_redis_connection
+
+from backend.celery import app
+from core.tasks import add, archive_orders, run_admin_job
+
+
+class TaskRoutingTests(SimpleTestCase):
+    """Test that tasks are sent to the queue of their base class."""
+
+    def queue_of(self, task, *args):
+        with patch.object(app, "send_task") as send_task:
+            task.apply_async(args)
+        return send_task.call_args.kwargs["queue"]
+
+    def test_light_tasks_use_default_queue(self):
+        self.assertEqual(self.queue_of(add, 1, 2), "default")
+
+    def test_heavy_tasks_use_heavy_queue(self):
+        self.assertEqual(self.queue_of(archive_orders), "heavy")
+        self.assertEqual(self.queue_of(run_admin_job, 1), "heavy")
+
+    def test_heavy_tasks_are_acknowledged_late(self):
+        self.assertTrue(archive_orders.acks_late)
+        self.assertTrue(run_admin_job.reject_on_worker_lost)
+        self.assertFalse(add.acks_late)
+
+
+class TaskResultTests(SimpleTestCase):
+    """Test that task results stay out of the cache."""
+
+    def setUp(self):
+        self.cache_key = f"test_tasks:{uuid.uuid4().hex}"
+        cache.set(self.cache_key, "cached page", None)
+        self.addCleanup(cache.delete, self.cache_key)
+
+    def assert_result_not_in_cache(self, task_id):
+        """The result key is absent from the cache's Redis DB; ours is intact."""
+        key = app.backend.get_key_for_task(task_id)
+        self.assertEqual(get_redis_connection("default").exists(key), 0)
+        self.assertEqual(cache.get(self.cache_key), "cached page")
+
+    def forget_later(self, task_id):
+        self.addCleanup(app.backend.forget, task_id)
+        return task_id
+
+    def test_results_use_their_own_redis_db(self):
+        databases = {
+            urlparse(url).path
+            for url in (
+                settings.CACHES["default"]["LOCATION"],
+                settings.CELERY_BROKER_URL,
+                settings.CELERY_RESULT_BACKEND,
+            )
+        }
+        self.assertEqual(len(databases), 3)
+
+    def test_results_are_ignored_by_default(self):
+        with patch.object(add, "store_eager_result", True):
+            result = add.apply((1, 2), task_id=self.forget_later(str(uuid.uuid4())))
+
+        key = app.backend.get_key_for_task(result.id)
+        self.assertEqual(app.backend.client.exists(key), 0)
+        self.assert_result_not_in_cache(result.id)
+
+    def test_stored_results_expire_and_leave_cache_keys_untouched(self):
+        task_id = self.forget_later(str(uuid.uuid4()))
+
+        app.backend.store_result(task_id, 3, states.SUCCESS)
+
+        self.assertEqual(app.backend.get_task_meta(task_id)["result"], 3)
+        ttl = app.backend.client.ttl(app.backend.get_key_for_task(task_id))
+        self.assertTrue(0 < ttl <= settings.CELERY_RESULT_EXPIRES)
+        self.assert_result_not_in_cache(task_id)
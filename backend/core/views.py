@@ -2,20 +2,53 @@
 Core views for backend.
 """
 
+import hashlib
+import mmap
+from pathlib import Path
+
+from django.conf import settings
+from django.db import transaction
 from django.db.models import Max
+from django.http import FileResponse, Http404
+from django.shortcuts import get_object_or_404
+from django.utils.cache import get_conditional_response
 from django.utils.decorators import method_decorator
-from django.views.decorators.cache import cache_page
-from django.views.decorators.vary import vary_on_headers
+from django.utils.module_loading import import_string
+from django.views import View
+from django.views.decorators.http import condition
 from django_filters.rest_framework import DjangoFilterBackend
-from rest_framework import filters, generics, viewsets
-from rest_framework.decorators import api_view
+from drf_spectacular.utils import (
+    OpenApiParameter,
+    OpenApiTypes,
+    extend_schema,
+    extend_schema_view,
+)
+from rest_framework import filters, generics, status, viewsets
+from rest_framework.decorators import (
+    action,
+    api_view,
+    authentication_classes,
+    permission_classes,
+)
+from rest_framework.pagination import PageNumberPagination
 from rest_framework.permissions import AllowAny, IsAdminUser, IsAuthenticated
 from rest_framework.response import Response
 from rest_framework.views import APIView
 
+from core import health
+from core.caching import (
+    CachedListMixin,
+    make_etag,
+    order_list_scope,
+    order_lists_changed,
+)
 from core.filters import InStockFilterBackend, OrderFilter, ProductFilter
-from core.models import Order, Product
+from core.idempotency import IdempotentCreateMixin
+from core.models import ArchivedOrder, Order, Product
 from core.serializers import (
+    ArchivedOrderSerializer,
+    OrderBulkStatusResultSerializer,
+    OrderBulkStatusSerializer,
     OrderCreateSerializer,
     OrderSerializer,
     ProductInfoSerializer,
@@ -23,7 +56,29 @@ from core.serializers import (
 )
 
 
-class ProductListCreateAPIView(generics.ListCreateAPIView):
+def _product_updated_at(request, product_id):
+    """Return the product's updated_at, looked up once per request."""
+    if not hasattr(request, "_product_updated_at"):
+        request._product_updated_at = (
+            Product.objects.filter(pk=product_id)
+            .values_list("updated_at", flat=True)
+            .first()
+        )
+    return request._product_updated_at
+
+
+def product_etag(request, product_id):
+    updated_at = _product_updated_at(request, product_id)
+    if updated_at is None:
+        return None
+    return make_etag("product", product_id, updated_at.isoformat())
+
+
+def product_last_modified(request, product_id):
+    return _product_updated_at(request, product_id)
+
+
+class ProductListCreateAPIView(CachedListMixin, generics.ListCreateAPIView):
     queryset = Product.objects.order_by("pk")
     serializer_class = ProductSerializer
     filterset_class = ProductFilter
@@ -42,16 +97,8 @@ class ProductListCreateAPIView(generics.ListCreateAPIView):
     # pagination_class.page_size = 2
     # pagination_class.max_page_size = 10
     # pagination_class.page_size_query_param = "size"
-
-    @method_decorator(cache_page(60 * 15, key_prefix="product_list"))  # 15 minutes
-    def list(self, request, *args, **kwargs):
-        return super().list(request, *args, **kwargs)
-
-    def get_queryset(self):
-        import time
-
-        time.sleep(2)
-        return super().get_queryset()
+    list_cache_scope = "products"
+    list_cache_timeout = settings.PRODUCT_LIST_CACHE_TIMEOUT
 
     def get_permissions(self):
         self.permission_classes = [AllowAny]
@@ -65,6 +112,12 @@ class ProductDetailAPIView(generics.RetrieveUpdateDestroyAPIView):
     serializer_class = ProductSerializer
     lookup_url_kwarg = "product_id"  # pk is default
 
+    @method_decorator(
+        condition(etag_func=product_etag, last_modified_func=product_last_modified)
+    )
+    def retrieve(self, request, *args, **kwargs):
+        return super().retrieve(request, *args, **kwargs)
+
     def get_permissions(self):
         self.permission_classes = [AllowAny]
         if self.request.method in ["PUT", "PATCH", "DELETE"]:
@@ -72,25 +125,138 @@ class ProductDetailAPIView(generics.RetrieveUpdateDestroyAPIView):
         return super().get_permissions()
 
 
-class OrderViewSet(viewsets.ModelViewSet):
-    queryset = Order.objects.prefetch_related("items", "items__product").all()
+class IncludeArchivedMixin:
+    """
+    Let order lists add archived orders with `?include_archived=1`.
+
+    Live and archived orders are merged newest first in one UNION query that
+    is paginated as usual; the page is then loaded from both tables. Views
+    without pagination still page these lists with
+    `archived_pagination_class`, as archived orders keep piling up.
+    """
+
+    include_archived_param = "include_archived"
+    archived_pagination_class = PageNumberPagination
+
+    def include_archived(self):
+        return self.request.query_params.get(self.include_archived_param) == "1"
+
+    def get_archived_queryset(self):
+        return ArchivedOrder.objects.filter(user=self.request.user)
+
+    def list(self, request, *args, **kwargs):
+        if not self.include_archived():
+            return super().list(request, *args, **kwargs)
+
+        queryset = self.filter_queryset(self.get_queryset())
+        archived = self.get_archived_queryset()
+        filterset_class = getattr(self, "filterset_class", None)
+        if filterset_class is not None:
+            archived = filterset_class(request.query_params, archived).qs
+        keys = (
+            queryset.prefetch_related(None)
+            .values("created_at", "order_id")
+            .union(archived.values("created_at", "order_id"), all=True)
+            .order_by("-created_at", "-order_id")
+        )
+        paginator = self.paginator or self.archived_pagination_class()
+        ids = [
+            row["order_id"] for row in paginator.paginate_queryset(keys, request, self)
+        ]
+
+        live = queryset.in_bulk(ids)
+        archived = archived.in_bulk(ids)
+        data = [
+            self.get_serializer(live[pk]).data
+            if pk in live
+            else ArchivedOrderSerializer(archived[pk]).data
+            for pk in ids
+        ]
+        return paginator.get_paginated_response(data)
+
+
+@extend_schema_view(
+    create=extend_schema(
+        parameters=[
+            OpenApiParameter(
+                IdempotentCreateMixin.idempotency_header,
+                OpenApiTypes.STR,
+                OpenApiParameter.HEADER,
+                description="Retries with the same key and body replay the "
+                "first response instead of creating another order.",
+            )
+        ]
+    )
+)
+class OrderViewSet(
+    IdempotentCreateMixin,
+    CachedListMixin,
+    IncludeArchivedMixin,
+    viewsets.ModelViewSet,
+):
+    queryset = Order.objects.prefetch_related("items").all()
     serializer_class = OrderSerializer
     permission_classes = [IsAuthenticated]
     pagination_class = None
     filterset_class = OrderFilter
     filter_backends = [DjangoFilterBackend]
+    list_cache_timeout = settings.ORDER_LIST_CACHE_TIMEOUT
 
-    @method_decorator(cache_page(60 * 15, key_prefix="order_list"))
-    @method_decorator(vary_on_headers("Authorization"))
-    def list(self, request, *args, **kwargs):
-        return super().list(request, *args, **kwargs)
+    def get_list_cache_scope(self):
+        """
+        Cached per user, under a version bumped whenever one of the user's
+        orders changes; staff share one version bumped on any change.
+        """
+        return order_list_scope(self.request.user)
+
+    @extend_schema(
+        request=OrderBulkStatusSerializer,
+        responses=OrderBulkStatusResultSerializer(many=True),
+    )
+    @action(
+        detail=False,
+        methods=["post"],
+        url_path="bulk-status",
+        permission_classes=[IsAdminUser],
+    )
+    def bulk_status(self, request):
+        """Move many orders to a new status, reporting the outcome per order."""
+        serializer = OrderBulkStatusSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        order_ids = list(dict.fromkeys(serializer.validated_data["order_ids"]))
+        status_ = serializer.validated_data["status"]
+
+        # The status change and its outbox event commit together, or neither.
+        with transaction.atomic():
+            updated = dict(
+                Order.objects.transition(
+                    order_ids, status_, serializer.validated_data.get("from_status")
+                )
+            )
+            order_lists_changed(updated.values())
+        current = dict(
+            Order.objects.filter(pk__in=set(order_ids) - set(updated)).values_list(
+                "pk", "status"
+            )
+        )
+
+        results = []
+        for order_id in order_ids:
+            if order_id in updated:
+                result = {"result": "updated", "status": status_}
+            elif order_id in current:
+                result = {"result": "invalid_transition", "status": current[order_id]}
+            else:
+                result = {"result": "not_found", "status": None}
+            results.append({"order_id": order_id, **result})
+        return Response(results)
 
     def perform_create(self, serializer):
         serializer.save(user=self.request.user)
 
     def get_serializer_class(self):
         # if self.request.method == "POST":
-        if self.action == "create" or self.action == "update":
+        if self.action in ("create", "update", "partial_update"):
             return OrderCreateSerializer
         return super().get_serializer_class()
 
@@ -100,6 +266,20 @@ class OrderViewSet(viewsets.ModelViewSet):
             qs = qs.filter(user=self.request.user)
         return qs
 
+    def get_archived_queryset(self):
+        if self.request.user.is_staff:
+            return ArchivedOrder.objects.all()
+        return super().get_archived_queryset()
+
+    def retrieve(self, request, *args, **kwargs):
+        try:
+            return super().retrieve(request, *args, **kwargs)
+        except Http404:
+            if not self.include_archived():
+                raise
+        order = get_object_or_404(self.get_archived_queryset(), pk=kwargs["pk"])
+        return Response(ArchivedOrderSerializer(order).data)
+
     # @action(
     #     detail=False,
     #     methods=["get"],
@@ -112,8 +292,8 @@ class OrderViewSet(viewsets.ModelViewSet):
     #     return Response(serializer.data)
 
 
-class UserOrderListAPIView(generics.ListAPIView):
-    queryset = Order.objects.prefetch_related("items", "items__product").all()
+class UserOrderListAPIView(IncludeArchivedMixin, generics.ListAPIView):
+    queryset = Order.objects.prefetch_related("items").all()
     serializer_class = OrderSerializer
     permission_classes = [IsAuthenticated]
 
@@ -136,6 +316,78 @@ class ProductInfoAPIView(APIView):
 
 
 @api_view(["GET"])
+@authentication_classes([])
+@permission_classes([AllowAny])
 def health_check(request):
-    """Return successful response for health check."""
+    """Return successful response for health check (liveness)."""
     return Response({"healthy": True, "status": "ok"})
+
+
+@api_view(["GET"])
+@authentication_classes([])
+@permission_classes([AllowAny])
+def readiness_check(request):
+    """Probe the database, cache and broker; 503 if any of them is down."""
+    checks = health.check_dependencies()
+    if all(check["ok"] for check in checks.values()):
+        return Response({"healthy": True, "status": "ok", "checks": checks})
+
+    return Response(
+        {"healthy": False, "status": "unavailable", "checks": checks},
+        status=status.HTTP_503_SERVICE_UNAVAILABLE,
+    )
+
+
+_schema_etags = {}
+
+
+def _schema_etag(path):
+    """Return the schema file's ETag, hashing it only when the file changes."""
+    stat = path.stat()
+    version = (stat.st_mtime_ns, stat.st_size)
+    cached = _schema_etags.get(str(path))
+    if cached is None or cached[0] != version:
+        with path.open("rb") as f:
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as m:
+                etag = f'"{hashlib.sha256(m).hexdigest()}"'
+        cached = _schema_etags[str(path)] = (version, etag)
+    return cached[1]
+
+
+class StaticSchemaView(View):
+    """
+    Serve the OpenAPI schema written by the `build_schema` command.
+
+    The file is streamed as-is with an ETag, so clients revalidate with
+    If-None-Match and get a bodiless 304. `?format=json` serves the JSON copy
+    and other formats are not found, as with SpectacularAPIView. Falls back
+    to generating the schema when the file has not been built.
+    """
+
+    # ?format= values and the file suffix and content type they are served as.
+    formats = {
+        None: (".yaml", "application/vnd.oai.openapi"),
+        "yaml": (".yaml", "application/vnd.oai.openapi"),
+        "openapi": (".yaml", "application/vnd.oai.openapi"),
+        "json": (".json", "application/vnd.oai.openapi+json"),
+        "openapi-json": (".json", "application/vnd.oai.openapi+json"),
+    }
+
+    def get(self, request, *args, **kwargs):
+        try:
+            suffix, content_type = self.formats[request.GET.get("format")]
+        except KeyError:
+            raise Http404("Unknown schema format.")
+        path = Path(settings.OPENAPI_SCHEMA_FILE).with_suffix(suffix)
+        try:
+            etag = _schema_etag(path)
+        except FileNotFoundError:
+            view = import_string("drf_spectacular.views.SpectacularAPIView")
+            return view.as_view()(request, *args, **kwargs)
+
+        response = get_conditional_response(request, etag=etag)
+        if response is None:
+            response = FileResponse(path.open("rb"), content_type=content_type)
+        response["ETag"] = etag
+        response["Cache-Control"] = "no-cache"
+        return response
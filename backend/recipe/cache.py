@@ -0,0 +1,95 @@
+"""
+Cached name -> id lookups for the user's tags and ingredients.
+
+Recipe writes send tags and ingredients by name. The ids are looked up in a
+small in-process LRU, then in Redis, and only then in the database. Entries
+are keyed by a per-user generation that is bumped whenever one of the user's
+tags or ingredients is renamed or deleted, which drops them all at once.
+"""
+
+import hashlib
+import threading
+from collections import OrderedDict
+
+from django.conf import settings
+from django.core.cache import cache
+
+from core.caching import bump_version, get_version
+
+_local = OrderedDict()
+_lock = threading.Lock()
+
+
+def _version_name(model, user_id):
+    return f"{model._meta.model_name}:{user_id}"
+
+
+def _cache_key(model, user_id, generation, name):
+    digest = hashlib.md5(name.encode()).hexdigest()
+    return f"recipe_attr:{model._meta.model_name}:{user_id}:{generation}:{digest}"
+
+
+def _remember(entries):
+    with _lock:
+        _local.update(entries)
+        while len(_local) > settings.RECIPE_ATTR_CACHE_SIZE:
+            _local.popitem(last=False)
+
+
+def get_or_create_ids(model, user, names):
+    """Return the ids of the user's `model` objects named `names`, in order."""
+    names = list(dict.fromkeys(names))
+    if not names:
+        return []
+
+    generation = get_version(_version_name(model, user.pk))
+    ids = {}
+    with _lock:
+        for name in names:
+            key = (model, user.pk, generation, name)
+            if key in _local:
+                _local.move_to_end(key)
+                ids[name] = _local[key]
+
+    missing = [name for name in names if name not in ids]
+    if missing:
+        keys = {_cache_key(model, user.pk, generation, name): name for name in missing}
+        found = {keys[key]: pk for key, pk in cache.get_many(keys).items()}
+
+        missing = [name for name in missing if name not in found]
+        if missing:
+            looked_up = dict(
+                model.objects.filter(user=user, name__in=missing).values_list(
+                    "name", "id"
+                )
+            )
+            for name in missing:
+                if name not in looked_up:
+                    obj, _ = model.objects.get_or_create(user=user, name=name)
+                    looked_up[name] = obj.pk
+            cache.set_many(
+                {
+                    _cache_key(model, user.pk, generation, name): pk
+                    for name, pk in looked_up.items()
+                },
+                timeout=settings.RECIPE_ATTR_CACHE_TIMEOUT,
+            )
+            found.update(looked_up)
+
+        _remember(
+            {(model, user.pk, generation, name): pk for name, pk in found.items()}
+        )
+        ids.update(found)
+
+    return [ids[name] for name in names]
+
+
+def invalidate(model, user_id):
+    """Forget every cached lookup of the user's `model` objects."""
+    bump_version(_version_name(model, user_id))
+
+
+def clear():
+    """Empty the in-process LRU."""
+    with _lock:
+        _local.clear()
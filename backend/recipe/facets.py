@@ -0,0 +1,136 @@
+"""
+Recipe facet counts: per tag, per ingredient, and price/time histograms.
+
+Unfiltered counts are read from the `RecipeFacet` summary table, which the
+signals in `recipe.signals` keep up to date, so they cost the same however
+many recipes the user has. Filtered counts are aggregated from the recipes
+matching the filter.
+"""
+
+from collections import defaultdict
+
+from django.conf import settings
+from django.db.models import Count, F, IntegerField
+from django.db.models.functions import Cast, Floor
+
+from core.models import Ingredient, Recipe, RecipeFacet, Tag
+
+Facet = RecipeFacet.FacetChoices
+
+ATTR_FACETS = {Facet.TAG: Tag, Facet.INGREDIENT: Ingredient}
+
+
+def price_bucket(price):
+    return int(price // settings.RECIPE_FACET_PRICE_BUCKET)
+
+
+def time_bucket(time_minutes):
+    return int(time_minutes // settings.RECIPE_FACET_TIME_BUCKET)
+
+
+def adjust(user_id, facet, deltas):
+    """Add each `deltas` value's delta to the user's `facet` counts."""
+    by_delta = defaultdict(list)
+    for value, delta in deltas.items():
+        if delta:
+            by_delta[delta].append(value)
+    if not by_delta:
+        return
+
+    facets = RecipeFacet.objects.filter(user_id=user_id, facet=facet)
+    RecipeFacet.objects.bulk_create(
+        [
+            RecipeFacet(user_id=user_id, facet=facet, value=value)
+            for delta, values in by_delta.items()
+            if delta > 0
+            for value in values
+        ],
+        ignore_conflicts=True,
+    )
+    for delta, values in by_delta.items():
+        facets.filter(value__in=values).update(count=F("count") + delta)
+    if any(delta < 0 for delta in by_delta):
+        facets.filter(count__lte=0).delete()
+
+
+def compute(queryset):
+    """Aggregate the facet counts of the recipes in `queryset`."""
+    recipes = Recipe.objects.filter(pk__in=queryset.values("pk")).order_by()
+    counts = {}
+    for facet, model in ATTR_FACETS.items():
+        through = getattr(Recipe, f"{facet}s").through
+        column = f"{model._meta.model_name}_id"
+        counts[facet] = dict(
+            through.objects.filter(recipe__in=recipes)
+            .values(column)
+            .annotate(count=Count("*"))
+            .values_list(column, "count")
+        )
+    for facet, field, width in (
+        (Facet.PRICE, "price", settings.RECIPE_FACET_PRICE_BUCKET),
+        (Facet.TIME_MINUTES, "time_minutes", settings.RECIPE_FACET_TIME_BUCKET),
+    ):
+        counts[facet] = dict(
+            recipes.annotate(bucket=Cast(Floor(F(field) / width), IntegerField()))
+            .values("bucket")
+            .annotate(count=Count("*"))
+            .values_list("bucket", "count")
+        )
+    return counts
+
+
+def read(user):
+    """Return the user's unfiltered facet counts from the summary table."""
+    counts = {facet: {} for facet in Facet.values}
+    rows = RecipeFacet.objects.filter(user=user, count__gt=0)
+    for facet, value, count in rows.values_list("facet", "value", "count"):
+        counts[facet][value] = count
+    return counts
+
+
+def rebuild(user):
+    """Recompute the user's summary rows from their recipes."""
+    RecipeFacet.objects.filter(user=user).delete()
+    RecipeFacet.objects.bulk_create(
+        RecipeFacet(user=user, facet=facet, value=value, count=count)
+        for facet, values in compute(Recipe.objects.filter(user=user)).items()
+        for value, count in values.items()
+    )
+
+
+def _histogram(counts, width, convert):
+    return [
+        {
+            "min": convert(bucket * width),
+            "max": convert((bucket + 1) * width),
+            "count": count,
+        }
+        for bucket, count in sorted(counts.items())
+    ]
+
+
+def to_representation(user, counts):
+    """Shape facet counts for the API, with tag and ingredient names."""
+    data = {"count": sum(counts[Facet.PRICE].values())}
+    for facet, model in ATTR_FACETS.items():
+        names = dict(
+            model.objects.filter(user=user, id__in=counts[facet]).values_list(
+                "id", "name"
+            )
+        )
+        data[f"{facet}s"] = sorted(
+            (
+                {"id": pk, "name": names[pk], "count": count}
+                for pk, count in counts[facet].items()
+                if pk in names
+            ),
+            key=lambda item: (-item["count"], item["name"]),
+        )
+    # Prices are strings, like the recipe serializers render them.
+    data["price"] = _histogram(
+        counts[Facet.PRICE], settings.RECIPE_FACET_PRICE_BUCKET, str
+    )
+    data["time_minutes"] = _histogram(
+        counts[Facet.TIME_MINUTES], settings.RECIPE_FACET_TIME_BUCKET, int
+    )
+    return data
@@ -0,0 +1,12 @@
+import django_filters
+
+from core.models import Recipe
+
+
+class RecipeFilter(django_filters.FilterSet):
+    class Meta:
+        model = Recipe
+        fields = {
+            "price": ["lt", "lte", "gt", "gte"],
+            "time_minutes": ["lt", "lte", "gt", "gte"],
+        }
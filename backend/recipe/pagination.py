@@ -0,0 +1,19 @@
+"""
+Pagination for the recipe APIs.
+"""
+
+from rest_framework.settings import api_settings
+
+from core.pagination import KeysetPagination
+
+
+class RecipeSearchPagination(KeysetPagination):
+    """Keyset pagination over search results, best match first."""
+
+    ordering = ("-rank", "-id")
+
+    def get_ordering(self, request, queryset, view):
+        """Rank order, unless the client asked for an ordering."""
+        if request.query_params.get(api_settings.ORDERING_PARAM):
+            return super().get_ordering(request, queryset, view)
+        return self.ordering
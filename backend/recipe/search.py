@@ -0,0 +1,88 @@
+"""
+Full-text and fuzzy recipe search.
+
+Each recipe stores a weighted `search_vector` of its title (A), description
+(B) and tag and ingredient names (C), indexed with GIN. A search matches the
+vector and ranks by `ts_rank`. Only when nothing matches, as with a typo, it
+falls back to trigram word similarity against the title.
+"""
+
+from django.contrib.postgres.aggregates import StringAgg
+from django.contrib.postgres.search import (
+    SearchQuery,
+    SearchRank,
+    SearchVector,
+    TrigramWordSimilarity,
+)
+from django.db.models import (
+    Case,
+    Exists,
+    F,
+    FloatField,
+    OuterRef,
+    Q,
+    Subquery,
+    TextField,
+    Value,
+    When,
+)
+from django.db.models.functions import Cast, Coalesce
+
+from core.models import Recipe
+
+# Text search configuration; the stored vectors must be rebuilt if it changes.
+SEARCH_CONFIG = "english"
+
+
+def search_vector(model=Recipe):
+    """Return the expression computing a recipe's search vector."""
+    config = SEARCH_CONFIG
+
+    def names(path):
+        return Coalesce(
+            Subquery(
+                model.objects.filter(pk=OuterRef("pk"))
+                .values("pk")
+                .annotate(names=StringAgg(path, " "))
+                .values("names")
+            ),
+            Value(""),
+            output_field=TextField(),
+        )
+
+    return (
+        SearchVector("title", weight="A", config=config)
+        + SearchVector("description", weight="B", config=config)
+        + SearchVector(names("tags__name"), weight="C", config=config)
+        + SearchVector(names("ingredients__name"), weight="C", config=config)
+    )
+
+
+def refresh(recipe_ids):
+    """Recompute the search vectors of the given recipes."""
+    if recipe_ids:
+        Recipe.objects.filter(pk__in=recipe_ids).update(search_vector=search_vector())
+
+
+def search(queryset, text):
+    """
+    Filter `queryset` to recipes matching `text`, annotated with `rank`.
+
+    The fallback is part of the same query: its NOT EXISTS has no reference
+    to the outer row, so PostgreSQL evaluates it once.
+    """
+    query = SearchQuery(text, search_type="websearch", config=SEARCH_CONFIG)
+    matches = Q(search_vector=query)
+    no_matches = ~Exists(queryset.filter(matches))
+    return queryset.filter(
+        matches | (no_matches & Q(title__trigram_word_similar=text))
+    ).annotate(
+        # Double precision, so the rank in a cursor compares equal to itself.
+        rank=Cast(
+            Case(
+                When(matches, then=SearchRank(F("search_vector"), query)),
+                default=TrigramWordSimilarity(text, "title"),
+            ),
+            FloatField(),
+        )
+    )
@@ -5,6 +5,7 @@ Serializers for the recipe API.
 from rest_framework import serializers
 
 from core.models import Ingredient, Recipe, Tag
+from recipe.cache import get_or_create_ids
 
 
 class IngredientSerializer(serializers.ModelSerializer):
@@ -25,6 +26,24 @@ class TagSerializer(serializers.ModelSerializer):
         read_only_fields = ["id"]
 
 
+class IngredientUsageSerializer(IngredientSerializer):
+    """Serializer for ingredients with the number of recipes using them."""
+
+    usage_count = serializers.IntegerField(read_only=True)
+
+    class Meta(IngredientSerializer.Meta):
+        fields = IngredientSerializer.Meta.fields + ["usage_count"]
+
+
+class TagUsageSerializer(TagSerializer):
+    """Serializer for tags with the number of recipes using them."""
+
+    usage_count = serializers.IntegerField(read_only=True)
+
+    class Meta(TagSerializer.Meta):
+        fields = TagSerializer.Meta.fields + ["usage_count"]
+
+
 class RecipeSerializer(serializers.ModelSerializer):
     """Serializer for the recipe objects."""
 
@@ -39,19 +58,14 @@ class RecipeSerializer(serializers.ModelSerializer):
     def _get_or_create_tags(self, tags, recipe):
         """Handle getting or creating tags as needed."""
         auth_user = self.context["request"].user
-        for tag in tags:
-            tag_obj, created = Tag.objects.get_or_create(user=auth_user, **tag)
-            recipe.tags.add(tag_obj)
+        names = [tag["name"] for tag in tags]
+        recipe.tags.add(*get_or_create_ids(Tag, auth_user, names))
 
     def _get_or_create_ingredients(self, ingredients, recipe):
         """Handle getting or creating ingredients as needed."""
         auth_user = self.context["request"].user
-        for ingredient in ingredients:
-            ingredient_obj, created = Ingredient.objects.get_or_create(
-                user=auth_user,
-                **ingredient,
-            )
-            recipe.ingredients.add(ingredient_obj)
+        names = [ingredient["name"] for ingredient in ingredients]
+        recipe.ingredients.add(*get_or_create_ids(Ingredient, auth_user, names))
 
     def create(self, validated_data):
         """Create a recipe."""
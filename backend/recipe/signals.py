@@ -0,0 +1,176 @@
+"""
+Signal handlers for the recipe app.
+"""
+
+from django.db import transaction
+from django.db.models.signals import (
+    m2m_changed,
+    post_delete,
+    post_save,
+    pre_delete,
+    pre_save,
+)
+from django.dispatch import receiver
+
+from core.models import Ingredient, Recipe, RecipeFacet, Tag
+from recipe import cache, facets, search
+from recipe.facets import Facet
+
+
+@receiver(post_save, sender=Tag, dispatch_uid="invalidate_tag_lookups")
+@receiver(post_save, sender=Ingredient, dispatch_uid="invalidate_ingredient_lookups")
+@receiver(post_delete, sender=Tag, dispatch_uid="invalidate_deleted_tag_lookups")
+@receiver(
+    post_delete,
+    sender=Ingredient,
+    dispatch_uid="invalidate_deleted_ingredient_lookups",
+)
+def invalidate_lookups(sender, instance, created=False, **kwargs):
+    """Drop the owner's cached name -> id lookups on rename or delete."""
+    if created:
+        return
+    # After commit, so a concurrent write cannot re-cache the old name
+    # from rows that are about to change.
+    transaction.on_commit(lambda: cache.invalidate(sender, instance.user_id))
+
+
+@receiver(pre_save, sender=Recipe, dispatch_uid="remember_recipe_buckets")
+def remember_recipe_buckets(sender, instance, update_fields=None, **kwargs):
+    """Remember the stored price and time buckets before a recipe changes."""
+    instance._facet_buckets = None
+    if instance._state.adding or (
+        update_fields is not None
+        and not {"price", "time_minutes"}.intersection(update_fields)
+    ):
+        return
+    stored = (
+        Recipe.objects.filter(pk=instance.pk)
+        .values_list("price", "time_minutes")
+        .first()
+    )
+    if stored is not None:
+        instance._facet_buckets = (
+            facets.price_bucket(stored[0]),
+            facets.time_bucket(stored[1]),
+        )
+
+
+@receiver(post_save, sender=Recipe, dispatch_uid="count_recipe_buckets")
+def count_recipe_buckets(sender, instance, created, **kwargs):
+    """Move a saved recipe between price and time buckets."""
+    old = None if created else getattr(instance, "_facet_buckets", None)
+    if not created and old is None:
+        return
+    new = (
+        facets.price_bucket(instance.price),
+        facets.time_bucket(instance.time_minutes),
+    )
+    for facet, old_bucket, new_bucket in zip(
+        (Facet.PRICE, Facet.TIME_MINUTES), old or (None, None), new, strict=True
+    ):
+        if old_bucket != new_bucket:
+            deltas = {new_bucket: 1}
+            if old_bucket is not None:
+                deltas[old_bucket] = -1
+            facets.adjust(instance.user_id, facet, deltas)
+
+
+@receiver(post_save, sender=Recipe, dispatch_uid="refresh_recipe_search_vector")
+def refresh_search_vector(sender, instance, update_fields=None, **kwargs):
+    """Recompute a saved recipe's search vector."""
+    if update_fields is not None and not {"title", "description"}.intersection(
+        update_fields
+    ):
+        return
+    search.refresh([instance.pk])
+
+
+@receiver(pre_delete, sender=Recipe, dispatch_uid="uncount_deleted_recipe")
+def uncount_deleted_recipe(sender, instance, **kwargs):
+    """Take a deleted recipe out of every facet it is counted in."""
+    user_id = instance.user_id
+    facets.adjust(user_id, Facet.PRICE, {facets.price_bucket(instance.price): -1})
+    facets.adjust(
+        user_id, Facet.TIME_MINUTES, {facets.time_bucket(instance.time_minutes): -1}
+    )
+    # The through rows are cascaded without m2m_changed.
+    for facet in facets.ATTR_FACETS:
+        ids = getattr(instance, f"{facet}s").values_list("id", flat=True)
+        facets.adjust(user_id, facet, dict.fromkeys(ids, -1))
+
+
+@receiver(m2m_changed, sender=Recipe.tags.through, dispatch_uid="count_tags")
+@receiver(
+    m2m_changed, sender=Recipe.ingredients.through, dispatch_uid="count_ingredients"
+)
+def recipe_attrs_changed(sender, instance, action, reverse, model, pk_set, **kwargs):
+    """Keep tag/ingredient counts and search vectors in step with the links."""
+    if action not in (
+        "pre_remove",
+        "pre_clear",
+        "post_add",
+        "post_remove",
+        "post_clear",
+    ):
+        return
+    attr_model = instance._meta.model if reverse else model
+    facet = Facet.TAG if attr_model is Tag else Facet.INGREDIENT
+    column = f"{attr_model._meta.model_name}_id"
+    mine, other = (column, "recipe_id") if reverse else ("recipe_id", column)
+
+    if action.startswith("pre_"):
+        # Removals report the ids asked for, so remember which were linked.
+        links = sender.objects.filter(**{mine: instance.pk})
+        if action == "pre_remove":
+            links = links.filter(**{f"{other}__in": pk_set})
+        instance._facet_removed = list(links.values_list(other, flat=True))
+        return
+
+    if action == "post_add":
+        changed, delta = pk_set, 1
+    else:
+        changed, delta = instance._facet_removed, -1
+    if not changed:
+        return
+    if reverse:
+        facets.adjust(instance.user_id, facet, {instance.pk: delta * len(changed)})
+        search.refresh(changed)
+    else:
+        facets.adjust(instance.user_id, facet, dict.fromkeys(changed, delta))
+        search.refresh([instance.pk])
+
+
+@receiver(post_delete, sender=Tag, dispatch_uid="drop_tag_facet")
+@receiver(post_delete, sender=Ingredient, dispatch_uid="drop_ingredient_facet")
+def drop_attr_facet(sender, instance, **kwargs):
+    """Drop the count of a deleted tag or ingredient."""
+    facet = Facet.TAG if sender is Tag else Facet.INGREDIENT
+    RecipeFacet.objects.filter(
+        user_id=instance.user_id, facet=facet, value=instance.pk
+    ).delete()
+
+
+@receiver(post_save, sender=Tag, dispatch_uid="refresh_tag_search_vectors")
+@receiver(
+    post_save, sender=Ingredient, dispatch_uid="refresh_ingredient_search_vectors"
+)
+def refresh_attr_search_vectors(sender, instance, created, **kwargs):
+    """Reindex the recipes showing a renamed tag or ingredient."""
+    if not created:
+        search.refresh(list(instance.recipe_set.values_list("id", flat=True)))
+
+
+@receiver(pre_delete, sender=Tag, dispatch_uid="remember_tag_recipes")
+@receiver(pre_delete, sender=Ingredient, dispatch_uid="remember_ingredient_recipes")
+def remember_attr_recipes(sender, instance, **kwargs):
+    """Remember the recipes of a tag or ingredient before its links cascade."""
+    instance._search_recipes = list(instance.recipe_set.values_list("id", flat=True))
+
+
+@receiver(post_delete, sender=Tag, dispatch_uid="refresh_deleted_tag_recipes")
+@receiver(
+    post_delete, sender=Ingredient, dispatch_uid="refresh_deleted_ingredient_recipes"
+)
+def refresh_deleted_attr_recipes(sender, instance, **kwargs):
+    """Reindex the recipes a deleted tag or ingredient was removed from."""
+    search.refresh(getattr(instance, "_search_recipes", []))
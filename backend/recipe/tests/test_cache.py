@@ -0,0 +1,88 @@
+"""
+Tests for the cached tag and ingredient lookups.
+"""
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+
+from core.models import Ingredient, Tag
+from recipe import cache as lookups
+
+
+def lookup_queries(ctx, table):
+    """Return the captured SELECTs against `table`."""
+    return [
+        query["sql"]
+        for query in ctx.captured_queries
+        if query["sql"].startswith("SELECT") and f'FROM "{table}"' in query["sql"]
+    ]
+
+
+class LookupCacheTests(TestCase):
+    """Test the name -> id lookup cache."""
+
+    def setUp(self):
+        cache.clear()
+        lookups.clear()
+        self.user = get_user_model().objects.create_user(
+            email="user@example.com", password="testpass123"
+        )
+
+    def test_get_or_create_ids(self):
+        """Test existing objects are found and missing ones created, in order."""
+        tag = Tag.objects.create(user=self.user, name="Vegan")
+
+        ids = lookups.get_or_create_ids(Tag, self.user, ["Dinner", "Vegan"])
+
+        self.assertEqual(ids[1], tag.id)
+        self.assertEqual(Tag.objects.get(id=ids[0]).name, "Dinner")
+        self.assertEqual(Tag.objects.filter(user=self.user).count(), 2)
+
+    def test_repeated_lookups_skip_database(self):
+        """Test a second lookup of the same names does not query the table."""
+        lookups.get_or_create_ids(Ingredient, self.user, ["Salt", "Pepper"])
+
+        with CaptureQueriesContext(connection) as ctx:
+            lookups.get_or_create_ids(Ingredient, self.user, ["Salt", "Pepper"])
+            lookups.clear()
+            lookups.get_or_create_ids(Ingredient, self.user, ["Pepper", "Salt"])
+
+        self.assertEqual(lookup_queries(ctx, "core_ingredient"), [])
+
+    def test_other_users_not_shared(self):
+        """Test lookups are scoped to the user."""
+        other = get_user_model().objects.create_user(
+            email="other@example.com", password="testpass123"
+        )
+        [tag_id] = lookups.get_or_create_ids(Tag, self.user, ["Dinner"])
+
+        [other_id] = lookups.get_or_create_ids(Tag, other, ["Dinner"])
+
+        self.assertNotEqual(other_id, tag_id)
+        self.assertEqual(Tag.objects.get(id=other_id).user, other)
+
+    def test_rename_invalidates(self):
+        """Test renaming a tag stops its old name resolving to it."""
+        [tag_id] = lookups.get_or_create_ids(Tag, self.user, ["Dinner"])
+        tag = Tag.objects.get(id=tag_id)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            tag.name = "Supper"
+            tag.save()
+        [new_id] = lookups.get_or_create_ids(Tag, self.user, ["Dinner"])
+
+        self.assertNotEqual(new_id, tag_id)
+
+    def test_delete_invalidates(self):
+        """Test deleting an ingredient stops its name resolving to it."""
+        [ingredient_id] = lookups.get_or_create_ids(Ingredient, self.user, ["Salt"])
+
+        with self.captureOnCommitCallbacks(execute=True):
+            Ingredient.objects.get(id=ingredient_id).delete()
+        [new_id] = lookups.get_or_create_ids(Ingredient, self.user, ["Salt"])
+
+        self.assertNotEqual(new_id, ingredient_id)
+        self.assertTrue(Ingredient.objects.filter(id=new_id).exists())
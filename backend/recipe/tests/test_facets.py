@@ -0,0 +1,177 @@
+"""
+Tests for the recipe facets API.
+"""
+
+import re
+from decimal import Decimal
+from importlib import import_module
+
+from django.apps import apps
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from core.models import Ingredient, Recipe, RecipeFacet, Tag
+from recipe import facets
+from recipe.tests.test_recipe_api import detail_url
+
+FACETS_URL = reverse("recipe:recipe-facets")
+RECIPE_URL = reverse("recipe:recipe-list")
+
+
+def summary_rows(user):
+    """Return the user's summary rows as comparable tuples."""
+    return set(
+        RecipeFacet.objects.filter(user=user).values_list("facet", "value", "count")
+    )
+
+
+class RecipeFacetTests(TestCase):
+    """Test facet counts and their summary table."""
+
+    def setUp(self):
+        self.client = APIClient()
+        self.user = get_user_model().objects.create_user(
+            email="user@example.com", password="testpass123"
+        )
+        self.client.force_authenticate(self.user)
+        for payload in (
+            {
+                "title": "Pancakes",
+                "time_minutes": 10,
+                "price": "3.50",
+                "tags": [{"name": "Breakfast"}, {"name": "Sweet"}],
+                "ingredients": [{"name": "Flour"}, {"name": "Milk"}],
+            },
+            {
+                "title": "Porridge",
+                "time_minutes": 5,
+                "price": "2.00",
+                "tags": [{"name": "Breakfast"}],
+                "ingredients": [{"name": "Milk"}],
+            },
+            {
+                "title": "Curry",
+                "time_minutes": 45,
+                "price": "12.00",
+                "tags": [{"name": "Dinner"}],
+                "ingredients": [{"name": "Rice"}],
+            },
+        ):
+            res = self.client.post(RECIPE_URL, payload, format="json")
+            self.assertEqual(res.status_code, status.HTTP_201_CREATED)
+
+    def assert_summary_matches_recipes(self):
+        """Assert the incrementally kept rows equal a full recount."""
+        expected = {
+            (facet, value, count)
+            for facet, values in facets.compute(
+                Recipe.objects.filter(user=self.user)
+            ).items()
+            for value, count in values.items()
+        }
+        self.assertEqual(summary_rows(self.user), expected)
+
+    def test_facets(self):
+        """Test the facet counts of all the user's recipes."""
+        res = self.client.get(FACETS_URL)
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(res.data["count"], 3)
+        self.assertEqual(
+            [(tag["name"], tag["count"]) for tag in res.data["tags"]],
+            [("Breakfast", 2), ("Dinner", 1), ("Sweet", 1)],
+        )
+        self.assertEqual(res.data["ingredients"][0]["name"], "Milk")
+        self.assertEqual(
+            res.data["price"],
+            [
+                {"min": "0.00", "max": "5.00", "count": 2},
+                {"min": "10.00", "max": "15.00", "count": 1},
+            ],
+        )
+        self.assertEqual(
+            res.data["time_minutes"],
+            [{"min": 0, "max": 15, "count": 2}, {"min": 45, "max": 60, "count": 1}],
+        )
+        self.assert_summary_matches_recipes()
+
+    def test_facets_filtered(self):
+        """Test the facet counts follow the recipe filters."""
+        breakfast = Tag.objects.get(user=self.user, name="Breakfast")
+
+        res = self.client.get(FACETS_URL, {"tags": f"{breakfast.id}"})
+
+        self.assertEqual(res.data["count"], 2)
+        self.assertNotIn("Dinner", [tag["name"] for tag in res.data["tags"]])
+
+    def test_unfiltered_facets_read_summary(self):
+        """Test unfiltered facets do not scan the recipes."""
+        with CaptureQueriesContext(connection) as ctx:
+            self.client.get(FACETS_URL)
+
+        recipe_tables = re.compile(r'"core_recipe(_tags|_ingredients)?"')
+        recipe_queries = [
+            query["sql"]
+            for query in ctx.captured_queries
+            if recipe_tables.search(query["sql"])
+        ]
+        self.assertEqual(recipe_queries, [])
+
+    def test_summary_follows_updates(self):
+        """Test edits, removals and deletions keep the counts in step."""
+        pancakes = Recipe.objects.get(title="Pancakes")
+        porridge = Recipe.objects.get(title="Porridge")
+
+        self.client.patch(
+            detail_url(pancakes.id),
+            {"price": "11.00", "tags": [{"name": "Dinner"}]},
+            format="json",
+        )
+        self.assert_summary_matches_recipes()
+
+        porridge.ingredients.remove(Ingredient.objects.get(name="Milk"))
+        porridge.ingredients.remove(Ingredient.objects.get(name="Rice"))
+        self.assert_summary_matches_recipes()
+
+        Tag.objects.get(name="Dinner").recipe_set.add(porridge)
+        self.assert_summary_matches_recipes()
+
+        self.client.delete(detail_url(porridge.id))
+        self.assert_summary_matches_recipes()
+
+        Tag.objects.get(name="Dinner").delete()
+        self.assert_summary_matches_recipes()
+
+    def test_rebuild_command(self):
+        """Test the rebuild command restores lost counts."""
+        expected = summary_rows(self.user)
+        RecipeFacet.objects.all().delete()
+
+        call_command("rebuild_recipe_facets")
+
+        self.assertEqual(summary_rows(self.user), expected)
+
+    def test_migration_backfills_existing_recipes(self):
+        """Test the migration adding the table fills it from existing recipes."""
+        migration = import_module("core.migrations.0006_recipefacet")
+        other = get_user_model().objects.create_user(email="other@example.com")
+        Recipe.objects.create(
+            user=other, title="Toast", time_minutes=3, price=Decimal("1.00")
+        ).tags.add(Tag.objects.create(user=other, name="Snack"))
+        expected = summary_rows(self.user)
+        RecipeFacet.objects.all().delete()
+
+        migration.fill_recipe_facets(apps, connection.schema_editor())
+
+        self.assertEqual(summary_rows(self.user), expected)
+        tag = Tag.objects.get(name="Snack")
+        self.assertEqual(
+            summary_rows(other),
+            {("tag", tag.pk, 1), ("price", 0, 1), ("time_minutes", 0, 1)},
+        )
@@ -0,0 +1,164 @@
+"""
+Tests for the recipe range filters and ordering.
+"""
+
+from decimal import Decimal
+
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from core.models import Ingredient, Recipe, Tag
+from recipe.tests.test_recipe_api import create_recipe
+
+RECIPE_URL = reverse("recipe:recipe-list")
+
+# Index read in order for each ordering of an unfiltered list.
+ORDERING_INDEXES = {
+    "": "core_recipe_pkey",
+    "price": "recipe_user_price_idx",
+    "-price": "recipe_user_price_idx",
+    "time_minutes": "recipe_user_time_idx",
+    "-time_minutes": "recipe_user_time_idx",
+    "title": "recipe_user_title_idx",
+    "-title": "recipe_user_title_idx",
+}
+
+
+class RecipeFilterTests(TestCase):
+    """Test filtering and ordering recipes."""
+
+    def setUp(self):
+        self.client = APIClient()
+        self.user = get_user_model().objects.create_user(
+            email="user@example.com", password="testpass123"
+        )
+        self.client.force_authenticate(self.user)
+        self.tag = Tag.objects.create(user=self.user, name="Quick")
+        self.ingredient = Ingredient.objects.create(user=self.user, name="Egg")
+        for title, minutes, price in (
+            ("Toast", 5, "1.50"),
+            ("Omelette", 10, "3.00"),
+            ("Risotto", 40, "9.00"),
+            ("Roast", 90, "20.00"),
+        ):
+            recipe = create_recipe(
+                user=self.user, title=title, time_minutes=minutes, price=Decimal(price)
+            )
+            if minutes <= 10:
+                recipe.tags.add(self.tag)
+
+    def titles(self, params):
+        res = self.client.get(RECIPE_URL, params)
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        return [recipe["title"] for recipe in res.data["results"]]
+
+    def test_range_filters(self):
+        """Test filtering by time and price ranges."""
+        self.assertEqual(
+            self.titles({"time_minutes__lte": 40, "price__gt": 2, "ordering": "price"}),
+            ["Omelette", "Risotto"],
+        )
+
+    def test_ordering(self):
+        """Test ordering by price, time and title."""
+        self.assertEqual(
+            self.titles({"ordering": "-price"}),
+            ["Roast", "Risotto", "Omelette", "Toast"],
+        )
+        self.assertEqual(
+            self.titles({"ordering": "title"}),
+            ["Omelette", "Risotto", "Roast", "Toast"],
+        )
+
+    def test_filters_combine_with_tags(self):
+        """Test range filters combine with the tag filter."""
+        params = {"tags": self.tag.id, "price__lt": 2}
+
+        self.assertEqual(self.titles(params), ["Toast"])
+
+    def seed(self):
+        """Add enough recipes over many users for the planner to use indexes."""
+        user_model = get_user_model()
+        users = user_model.objects.bulk_create(
+            user_model(email=f"cook{i}@example.com") for i in range(50)
+        )
+        recipes = Recipe.objects.bulk_create(
+            Recipe(
+                user=user,
+                title=f"Recipe {i}",
+                time_minutes=i % 120,
+                price=Decimal(i % 50),
+            )
+            for i in range(100)
+            for user in [*users, self.user]
+        )
+        tags = {self.user: self.tag}
+        ingredients = {self.user: self.ingredient}
+        for user in users:
+            tags[user] = Tag.objects.create(user=user, name="Quick")
+            ingredients[user] = Ingredient.objects.create(user=user, name="Egg")
+        Recipe.tags.through.objects.bulk_create(
+            Recipe.tags.through(recipe=recipe, tag=tags[recipe.user])
+            for recipe in recipes[::10]
+        )
+        Recipe.ingredients.through.objects.bulk_create(
+            Recipe.ingredients.through(
+                recipe=recipe, ingredient=ingredients[recipe.user]
+            )
+            for recipe in recipes[1::10]
+        )
+        with connection.cursor() as cursor:
+            for table in ("core_recipe", "core_recipe_tags", "core_recipe_ingredients"):
+                cursor.execute(f"ANALYZE {table}")
+
+    def plan(self, params):
+        """Return the query plan of the recipe list query for `params`."""
+        with CaptureQueriesContext(connection) as ctx:
+            self.titles(params)
+        [sql] = [
+            query["sql"]
+            for query in ctx.captured_queries
+            if query["sql"].startswith("SELECT")
+            and 'FROM "core_recipe"' in query["sql"]
+            and "ORDER BY" in query["sql"]
+        ]
+        with connection.cursor() as cursor:
+            cursor.execute(f"EXPLAIN {sql}")
+            return "\n".join(row[0] for row in cursor.fetchall())
+
+    def test_filter_and_ordering_use_indexes(self):
+        """Test each filter with each ordering is served by the expected index."""
+        self.seed()
+        # The tag and ingredient filters start from the few linked recipes,
+        # and the price range from the price index, then sort what they find.
+        # Unfiltered lists read their ordering's index in order, or the
+        # primary key backwards for the default -id ordering.
+        filters = [
+            ({"tags": self.tag.id}, "core_recipe_tags_tag_id_10c0ffea"),
+            (
+                {"ingredients": self.ingredient.id},
+                "core_recipe_ingredients_ingredient_id_a8fec9ee",
+            ),
+            ({"price__gt": 2, "price__lt": 10}, "recipe_user_price_idx"),
+        ]
+        cases = []
+        for ordering, index in ORDERING_INDEXES.items():
+            params = {"ordering": ordering} if ordering else {}
+            cases.append((params, index))
+            cases += [({**params, **extra}, used) for extra, used in filters]
+        # Filters matching most recipes still read the ordering's index.
+        cases += [
+            ({"price__lte": 40, "ordering": "time_minutes"}, "recipe_user_time_idx"),
+            ({"time_minutes__lte": 90, "ordering": "-title"}, "recipe_user_title_idx"),
+        ]
+        for params, index in cases:
+            with self.subTest(params=params):
+                plan = self.plan(params)
+
+                self.assertNotRegex(plan, r"Seq Scan on core_recipe\b")
+                self.assertIn(index, plan)
@@ -136,3 +136,28 @@ class PrivateIngredientsAPITests(TestCase):
 
         res = self.client.get(INGREDIENTS_URL, {"assigned_only": 1})
         self.assertEqual(len(res.data["results"]), 1)
+
+    def test_usage_count(self):
+        """Test ingredients can be listed with usage counts, most used first."""
+        a = Ingredient.objects.create(user=self.user, name="Salt")
+        b = Ingredient.objects.create(user=self.user, name="Pepper")
+        Ingredient.objects.create(user=self.user, name="Kale")
+        for title in ("Pancakes", "Porridge"):
+            recipe = Recipe.objects.create(
+                title=title,
+                time_minutes=5,
+                price=Decimal("5.00"),
+                user=self.user,
+            )
+            recipe.ingredients.add(b)
+        recipe.ingredients.add(a)
+
+        res = self.client.get(INGREDIENTS_URL, {"usage_count": 1, "assigned_only": 1})
+
+        self.assertEqual(
+            [
+                (ingredient["name"], ingredient["usage_count"])
+                for ingredient in res.data["results"]
+            ],
+            [("Pepper", 2), ("Salt", 1)],
+        )
@@ -0,0 +1,152 @@
+"""
+Tests for keyset pagination of the recipe APIs.
+"""
+
+from base64 import b64decode, b64encode
+from urllib.parse import parse_qs, urlparse
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from core.models import Tag
+from recipe.tests.test_recipe_api import create_recipe
+
+RECIPE_URL = reverse("recipe:recipe-list")
+TAGS_URL = reverse("recipe:tag-list")
+
+
+def count_queries(ctx):
+    return [
+        query["sql"]
+        for query in ctx.captured_queries
+        if query["sql"].startswith("SELECT COUNT(*)")
+    ]
+
+
+class KeysetPaginationTests(TestCase):
+    """Test paging through recipes and tags."""
+
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.user = get_user_model().objects.create_user(
+            email="user@example.com", password="testpass123"
+        )
+        self.client.force_authenticate(self.user)
+
+    def collect(self, url, params):
+        """Follow the next links and return every result."""
+        res = self.client.get(url, params)
+        results = res.data["results"]
+        while res.data["next"]:
+            res = self.client.get(res.data["next"])
+            results += res.data["results"]
+        return results
+
+    def test_walk_all_pages(self):
+        """Test every recipe is returned once, including ties in the order."""
+        for i in range(12):
+            create_recipe(user=self.user, title=f"Recipe {i}", time_minutes=i % 3)
+
+        results = self.collect(RECIPE_URL, {"ordering": "time_minutes"})
+
+        self.assertEqual(len(results), 12)
+        self.assertEqual(len({recipe["id"] for recipe in results}), 12)
+        times = [recipe["time_minutes"] for recipe in results]
+        self.assertEqual(times, sorted(times))
+
+    def test_ties_paged_by_position_not_offset(self):
+        """Test pages within a run of equal values follow and precede exactly."""
+        for i in range(10):
+            create_recipe(user=self.user, title=f"Recipe {i}", price=5)
+
+        res = self.client.get(RECIPE_URL, {"ordering": "price", "page_size": 3})
+        pages = [res.data["results"]]
+        while res.data["next"]:
+            cursor = parse_qs(urlparse(res.data["next"]).query)["cursor"][0]
+            self.assertNotIn("o", parse_qs(b64decode(cursor).decode()))
+            res = self.client.get(res.data["next"])
+            pages.append(res.data["results"])
+        ids = [recipe["id"] for page in pages for recipe in page]
+        self.assertEqual(ids, sorted(ids))
+        self.assertEqual(len(set(ids)), 10)
+
+        res = self.client.get(res.data["previous"])
+        self.assertEqual(res.data["results"], pages[-2])
+
+    def test_invalid_cursor(self):
+        """Test a cursor whose position does not fit the ordering is rejected."""
+        cursor = b64encode(b"p=%5B%225%22%5D").decode()
+
+        res = self.client.get(RECIPE_URL, {"ordering": "price", "cursor": cursor})
+
+        self.assertEqual(res.status_code, status.HTTP_404_NOT_FOUND)
+
+    @override_settings(MAX_PAGE_SIZE=3)
+    def test_page_size(self):
+        """Test clients pick the page size, up to MAX_PAGE_SIZE."""
+        for i in range(5):
+            create_recipe(user=self.user, title=f"Recipe {i}")
+
+        res = self.client.get(RECIPE_URL, {"page_size": 2})
+        self.assertEqual(len(res.data["results"]), 2)
+
+        res = self.client.get(RECIPE_URL, {"page_size": 50})
+        self.assertEqual(len(res.data["results"]), 3)
+
+    def test_count_estimated_without_count_query(self):
+        """Test the count comes from the planner unless include_total=1."""
+        for i in range(30):
+            create_recipe(user=self.user, title=f"Recipe {i}")
+        with connection.cursor() as cursor:
+            cursor.execute("ANALYZE core_recipe")
+
+        with CaptureQueriesContext(connection) as ctx:
+            res = self.client.get(RECIPE_URL)
+
+        self.assertTrue(res.data["count_is_estimate"])
+        self.assertLessEqual(abs(res.data["count"] - 30), 15)
+        self.assertEqual(count_queries(ctx), [])
+
+    def test_count_cached_unless_total_requested(self):
+        """Test the count is reused until include_total=1 asks for a fresh one."""
+        create_recipe(user=self.user)
+        res = self.client.get(RECIPE_URL, {"include_total": 1})
+        self.assertEqual(res.data["count"], 1)
+        self.assertFalse(res.data["count_is_estimate"])
+        create_recipe(user=self.user)
+
+        with CaptureQueriesContext(connection) as ctx:
+            res = self.client.get(RECIPE_URL)
+        self.assertEqual(res.data["count"], 1)
+        self.assertTrue(res.data["count_is_estimate"])
+        self.assertEqual(count_queries(ctx), [])
+
+        res = self.client.get(RECIPE_URL, {"include_total": 1})
+        self.assertEqual(res.data["count"], 2)
+
+    def test_count_per_filter(self):
+        """Test cached counts are kept apart per filter."""
+        create_recipe(user=self.user, price=2)
+        create_recipe(user=self.user, price=20)
+
+        res = self.client.get(RECIPE_URL, {"include_total": 1})
+        self.assertEqual(res.data["count"], 2)
+        res = self.client.get(RECIPE_URL, {"price__lt": 10, "include_total": 1})
+        self.assertEqual(res.data["count"], 1)
+
+    def test_tags_paged_in_name_order(self):
+        """Test tags are paged in their list order."""
+        names = [f"Tag {i:02}" for i in range(8)]
+        for name in names:
+            Tag.objects.create(user=self.user, name=name)
+
+        results = self.collect(TAGS_URL, {"page_size": 3})
+
+        self.assertEqual([tag["name"] for tag in results], names[::-1])
@@ -5,6 +5,7 @@ Test for the recipe API.
 import os
 import tempfile
 from decimal import Decimal
+from unittest.mock import patch
 
 from django.contrib.auth import get_user_model
 from django.test import TestCase
@@ -409,6 +410,45 @@ class PrivateRecipeAPITests(TestCase):
         self.assertIn(s2.data, res.data["results"])
         self.assertNotIn(s3.data, res.data["results"])
 
+    def test_detail_not_modified(self):
+        """Test revalidating an unchanged recipe gets a 304 without serializing."""
+        recipe = create_recipe(user=self.user)
+        url = detail_url(recipe.id)
+        etag = self.client.get(url)["ETag"]
+
+        with patch.object(
+            RecipeDetailSerializer, "to_representation"
+        ) as to_representation:
+            res = self.client.get(url, headers={"If-None-Match": etag})
+
+        self.assertEqual(res.status_code, status.HTTP_304_NOT_MODIFIED)
+        to_representation.assert_not_called()
+
+    def test_detail_modified_after_tag_rename(self):
+        """Test renaming a recipe's tag invalidates the recipe's validators."""
+        recipe = create_recipe(user=self.user)
+        tag = Tag.objects.create(user=self.user, name="Dinner")
+        recipe.tags.add(tag)
+        url = detail_url(recipe.id)
+        etag = self.client.get(url)["ETag"]
+
+        tag.name = "Supper"
+        tag.save()
+        res = self.client.get(url, headers={"If-None-Match": etag})
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(res.data["tags"][0]["name"], "Supper")
+
+    def test_detail_if_modified_since(self):
+        """Test If-Modified-Since is answered from updated_at."""
+        recipe = create_recipe(user=self.user)
+        url = detail_url(recipe.id)
+        last_modified = self.client.get(url)["Last-Modified"]
+
+        res = self.client.get(url, headers={"If-Modified-Since": last_modified})
+
+        self.assertEqual(res.status_code, status.HTTP_304_NOT_MODIFIED)
+
 
 class ImageUploadTests(TestCase):
     """Tests for the image upload API."""
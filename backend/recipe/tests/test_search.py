@@ -0,0 +1,114 @@
+"""
+Tests for recipe search.
+"""
+
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from core.models import Ingredient, Tag
+from recipe.tests.test_recipe_api import create_recipe
+
+RECIPE_URL = reverse("recipe:recipe-list")
+
+
+class RecipeSearchTests(TestCase):
+    """Test the recipe search parameter."""
+
+    def setUp(self):
+        self.client = APIClient()
+        self.user = get_user_model().objects.create_user(
+            email="user@example.com", password="testpass123"
+        )
+        self.client.force_authenticate(self.user)
+
+    def search(self, text, **params):
+        res = self.client.get(RECIPE_URL, {"search": text, **params})
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        return res
+
+    def titles(self, res):
+        return [recipe["title"] for recipe in res.data["results"]]
+
+    def test_search_title_and_description(self):
+        """Test title matches rank above description matches."""
+        create_recipe(user=self.user, title="Pasta", description="Tomato sauce")
+        create_recipe(user=self.user, title="Tomato Soup", description="Warming")
+        create_recipe(user=self.user, title="Pancakes", description="Fluffy")
+
+        res = self.search("tomatoes")
+
+        self.assertEqual(self.titles(res), ["Tomato Soup", "Pasta"])
+
+    def test_search_tags_and_ingredients(self):
+        """Test tag and ingredient names are searched."""
+        r1 = create_recipe(user=self.user, title="Stew")
+        r1.tags.add(Tag.objects.create(user=self.user, name="Winter"))
+        r2 = create_recipe(user=self.user, title="Salad")
+        r2.ingredients.add(Ingredient.objects.create(user=self.user, name="Walnut"))
+
+        self.assertEqual(self.titles(self.search("winter")), ["Stew"])
+        self.assertEqual(self.titles(self.search("walnuts")), ["Salad"])
+
+    def test_search_typo(self):
+        """Test a misspelt title word still finds the recipe."""
+        create_recipe(user=self.user, title="Chicken Curry")
+
+        self.assertEqual(self.titles(self.search("currry")), ["Chicken Curry"])
+
+    def test_search_follows_tag_rename(self):
+        """Test renaming a tag updates the recipes' search vectors."""
+        recipe = create_recipe(user=self.user, title="Stew")
+        tag = Tag.objects.create(user=self.user, name="Winter")
+        recipe.tags.add(tag)
+
+        tag.name = "Autumn"
+        tag.save()
+
+        self.assertEqual(self.titles(self.search("winter")), [])
+        self.assertEqual(self.titles(self.search("autumn")), ["Stew"])
+
+    def test_search_limited_to_user(self):
+        """Test other users' recipes are not searched."""
+        other = get_user_model().objects.create_user(
+            email="other@example.com", password="testpass123"
+        )
+        create_recipe(user=other, title="Lasagne")
+
+        self.assertEqual(self.titles(self.search("lasagne")), [])
+
+    def test_search_cursor_pagination(self):
+        """Test search results are paged by cursor in rank order."""
+        for i in range(7):
+            create_recipe(user=self.user, title=f"Bread {i}")
+
+        res = self.search("bread", include_total=1)
+        titles = self.titles(res)
+        while res.data["next"]:
+            res = self.client.get(res.data["next"])
+            titles += self.titles(res)
+
+        self.assertEqual(res.data["count"], 7)
+        self.assertEqual(sorted(titles), [f"Bread {i}" for i in range(7)])
+
+    def test_search_one_recipe_query(self):
+        """Test the typo fallback doesn't cost a query of its own."""
+        create_recipe(user=self.user, title="Chicken Curry")
+
+        for text in ("curry", "currry"):
+            with self.subTest(text=text):
+                with CaptureQueriesContext(connection) as ctx:
+                    res = self.search(text)
+
+                self.assertEqual(self.titles(res), ["Chicken Curry"])
+                queries = [
+                    query["sql"]
+                    for query in ctx.captured_queries
+                    if query["sql"].startswith("SELECT")
+                    and 'FROM "core_recipe"' in query["sql"]
+                ]
+                self.assertEqual(len(queries), 1, queries)
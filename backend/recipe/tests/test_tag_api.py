@@ -137,3 +137,25 @@ class PrivateTagsAPITests(TestCase):
         res = self.client.get(TAGS_URL, {"assigned_only": 1})
 
         self.assertEqual(len(res.data["results"]), 1)
+
+    def test_usage_count(self):
+        """Test tags can be listed with usage counts, most used first."""
+        a = Tag.objects.create(user=self.user, name="Breakfast")
+        b = Tag.objects.create(user=self.user, name="Lunch")
+        Tag.objects.create(user=self.user, name="Dinner")
+        for title in ("Pancakes", "Porridge"):
+            recipe = Recipe.objects.create(
+                title=title,
+                time_minutes=5,
+                price=Decimal("5.00"),
+                user=self.user,
+            )
+            recipe.tags.add(b)
+        recipe.tags.add(a)
+
+        res = self.client.get(TAGS_URL, {"usage_count": 1, "assigned_only": 1})
+
+        self.assertEqual(
+            [(tag["name"], tag["usage_count"]) for tag in res.data["results"]],
+            [("Lunch", 2), ("Breakfast", 1)],
+        )
@@ -2,46 +2,97 @@
 Views for the recipe APIs.
 """
 
+from django.db.models import Count, Exists, IntegerField, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+from django.utils.decorators import method_decorator
+from django.views.decorators.http import condition
+from django_filters.rest_framework import DjangoFilterBackend
 from drf_spectacular.utils import (
     OpenApiParameter,
     OpenApiTypes,
     extend_schema,
     extend_schema_view,
 )
-from rest_framework import mixins, status, viewsets
-from rest_framework.authentication import TokenAuthentication
+from rest_framework import filters, mixins, status, viewsets
 from rest_framework.decorators import action
 from rest_framework.permissions import IsAuthenticated
 from rest_framework.response import Response
 
+from core.caching import make_etag
 from core.models import Ingredient, Recipe, Tag
-from recipe import serializers
+from core.pagination import KeysetPagination
+from recipe import facets, search, serializers
+from recipe.filters import RecipeFilter
+from recipe.pagination import RecipeSearchPagination
+
+
+def _recipe_updated_at(request, pk):
+    """Return the user's recipe updated_at, looked up once per request."""
+    if not hasattr(request, "_recipe_updated_at"):
+        try:
+            request._recipe_updated_at = (
+                Recipe.objects.filter(pk=pk, user=request.user)
+                .values_list("updated_at", flat=True)
+                .first()
+            )
+        except (TypeError, ValueError):
+            request._recipe_updated_at = None
+    return request._recipe_updated_at
+
+
+def recipe_etag(request, pk):
+    updated_at = _recipe_updated_at(request, pk)
+    if updated_at is None:
+        return None
+    return make_etag("recipe", pk, updated_at.isoformat())
+
+
+def recipe_last_modified(request, pk):
+    return _recipe_updated_at(request, pk)
+
+
+RECIPE_FILTER_PARAMETERS = [
+    OpenApiParameter(
+        name="tags",
+        type=OpenApiTypes.STR,
+        description="Comma separated list of tag IDs to filter recipes",
+    ),
+    OpenApiParameter(
+        name="ingredients",
+        type=OpenApiTypes.STR,
+        description="Comma separated list of ingredient IDs to filter recipes",
+    ),
+    OpenApiParameter(
+        name="search",
+        type=OpenApiTypes.STR,
+        description="Search title, description, tag and ingredient names. "
+        "Results are ranked by relevance and paginated by cursor.",
+    ),
+]
 
 
 @extend_schema_view(
     list=extend_schema(
         # summary="List all recipes",
-        parameters=[
-            OpenApiParameter(
-                name="tags",
-                type=OpenApiTypes.STR,
-                description="Comma separated list of tag IDs to filter recipes",
-            ),
-            OpenApiParameter(
-                name="ingredients",
-                type=OpenApiTypes.STR,
-                description="Comma separated list of ingredient IDs to filter recipes",
-            ),
-        ]
-    )
+        parameters=RECIPE_FILTER_PARAMETERS,
+    ),
+    facets=extend_schema(
+        parameters=RECIPE_FILTER_PARAMETERS,
+        responses=OpenApiTypes.OBJECT,
+    ),
 )
 class RecipeViewSet(viewsets.ModelViewSet):
     """View for manage recipe APIs."""
 
     queryset = Recipe.objects.all()
     serializer_class = serializers.RecipeDetailSerializer
-    authentication_classes = [TokenAuthentication]
     permission_classes = [IsAuthenticated]
+    pagination_class = KeysetPagination
+    filterset_class = RecipeFilter
+    filter_backends = [DjangoFilterBackend, filters.OrderingFilter]
+    # Each is served by a (user, field) index.
+    ordering_fields = ["price", "time_minutes", "title"]
+    ordering = ["-id"]
 
     def _params_to_ints(self, qs):
         """Convert a list of string IDs to a list of integers."""
@@ -53,14 +104,43 @@ class RecipeViewSet(viewsets.ModelViewSet):
         ingredients = self.request.query_params.get("ingredients")
         queryset = self.queryset
 
+        # Semi-joins rather than joins, so no DISTINCT is needed and the
+        # ordering can come straight from an index.
         if tags:
             tag_ids = self._params_to_ints(tags)
-            queryset = queryset.filter(tags__id__in=tag_ids)
+            queryset = queryset.filter(
+                Exists(
+                    Recipe.tags.through.objects.filter(
+                        recipe=OuterRef("pk"), tag__in=tag_ids
+                    )
+                )
+            )
         if ingredients:
             ingredient_ids = self._params_to_ints(ingredients)
-            queryset = queryset.filter(ingredients__id__in=ingredient_ids)
+            queryset = queryset.filter(
+                Exists(
+                    Recipe.ingredients.through.objects.filter(
+                        recipe=OuterRef("pk"), ingredient__in=ingredient_ids
+                    )
+                )
+            )
+
+        queryset = queryset.filter(user=self.request.user)
+        if self._search_text():
+            queryset = search.search(queryset, self._search_text())
+
+        return queryset.order_by("-id")
 
-        return queryset.filter(user=self.request.user).order_by("-id").distinct()
+    def _search_text(self):
+        params = getattr(self.request, "query_params", {})
+        return params.get("search", "").strip()
+
+    @property
+    def paginator(self):
+        """Page search results by cursor, in rank order."""
+        if not hasattr(self, "_paginator") and self._search_text():
+            self._paginator = RecipeSearchPagination()
+        return super().paginator
 
     def get_serializer_class(self):
         """Return the serializer class for request."""
@@ -71,10 +151,27 @@ class RecipeViewSet(viewsets.ModelViewSet):
 
         return self.serializer_class
 
+    @method_decorator(
+        condition(etag_func=recipe_etag, last_modified_func=recipe_last_modified)
+    )
+    def retrieve(self, request, *args, **kwargs):
+        """Retrieve a recipe, answering revalidations with 304."""
+        return super().retrieve(request, *args, **kwargs)
+
     def perform_create(self, serializer):
         """Create a new recipe."""
         serializer.save(user=self.request.user)
 
+    @action(methods=["GET"], detail=False)
+    def facets(self, request):
+        """Count recipes per tag, ingredient, price and time for the filter."""
+        filter_params = {"tags", "ingredients", "search", *RecipeFilter.base_filters}
+        if any(request.query_params.get(name) for name in filter_params):
+            counts = facets.compute(self.filter_queryset(self.get_queryset()))
+        else:
+            counts = facets.read(request.user)
+        return Response(facets.to_representation(request.user, counts))
+
     @action(methods=["POST"], detail=True, url_path="upload-image")
     def upload_image(self, request, pk=None):
         """Upload an image to recipe."""
@@ -96,7 +193,14 @@ class RecipeViewSet(viewsets.ModelViewSet):
                 type=OpenApiTypes.INT,
                 enum=[0, 1],
                 description="Filter by items assigned to recipes.",
-            )
+            ),
+            OpenApiParameter(
+                name="usage_count",
+                type=OpenApiTypes.INT,
+                enum=[0, 1],
+                description="Include the number of recipes using each item "
+                "and sort by it, most used first.",
+            ),
         ]
     )
 )
@@ -108,18 +212,47 @@ class BaseRecipeAttrViewSet(
 ):
     """Base viewset for recipe attributes."""
 
-    authentication_classes = [TokenAuthentication]
     permission_classes = [IsAuthenticated]
+    pagination_class = KeysetPagination
+    # Name of the Recipe many-to-many field pointing at this model.
+    recipe_field = None
+    usage_serializer_class = None
+
+    def _recipe_links(self):
+        """Return the recipe links of the outer row, from the through table."""
+        through = getattr(Recipe, self.recipe_field).through
+        column = f"{self.queryset.model._meta.model_name}_id"
+        return through.objects.filter(**{column: OuterRef("pk")}).order_by()
+
+    def _usage_count(self):
+        return bool(int(self.request.query_params.get("usage_count", 0)))
 
     def get_queryset(self):
         """Filter queryset to authenticated user."""
         assigned_only = bool(int(self.request.query_params.get("assigned_only", 0)))
-        queryset = self.queryset
+        queryset = self.queryset.filter(user=self.request.user)
 
         if assigned_only:
-            queryset = queryset.filter(recipe__isnull=False)
+            queryset = queryset.filter(Exists(self._recipe_links()))
+
+        if self._usage_count():
+            counts = (
+                self._recipe_links()
+                .values(f"{self.queryset.model._meta.model_name}_id")
+                .annotate(count=Count("*"))
+                .values("count")
+            )
+            return queryset.annotate(
+                usage_count=Coalesce(Subquery(counts, output_field=IntegerField()), 0)
+            ).order_by("-usage_count", "-name")
 
-        return queryset.filter(user=self.request.user).order_by("-name").distinct()
+        return queryset.order_by("-name")
+
+    def get_serializer_class(self):
+        """Return the serializer class for request."""
+        if self.action == "list" and self._usage_count():
+            return self.usage_serializer_class
+        return self.serializer_class
 
 
 class TagViewSet(BaseRecipeAttrViewSet):
@@ -127,6 +260,8 @@ class TagViewSet(BaseRecipeAttrViewSet):
 
     queryset = Tag.objects.all()
     serializer_class = serializers.TagSerializer
+    usage_serializer_class = serializers.TagUsageSerializer
+    recipe_field = "tags"
 
 
 class IngredientViewSet(BaseRecipeAttrViewSet):
@@ -134,3 +269,5 @@ class IngredientViewSet(BaseRecipeAttrViewSet):
 
     queryset = Ingredient.objects.all()
     serializer_class = serializers.IngredientSerializer
+    usage_serializer_class = serializers.IngredientUsageSerializer
+    recipe_field = "ingredients"
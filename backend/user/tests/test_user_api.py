@@ -79,6 +79,8 @@ class PublicUserApiTests(TestCase):
         res = self.client.post(TOKEN_URL, payload)
 
         self.assertIn("token", res.data)
+        self.assertIn("access", res.data)
+        self.assertIn("refresh", res.data)
         self.assertEqual(res.status_code, status.HTTP_200_OK)
 
     def test_create_token_bad_credentials(self):
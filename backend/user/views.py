@@ -2,10 +2,16 @@
 Views for the user API.
 """
 
-from rest_framework import authentication, generics, permissions
+from django.conf import settings
+from rest_framework import generics, permissions
+from rest_framework.authtoken.models import Token
 from rest_framework.authtoken.views import ObtainAuthToken
+from rest_framework.response import Response
 from rest_framework.settings import api_settings
+from rest_framework_simplejwt.tokens import RefreshToken
+from rest_framework_simplejwt.views import TokenObtainPairView
 
+from core.backends import VerificationBusyMixin
 from user.serializers import AuthTokenSerializer, UserSerializer
 
 
@@ -19,7 +25,6 @@ class ManageUserView(generics.RetrieveUpdateAPIView):
     """Manage the authenticated user."""
 
     serializer_class = UserSerializer
-    authentication_classes = [authentication.TokenAuthentication]
     permission_classes = [permissions.IsAuthenticated]
 
     def get_object(self):
@@ -27,8 +32,26 @@ class ManageUserView(generics.RetrieveUpdateAPIView):
         return self.request.user
 
 
-class CreateTokenView(ObtainAuthToken):
-    """Create a new user in the system."""
+class CreateTokenView(VerificationBusyMixin, ObtainAuthToken):
+    """Create auth tokens for the user."""
 
     serializer_class = AuthTokenSerializer
     renderer_classes = api_settings.DEFAULT_RENDERER_CLASSES
+
+    def post(self, request, *args, **kwargs):
+        """Return a JWT pair, plus the legacy DRF token while it is accepted."""
+        serializer = self.get_serializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        user = serializer.validated_data["user"]
+
+        refresh = RefreshToken.for_user(user)
+        data = {"refresh": str(refresh), "access": str(refresh.access_token)}
+        if settings.LEGACY_TOKEN_AUTH:
+            token, created = Token.objects.get_or_create(user=user)
+            data["token"] = token.key
+
+        return Response(data)
+
+
+class TokenPairView(VerificationBusyMixin, TokenObtainPairView):
+    """Obtain a JWT pair, with a 429 while logins are saturated."""
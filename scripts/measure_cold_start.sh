@@ -0,0 +1,24 @@
+#!/bin/sh
+
+# Measure cold start: the time from starting a compose service until its
+# readiness check first answers 200.
+#
+#   scripts/measure_cold_start.sh [service] [url] [compose file]
+
+set -e
+
+SERVICE=${1:-backend}
+URL=${2:-http://localhost:8000/api/health-check/ready/}
+COMPOSE_FILE=${3:-docker-compose.yml}
+
+docker compose -f "$COMPOSE_FILE" stop "$SERVICE" >/dev/null 2>&1 || true
+
+start=$(date +%s.%N)
+docker compose -f "$COMPOSE_FILE" up -d "$SERVICE"
+until curl -fs -o /dev/null "$URL"; do
+    sleep 0.1
+done
+end=$(date +%s.%N)
+
+elapsed=$(awk -v start="$start" -v end="$end" 'BEGIN { printf "%.2f", end - start }')
+echo "$SERVICE cold start to first healthy response: ${elapsed}s"
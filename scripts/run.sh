@@ -3,9 +3,13 @@
 set -e
 
 # Run the application
-python manage.py wait_for_db
-python manage.py collectstatic --noinput
+python manage.py wait_for_db --wait-for cache broker
+
+# collectstatic only touches the filesystem, so run it alongside migrate
+python manage.py collectstatic --noinput &
+collectstatic_pid=$!
 python manage.py migrate
+wait "$collectstatic_pid"
 
 uwsgi --socket :9000 --workers 4 --master --enable-threads --module backend.wsgi
 # uwsgi --socket :9000 --master --enable-threads --module backend.wsgi